@@ -0,0 +1,87 @@
+"""
+Render benchmark: per-chunk cost of the streaming Markdown path as a response grows.
+
+    python -m mimitaz.bench.render [--tokens 4000]
+
+Compares re-parsing the whole response per chunk (the old behaviour) with the
+IncrementalMarkdown renderer used by UI.print_stream.
+"""
+import argparse
+import io
+import time
+from typing import Callable, List
+from rich.console import Console
+from rich.markdown import Markdown
+from mimitaz.cli.render import IncrementalMarkdown
+
+PARAGRAPH = (
+    "The handler validates the request, looks up the session and streams the "
+    "result back to the caller. Errors are mapped to **typed** responses.\n\n"
+)
+CODE = "```python\ndef handler(request):\n    session = lookup(request.id)\n    return stream(session)\n```\n\n"
+
+def synthetic_response(tokens: int) -> str:
+    """Builds a Markdown answer of roughly `tokens` tokens (~4 chars each)."""
+    text = ""
+    while len(text) < tokens * 4:
+        text += PARAGRAPH * 3 + CODE
+    return text[: tokens * 4]
+
+def split_chunks(text: str, size: int = 4) -> List[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+def _console() -> Console:
+    return Console(file=io.StringIO(), width=100, force_terminal=True)
+
+def run_full(chunks: List[str]) -> List[float]:
+    """Old path: rebuild and render Markdown(acc_text) on every chunk."""
+    console = _console()
+    acc = ""
+    costs = []
+    for delta in chunks:
+        t0 = time.perf_counter()
+        acc += delta
+        console.render_lines(Markdown(acc), console.options)
+        costs.append(time.perf_counter() - t0)
+    return costs
+
+def run_incremental(chunks: List[str]) -> List[float]:
+    """New path: commit finished blocks once, re-render only the open tail."""
+    console = _console()
+    renderer = IncrementalMarkdown()
+    costs = []
+    for delta in chunks:
+        t0 = time.perf_counter()
+        for block in renderer.feed(delta):
+            console.print(Markdown(block))
+        console.render_lines(Markdown(renderer.tail), console.options)
+        costs.append(time.perf_counter() - t0)
+    return costs
+
+def profile(costs: List[float], buckets: int = 5) -> List[float]:
+    """Mean per-chunk cost (µs) for each successive slice of the response."""
+    size = max(1, len(costs) // buckets)
+    return [
+        sum(costs[i:i + size]) / len(costs[i:i + size]) * 1e6
+        for i in range(0, size * buckets, size)
+    ]
+
+def report(name: str, fn: Callable[[List[str]], List[float]], chunks: List[str]):
+    means = profile(fn(chunks))
+    cells = "  ".join(f"{m:9.0f}" for m in means)
+    print(f"{name:<12} {cells}   growth x{means[-1] / means[0]:.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=2000)
+    parser.add_argument("--skip-full", action="store_true", help="Skip the quadratic baseline")
+    args = parser.parse_args()
+
+    chunks = split_chunks(synthetic_response(args.tokens))
+    print(f"{len(chunks)} chunks, mean µs/chunk per fifth of the response")
+    if not args.skip_full:
+        report("full", run_full, chunks)
+    report("incremental", run_incremental, chunks)
+
+if __name__ == "__main__":
+    main()
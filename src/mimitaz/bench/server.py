@@ -0,0 +1,213 @@
+"""
+Local stand-in for the OpenAI chat-completions and Anthropic messages APIs.
+
+    python -m mimitaz.bench.server [--port 8765] [--rate 200] [--tokens 400]
+
+Streams a synthetic Markdown answer as SSE at a configurable token rate,
+chunk size and latency, optionally failing a fraction of requests, so the
+real providers can be exercised end to end without network access.
+Routes: POST /v1/chat/completions (OpenAI format), POST /v1/messages (Anthropic).
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+from dataclasses import dataclass
+from typing import List, Optional, Set
+
+PARAGRAPH = (
+    "The handler validates the request, looks up the session and streams the "
+    "result back to the caller. Errors are mapped to **typed** responses.\n\n"
+)
+CODE = "```python\ndef handler(request):\n    session = lookup(request.id)\n    return stream(session)\n```\n\n"
+
+@dataclass
+class ServerConfig:
+    tokens: int = 400 # Tokens per response (~4 chars each)
+    rate: float = 200.0 # Tokens per second (0 = as fast as possible)
+    chunk_tokens: int = 1 # Tokens per SSE event
+    latency: float = 0.05 # Seconds before the response headers
+    error_rate: float = 0.0 # Fraction of requests answered with `error_status`
+    error_status: int = 529
+    seed: Optional[int] = None
+
+def synthetic_tokens(count: int) -> List[str]:
+    text = ""
+    while len(text) < count * 4:
+        text += PARAGRAPH * 3 + CODE
+    return [text[i:i + 4] for i in range(0, count * 4, 4)]
+
+def openai_frames(pieces: List[str]) -> List[bytes]:
+    frames = []
+    for piece in pieces:
+        chunk = {"object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+        frames.append(f"data: {json.dumps(chunk)}\n\n".encode())
+    done = {"object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+    frames.append(f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n".encode())
+    return frames
+
+def anthropic_frames(pieces: List[str]) -> List[bytes]:
+    def event(kind: str, data: dict) -> bytes:
+        return f"event: {kind}\ndata: {json.dumps(data)}\n\n".encode()
+
+    frames = [event("message_start", {"type": "message_start", "message": {"usage": {"input_tokens": 0, "output_tokens": 0}}})]
+    for piece in pieces:
+        frames.append(event("content_block_delta", {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": piece}}))
+    frames.append(event("message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn"}, "usage": {"output_tokens": len(pieces)}}))
+    frames.append(event("message_stop", {"type": "message_stop"}))
+    return frames
+
+class FakeSSEServer:
+    """Minimal HTTP/1.1 keep-alive server streaming chunked SSE responses."""
+
+    def __init__(self, config: Optional[ServerConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or ServerConfig()
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(self.config.seed)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._connections: Set[asyncio.Task] = set()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            # Idle keep-alive connections would otherwise keep their handlers waiting
+            for task in list(self._connections):
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+
+    def start_in_thread(self) -> "FakeSSEServer":
+        """Runs the server on its own loop in a daemon thread, so its CPU stays out of client measurements."""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="fake-sse-server", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop_thread(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = self._thread = None
+
+    def __enter__(self) -> "FakeSSEServer":
+        return self.start_in_thread()
+
+    def __exit__(self, *exc):
+        self.stop_thread()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                if length:
+                    await reader.readexactly(length)
+                await self._respond(method, path, writer)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            pass # Server shutting down mid-response; end the handler quietly
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _respond(self, method: str, path: str, writer: asyncio.StreamWriter):
+        config = self.config
+        self.requests += 1
+        if method == "POST" and path.endswith("/chat/completions"):
+            build = openai_frames
+        elif method == "POST" and path.endswith("/messages"):
+            build = anthropic_frames
+        else:
+            # Anything else (e.g. connection pre-warm HEAD) gets an empty 404
+            writer.write(b"HTTP/1.1 404 Not Found\r\ncontent-length: 0\r\n\r\n")
+            await writer.drain()
+            return
+
+        if config.latency:
+            await asyncio.sleep(config.latency)
+        if config.error_rate and self._random.random() < config.error_rate:
+            self.errors += 1
+            body = json.dumps({"error": {"type": "overloaded_error", "message": "Simulated failure"}}).encode()
+            writer.write(
+                f"HTTP/1.1 {config.error_status} Error\r\ncontent-type: application/json\r\n"
+                f"retry-after: 0\r\ncontent-length: {len(body)}\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+            return
+
+        tokens = synthetic_tokens(config.tokens)
+        step = max(1, config.chunk_tokens)
+        pieces = ["".join(tokens[i:i + step]) for i in range(0, len(tokens), step)]
+        writer.write(b"HTTP/1.1 200 OK\r\ncontent-type: text/event-stream\r\ntransfer-encoding: chunked\r\n\r\n")
+        interval = step / config.rate if config.rate else 0.0
+        for frame in build(pieces):
+            writer.write(b"%x\r\n%s\r\n" % (len(frame), frame))
+            await writer.drain()
+            if interval:
+                await asyncio.sleep(interval)
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tokens", type=int, default=400)
+    parser.add_argument("--rate", type=float, default=200.0)
+    parser.add_argument("--chunk", type=int, default=1, help="Tokens per SSE event")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    config = ServerConfig(tokens=args.tokens, rate=args.rate, chunk_tokens=args.chunk, latency=args.latency, error_rate=args.error_rate)
+    server = FakeSSEServer(config, port=args.port)
+
+    async def serve():
+        await server.start()
+        print(f"Serving on {server.url} (Ctrl-C to stop)")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
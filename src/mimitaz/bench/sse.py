@@ -0,0 +1,82 @@
+"""
+SSE decoding benchmark: events/sec for a synthetic OpenAI-style stream.
+
+    python -m mimitaz.bench.sse [--events 50000] [--chunk 1024]
+
+Compares the old per-line path (text decode, line split, "data: " prefix
+check, json.loads) with SSEDecoder + parse_event, fed the same byte chunks.
+Shows which JSON backend is active (orjson when installed).
+"""
+import argparse
+import json
+import time
+from typing import Callable, List
+from mimitaz.services.llm import sse
+
+def synthetic_stream(events: int) -> bytes:
+    frames = []
+    for i in range(events):
+        payload = {"id": "chatcmpl-1", "object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {"content": f"tok{i} "}}]}
+        frames.append(b"data: " + json.dumps(payload).encode() + b"\n\n")
+    frames.append(b"data: [DONE]\n\n")
+    return b"".join(frames)
+
+def split_bytes(data: bytes, size: int) -> List[bytes]:
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+def run_lines(chunks: List[bytes]) -> int:
+    """Old path: what aiter_lines + startswith("data: ") + json.loads did."""
+    count = 0
+    pending = ""
+    for chunk in chunks:
+        lines = (pending + chunk.decode("utf-8")).splitlines(keepends=True)
+        pending = lines.pop() if lines and not lines[-1].endswith("\n") else ""
+        for line in lines:
+            line = line.rstrip("\n")
+            if line.startswith("data: "):
+                data = line[6:]
+                if data == "[DONE]":
+                    return count
+                try:
+                    json.loads(data)["choices"][0]["delta"].get("content", "")
+                    count += 1
+                except Exception:
+                    continue
+    return count
+
+def run_decoder(chunks: List[bytes]) -> int:
+    """New path: byte-level SSEDecoder, JSON via the configured backend."""
+    count = 0
+    decoder = sse.SSEDecoder()
+    for chunk in chunks:
+        for event in decoder.feed(chunk):
+            if event.data == "[DONE]":
+                return count
+            sse.parse_event(event)["choices"][0]["delta"].get("content")
+            count += 1
+    return count
+
+def measure(fn: Callable[[List[bytes]], int], chunks: List[bytes], repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        count = fn(chunks)
+        best = min(best, time.perf_counter() - t0)
+    return count / best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=50000)
+    parser.add_argument("--chunk", type=int, default=1024, help="Bytes per network read")
+    args = parser.parse_args()
+
+    chunks = split_bytes(synthetic_stream(args.events), args.chunk)
+    backend = "orjson" if sse.json_loads is not json.loads else "json"
+    print(f"{args.events} events in {len(chunks)} reads of {args.chunk} bytes, JSON backend: {backend}")
+    old = measure(run_lines, chunks)
+    new = measure(run_decoder, chunks)
+    print(f"{'lines':<10} {old:12,.0f} events/s")
+    print(f"{'decoder':<10} {new:12,.0f} events/s   x{new / old:.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Cold-start benchmark: wall time of CLI invocations over the bare interpreter.
+
+    python -m mimitaz.bench.startup [--runs 15] [--budget-ms 60]
+
+Exits non-zero when `mim --version` costs more than the budget on top of
+`python -c pass`, so import-time regressions fail CI.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+# Label -> code run in a fresh interpreter
+CASES: Dict[str, str] = {
+    "python": "pass",
+    "mim --version": "import sys; sys.argv = ['mim', '--version']; from mimitaz.cli.entry import entry_point; entry_point()",
+    "mim config list": "import sys; sys.argv = ['mim', 'config', 'list']; from mimitaz.cli.entry import entry_point; entry_point()",
+    "import cli.main": "import mimitaz.cli.main",
+}
+
+def time_run(code: str, runs: int) -> float:
+    """Median wall time (ms) of running `code` in a new interpreter."""
+    samples: List[float] = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+def top_imports(code: str, limit: int = 8) -> List[str]:
+    """Slowest cumulative imports from `python -X importtime`."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        rows.append((int(parts[1]), parts[2].rstrip()))
+    rows.sort(reverse=True)
+    return [f"{us / 1000:8.1f} ms {name}" for us, name in rows[:limit]]
+
+def run(runs: int) -> Dict[str, float]:
+    return {label: time_run(code, runs) for label, code in CASES.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=60.0, help="Allowed cost of `mim --version` over the interpreter")
+    parser.add_argument("--imports", action="store_true", help="Show the slowest imports of `mim --version`")
+    args = parser.parse_args()
+
+    results = run(args.runs)
+    base = results["python"]
+    for label, ms in results.items():
+        extra = "" if label == "python" else f"  (+{ms - base:.1f})"
+        print(f"{label:<18} {ms:8.1f} ms{extra}")
+
+    if args.imports:
+        print()
+        print("\n".join(top_imports(CASES["mim --version"])))
+
+    overhead = results["mim --version"] - base
+    if overhead > args.budget_ms:
+        print(f"FAIL: mim --version costs {overhead:.1f} ms over the interpreter (budget {args.budget_ms:.0f} ms)")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+End-to-end streaming benchmark, run by `mim bench`.
+
+Starts the local fake SSE server (mimitaz.bench.server) and drives the real
+GenericOpenAIProvider / AnthropicProvider -> framed() -> UI.print_stream path against it,
+measuring time-to-first-token, tokens/sec and client CPU per token, plus
+cold start (`mim --version`) and peak RSS. Runs offline, so it fits in CI;
+results can be saved and compared against a baseline.
+"""
+import asyncio
+import io
+import json
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from mimitaz.bench.server import FakeSSEServer, ServerConfig
+from mimitaz.services.llm.provider import LLMProvider, Message
+
+PROVIDER_PATHS = {
+    "openai": "/v1/chat/completions",
+    "anthropic": "/v1/messages",
+}
+
+# Metric -> True when higher is better
+METRICS = {
+    "cold_start_ms": False,
+    "peak_rss_mb": False,
+    "ttft_ms": False,
+    "tokens_per_s": True,
+    "cpu_us_per_token": False,
+}
+
+@dataclass
+class CaseResult:
+    ttft_ms: float
+    tokens_per_s: float
+    cpu_us_per_token: float # Client-side CPU: decoding + rendering
+    wall_ms: float
+
+def make_provider(name: str, url: str) -> LLMProvider:
+    endpoint = url + PROVIDER_PATHS[name]
+    if name == "anthropic":
+        from mimitaz.services.llm.providers.anthropic import AnthropicProvider
+        return AnthropicProvider(base_url=endpoint)
+    from mimitaz.services.llm.providers.generic import GenericOpenAIProvider
+    return GenericOpenAIProvider(base_url=endpoint)
+
+@contextmanager
+def offscreen_console() -> Iterator[None]:
+    """Points the UI at an in-memory terminal so rendering is measured, not the real tty."""
+    from rich.console import Console
+    from mimitaz.cli import ui
+
+    saved = ui.console, ui.UI.raw
+    ui.console = Console(file=io.StringIO(), force_terminal=True, width=100, theme=ui.glm_theme)
+    ui.UI.raw = False
+    try:
+        yield
+    finally:
+        ui.console, ui.UI.raw = saved
+
+def peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        return None # Not available on Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def cold_start_ms(runs: int) -> float:
+    from mimitaz.bench.startup import CASES, time_run
+    return time_run(CASES["mim --version"], runs)
+
+async def run_case(provider: LLMProvider, tokens: int, runs: int) -> CaseResult:
+    from pydantic import SecretStr
+    from mimitaz.cli.ui import UI
+    from mimitaz.config import settings
+    from mimitaz.services.http import clients
+    from mimitaz.services.llm.pipeline import framed
+
+    messages = [Message(role="user", content="Explain the request handler.")]
+    samples: List[CaseResult] = []
+    try:
+        # One warm-up run opens the pooled connection, as in a REPL session
+        for i in range(runs + 1):
+            cpu = time.thread_time()
+            started = time.perf_counter()
+            # Through the same reader/renderer pipeline as `mim` itself
+            stream = framed(provider.stream_chat(messages=messages, model="bench", api_key=SecretStr("bench")), settings.render_fps, settings.render_queue)
+            result = await UI.print_stream(stream, started=started)
+            wall = time.perf_counter() - started
+            cpu = time.thread_time() - cpu
+            if i == 0:
+                continue
+            ttft = result.ttft or wall
+            samples.append(CaseResult(
+                ttft_ms=ttft * 1000,
+                tokens_per_s=tokens / max(wall - ttft, 1e-9),
+                cpu_us_per_token=cpu / tokens * 1e6,
+                wall_ms=wall * 1000,
+            ))
+    finally:
+        await clients.aclose()
+
+    return CaseResult(**{
+        field: statistics.median(getattr(s, field) for s in samples)
+        for field in CaseResult.__dataclass_fields__
+    })
+
+def run_suite(config: ServerConfig, providers: List[str], runs: int = 5, cold_runs: int = 5) -> Dict:
+    results: Dict = {"cold_start_ms": cold_start_ms(cold_runs) if cold_runs else None}
+    with FakeSSEServer(config) as server, offscreen_console():
+        for name in providers:
+            provider = make_provider(name, server.url)
+            results[name] = asdict(asyncio.run(run_case(provider, config.tokens, runs)))
+        results["server"] = {"requests": server.requests, "errors": server.errors}
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+def flatten(results: Dict) -> Dict[str, float]:
+    """{"openai": {"ttft_ms": 1}} -> {"openai.ttft_ms": 1}, keeping only tracked metrics."""
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update({f"{key}.{k}": v for k, v in value.items() if k in METRICS})
+        elif key in METRICS and value is not None:
+            flat[key] = value
+    return flat
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Metrics that got worse than the baseline by more than `tolerance` (a fraction)."""
+    regressions = []
+    current, previous = flatten(results), flatten(baseline)
+    for key, value in current.items():
+        before = previous.get(key)
+        if not before:
+            continue
+        higher_is_better = METRICS[key.rsplit(".", 1)[-1]]
+        change = (before - value) / before if higher_is_better else (value - before) / before
+        if change > tolerance:
+            regressions.append(f"{key}: {before:.1f} -> {value:.1f} ({change:+.0%} worse)")
+    return regressions
+
+def load_baseline(path: Path) -> Dict:
+    return json.loads(Path(path).read_text())
+
+def save_results(results: Dict, path: Path):
+    Path(path).write_text(json.dumps(results, indent=2) + "\n")
@@ -0,0 +1,69 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+import typer
+from mimitaz.config import settings
+from mimitaz.services.llm.factory import get_provider
+from mimitaz.services.llm.cache import with_cache
+from mimitaz.services.llm.batch import run_batch, limiter_for, BatchResult
+from mimitaz.cli.ui import UI
+
+def batch_command(
+    input: str = typer.Argument("-", help="JSONL file of prompts ('-' for stdin)"),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Write results here instead of stdout"),
+    concurrency: int = typer.Option(8, "--concurrency", "-c", help="Requests in flight at once"),
+    rpm: Optional[float] = typer.Option(None, "--rpm", help="Requests per minute limit (0 = unlimited)"),
+    tpm: Optional[float] = typer.Option(None, "--tpm", help="Tokens per minute limit (0 = unlimited)"),
+    ordered: bool = typer.Option(False, "--ordered", help="Emit results in input order instead of completion order"),
+):
+    """
+    Run many one-shot prompts concurrently from JSONL.
+    Each line is a JSON string or an object with "prompt" or "messages"
+    (plus optional "id", "system", "model", "temperature").
+    """
+    UI.raw = True # Diagnostics to stderr; stdout carries results only
+    try:
+        asyncio.run(run_batch_command(input, output, concurrency, rpm, tpm, ordered))
+    except (ValueError, OSError) as e: # Bad input, or an input/output file that cannot be opened
+        UI.print_system_message(f"{e}", type="error")
+        raise typer.Exit(1)
+
+async def run_batch_command(input: str, output: Optional[Path], concurrency: int, rpm: Optional[float], tpm: Optional[float], ordered: bool):
+    from mimitaz.services.http import clients
+
+    provider = with_cache(get_provider(), settings.provider)
+    api_key = settings.get_api_key()
+    limiter = limiter_for(
+        settings.provider,
+        rpm=settings.batch_rpm if rpm is None else rpm,
+        tpm=settings.batch_tpm if tpm is None else tpm,
+    )
+
+    source = sys.stdin if input == "-" else open(input, encoding="utf-8")
+    sink = open(output, "w", encoding="utf-8") if output else sys.stdout
+    failed = 0
+
+    def emit(result: BatchResult):
+        nonlocal failed
+        failed += result.error is not None
+        sink.write(result.to_json() + "\n")
+        sink.flush() # Each result is usable downstream as soon as it lands
+
+    started = time.perf_counter()
+    try:
+        count = await run_batch(
+            provider, source, settings.model, api_key, emit,
+            concurrency=concurrency, limiter=limiter, ordered=ordered,
+        )
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+        await clients.aclose()
+
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed else 0.0
+    UI.print_system_message(f"{count} prompts ({failed} failed) in {elapsed:.1f}s • {rate:.1f}/s")
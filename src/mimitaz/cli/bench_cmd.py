@@ -0,0 +1,64 @@
+import json
+from pathlib import Path
+from typing import Optional
+import typer
+from mimitaz.cli.ui import console
+
+def bench_command(
+    provider: str = typer.Option("all", "--provider", "-p", help="openai, anthropic or all"),
+    runs: int = typer.Option(5, "--runs", "-n", help="Measured requests per provider"),
+    tokens: int = typer.Option(400, "--tokens", help="Tokens per response"),
+    rate: float = typer.Option(0.0, "--rate", help="Server token rate per second (0 = unthrottled)"),
+    chunk: int = typer.Option(1, "--chunk", help="Tokens per SSE event"),
+    latency: float = typer.Option(0.05, "--latency", help="Server delay before headers (seconds)"),
+    error_rate: float = typer.Option(0.0, "--error-rate", help="Fraction of requests failed with 529"),
+    cold_runs: int = typer.Option(5, "--cold-runs", help="Cold-start samples (0 to skip)"),
+    as_json: bool = typer.Option(False, "--json", help="Print results as JSON"),
+    save: Optional[Path] = typer.Option(None, "--save", help="Write results to a JSON file (a future baseline)"),
+    baseline: Optional[Path] = typer.Option(None, "--baseline", help="Fail if any metric regressed against this file"),
+    tolerance: float = typer.Option(0.25, "--tolerance", help="Allowed regression vs. the baseline (fraction)"),
+):
+    """
+    Benchmark the streaming path against a local fake OpenAI/Anthropic server.
+    Runs offline; use --save and --baseline to catch regressions in CI.
+    """
+    from mimitaz.bench.server import ServerConfig
+    from mimitaz.bench.stream import PROVIDER_PATHS, run_suite, compare, load_baseline, save_results
+
+    providers = list(PROVIDER_PATHS) if provider == "all" else [provider]
+    unknown = [p for p in providers if p not in PROVIDER_PATHS]
+    if unknown:
+        console.print(f"[error]Unknown provider '{unknown[0]}'. Use: {', '.join(PROVIDER_PATHS)} or all[/]")
+        raise typer.Exit(1)
+
+    config = ServerConfig(tokens=tokens, rate=rate, chunk_tokens=chunk, latency=latency, error_rate=error_rate, seed=0)
+    results = run_suite(config, providers, runs=runs, cold_runs=cold_runs)
+
+    if as_json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results, providers)
+    if save:
+        save_results(results, save)
+
+    if baseline:
+        regressions = compare(results, load_baseline(baseline), tolerance)
+        for line in regressions:
+            console.print(f"[error]REGRESSION {line}[/]")
+        if regressions:
+            raise typer.Exit(1)
+        console.print(f"[info]No regressions beyond {tolerance:.0%} of {baseline}[/]")
+
+def print_results(results: dict, providers: list):
+    if results.get("cold_start_ms") is not None:
+        console.print(f"cold start      {results['cold_start_ms']:8.1f} ms  (mim --version)")
+    if results.get("peak_rss_mb") is not None:
+        console.print(f"peak RSS        {results['peak_rss_mb']:8.1f} MB")
+    console.print()
+    console.print(f"[dim]{'provider':<12}{'TTFT ms':>10}{'tok/s':>12}{'CPU µs/tok':>13}{'wall ms':>10}[/]")
+    for name in providers:
+        r = results[name]
+        console.print(f"{name:<12}{r['ttft_ms']:>10.1f}{r['tokens_per_s']:>12.0f}{r['cpu_us_per_token']:>13.1f}{r['wall_ms']:>10.1f}")
+    server = results.get("server", {})
+    if server.get("errors"):
+        console.print(f"[dim]{server['errors']} of {server['requests']} requests failed and were retried[/]")
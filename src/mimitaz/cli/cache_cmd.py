@@ -0,0 +1,31 @@
+import typer
+from rich import print as rprint
+from mimitaz.services.llm.cache import ResponseCache
+
+cache_app = typer.Typer(help="Manage the local response cache")
+
+def format_size(size: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+@cache_app.command("stats")
+def cache_stats():
+    """Show cache size and hit rate."""
+    cache = ResponseCache.from_settings()
+    stats = cache.stats()
+    lookups = stats.hits + stats.misses
+    rate = f"{stats.hits / lookups:.0%}" if lookups else "n/a"
+
+    rprint(f"[bold]Response cache ({cache.directory}):[/bold]")
+    rprint(f"  [cyan]entries[/cyan] = {stats.entries}")
+    rprint(f"  [cyan]size[/cyan] = {format_size(stats.bytes)} / {format_size(stats.max_bytes)}")
+    rprint(f"  [cyan]hits[/cyan] = {stats.hits}  [cyan]misses[/cyan] = {stats.misses}  [dim]({rate})[/dim]")
+
+@cache_app.command("clear")
+def cache_clear():
+    """Delete all cached responses."""
+    removed = ResponseCache.from_settings().clear()
+    rprint(f"[green]✓ Cleared {removed} cached responses.[/green]")
@@ -2,7 +2,6 @@ import typer
 import json
 from pathlib import Path
 from rich import print as rprint
-from mimitaz.config import settings
 
 # Initialize Typer Sub-App for Config
 config_app = typer.Typer(help="Manage configuration (GLM Style)")
@@ -17,9 +16,9 @@ def load_config_file() -> dict:
     except Exception:
         return {}
 
-def save_config_file(data: dict):
-    # Merge with existing
-    current = load_config_file()
+def save_config_file(data: dict, replace: bool = False):
+    # Merge with existing, unless `data` is the whole new config (e.g. after removing keys)
+    current = {} if replace else load_config_file()
     current.update(data)
     CONFIG_FILE.write_text(json.dumps(current, indent=2))
 
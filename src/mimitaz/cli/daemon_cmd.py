@@ -0,0 +1,77 @@
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+import typer
+from rich import print as rprint
+from mimitaz.config import daemon_socket_path
+from mimitaz.cli.forward import connect
+
+daemon_app = typer.Typer(help="Keep a warm background process for fast one-shot prompts")
+
+LOG_FILE = Path.home() / ".mimitaz" / "daemon.log"
+
+def control(op: str, timeout: float = 2.0) -> Optional[dict]:
+    """Sends a control request (ping, stop) to the running daemon; None if there is none."""
+    sock = connect()
+    if sock is None:
+        return None
+    with sock:
+        sock.settimeout(timeout)
+        sock.sendall(json.dumps({"op": op}).encode("utf-8") + b"\n")
+        line = sock.makefile("rb").readline()
+    return json.loads(line) if line else None
+
+@daemon_app.command("start")
+def daemon_start(
+    foreground: bool = typer.Option(False, "--foreground", "-f", help="Run in this terminal instead of detaching"),
+):
+    """Start the daemon. `mim "..."` uses it automatically while it runs."""
+    if control("ping") is not None:
+        rprint(f"[dim]Daemon already running on {daemon_socket_path()}[/dim]")
+        return
+    if foreground:
+        from mimitaz.services.daemon import main
+        rprint(f"[cyan]Listening on {daemon_socket_path()}[/cyan] (Ctrl-C to stop)")
+        try:
+            main()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(LOG_FILE, "ab") as log:
+        subprocess.Popen(
+            [sys.executable, "-m", "mimitaz.services.daemon"],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=log,
+            start_new_session=True, # Survives the terminal that started it
+        )
+    # Wait until it accepts connections so the next `mim` call already uses it
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        status = control("ping")
+        if status is not None:
+            rprint(f"[green]✔[/green] Daemon started (pid {status['pid']}) on {daemon_socket_path()}")
+            return
+        time.sleep(0.05)
+    rprint(f"[red]Daemon did not start. See {LOG_FILE}[/red]")
+    raise typer.Exit(1)
+
+@daemon_app.command("stop")
+def daemon_stop():
+    """Stop the daemon; `mim` goes back to running in-process."""
+    if control("stop") is None:
+        rprint("[dim]Daemon is not running.[/dim]")
+        return
+    rprint("[green]✔[/green] Daemon stopped")
+
+@daemon_app.command("status")
+def daemon_status():
+    """Show whether the daemon is running."""
+    status = control("ping")
+    if status is None:
+        rprint("[dim]Daemon is not running.[/dim] Start it with: mim daemon start")
+        raise typer.Exit(1)
+    rprint(f"pid {status['pid']} • up {status['uptime']:.0f}s • {status['requests']} requests • {daemon_socket_path()}")
@@ -0,0 +1,126 @@
+import asyncio
+from typing import List, Optional
+import typer
+from rich import print as rprint
+from mimitaz.config import settings, ENDPOINT_PREFIX
+from mimitaz.cli.config_cmd import load_config_file, save_config_file
+
+endpoint_app = typer.Typer(help="Manage self-hosted OpenAI-compatible endpoints (llama.cpp, vLLM, Ollama)")
+
+def get_endpoint(name: str):
+    from mimitaz.services.llm.providers.endpoint import EndpointProvider
+    if name not in settings.endpoints:
+        rprint(f"[red]No endpoint '{name}'. Run: mim endpoint add {name} http://localhost:8080/v1[/red]")
+        raise typer.Exit(1)
+    return EndpointProvider(name)
+
+@endpoint_app.command("add")
+def endpoint_add(
+    name: str = typer.Argument(..., help="Name to use as the provider, e.g. 'local'"),
+    base_url: str = typer.Argument(..., help="API root, e.g. http://localhost:11434/v1"),
+    model: Optional[str] = typer.Option(None, "--model", "-m", help="Model served by the endpoint"),
+    key: Optional[str] = typer.Option(None, "--key", help="API key, if the server wants one"),
+    header: List[str] = typer.Option([], "--header", "-H", help="Extra header 'Name: value' (repeatable)"),
+    keep_alive: Optional[str] = typer.Option(None, "--keep-alive", help="Keep the model loaded this long, e.g. 30m or -1"),
+    read_timeout: Optional[float] = typer.Option(None, "--read-timeout", help="Seconds to wait for data"),
+    connect_timeout: Optional[float] = typer.Option(None, "--connect-timeout"),
+    gzip: Optional[bool] = typer.Option(None, "--gzip/--no-gzip", help="Compress large request bodies (the server must accept gzip)"),
+    use: bool = typer.Option(False, "--use", help="Also make it the active provider"),
+):
+    """Define (or update) an endpoint profile."""
+    from mimitaz.services.llm.factory import PROVIDERS
+    if name in PROVIDERS:
+        rprint(f"[red]'{name}' is a built-in provider; pick another name.[/red]")
+        raise typer.Exit(1)
+
+    prefix = f"{ENDPOINT_PREFIX}{name}."
+    values = {"base_url": base_url, "model": model, "api_key": key, "keep_alive": keep_alive,
+              "read_timeout": read_timeout, "connect_timeout": connect_timeout, "gzip": gzip}
+    data = {prefix + field: value for field, value in values.items() if value is not None}
+    for item in header:
+        header_name, sep, value = item.partition(":")
+        if not sep:
+            rprint(f"[red]Header '{item}' is not in 'Name: value' form.[/red]")
+            raise typer.Exit(1)
+        data[f"{prefix}headers.{header_name.strip()}"] = value.strip()
+    if use:
+        data["provider"] = name
+    save_config_file(data)
+    rprint(f"[green]✓ Endpoint '{name}' saved[/green] [dim]({base_url})[/dim]")
+
+@endpoint_app.command("remove")
+def endpoint_remove(name: str):
+    """Delete an endpoint profile."""
+    prefix = f"{ENDPOINT_PREFIX}{name}."
+    data = load_config_file()
+    kept = {k: v for k, v in data.items() if not k.startswith(prefix)}
+    if isinstance(kept.get("endpoints"), dict):
+        kept["endpoints"].pop(name, None)
+    if kept == data:
+        rprint(f"[red]No endpoint '{name}'.[/red]")
+        raise typer.Exit(1)
+    save_config_file(kept, replace=True)
+    rprint(f"[green]✓ Endpoint '{name}' removed.[/green]")
+
+@endpoint_app.command("list")
+def endpoint_list():
+    """List endpoint profiles."""
+    if not settings.endpoints:
+        rprint("[dim]No endpoints. Run: mim endpoint add local http://localhost:11434/v1 --model llama3.1[/dim]")
+        return
+    for name, profile in settings.endpoints.items():
+        active = "[green]→[/green]" if name == settings.provider else " "
+        extras = [f"model {profile.model}"] if profile.model else []
+        if profile.keep_alive:
+            extras.append(f"keep_alive {profile.keep_alive}")
+        if profile.headers:
+            extras.append(f"{len(profile.headers)} header(s)")
+        rprint(f" {active} [cyan]{name}[/cyan]  {profile.base_url}  [dim]{' · '.join(extras)}[/dim]")
+
+@endpoint_app.command("check")
+def endpoint_check(name: Optional[str] = typer.Argument(None, help="Default: every endpoint")):
+    """Probe endpoints: reachable, round-trip time, and whether the model is served."""
+    from mimitaz.services.http import clients
+    names = [name] if name else list(settings.endpoints)
+    endpoints = [get_endpoint(n) for n in names]
+
+    async def run():
+        try:
+            return await asyncio.gather(*(e.probe() for e in endpoints))
+        finally:
+            await clients.aclose()
+
+    failed = False
+    for endpoint, health in zip(endpoints, asyncio.run(run())):
+        if not health.ok:
+            failed = True
+            detail = f"HTTP {health.status}" if health.status else health.error
+            rprint(f"[red]✗[/red] [cyan]{endpoint.name}[/cyan]  {detail}")
+            continue
+        line = f"[green]✓[/green] [cyan]{endpoint.name}[/cyan]  {health.latency * 1000:.0f} ms"
+        if health.models and endpoint.model not in health.models:
+            line += f"  [yellow]'{endpoint.model}' not listed ({', '.join(health.models[:5])})[/yellow]"
+        elif health.models:
+            line += f"  [dim]serves {endpoint.model}[/dim]"
+        rprint(line)
+    if failed:
+        raise typer.Exit(1)
+
+@endpoint_app.command("warm")
+def endpoint_warm(name: Optional[str] = typer.Argument(None, help="Default: the active provider")):
+    """Load the endpoint's model into memory now (pinned for keep_alive)."""
+    from mimitaz.services.http import clients
+    endpoint = get_endpoint(name or settings.provider)
+
+    async def run():
+        try:
+            return await endpoint.warm_up()
+        finally:
+            await clients.aclose()
+
+    try:
+        seconds = asyncio.run(run())
+    except Exception as e:
+        rprint(f"[red]✗ {endpoint.name}: {e}[/red]")
+        raise typer.Exit(1)
+    rprint(f"[green]✓ {endpoint.model} ready on '{endpoint.name}'[/green] [dim]({seconds:.2f}s)[/dim]")
@@ -0,0 +1,73 @@
+import re
+import sys
+
+# First arguments handled by Typer itself; anything else is treated as a prompt
+KNOWN_COMMANDS = ["config", "token", "cache", "route", "endpoint", "batch", "bench", "index", "sessions", "daemon", "chat"]
+KNOWN_FLAGS = ["--help", "--version", "-v"]
+# Global options that may precede an implicit prompt: mim --debug "hello"
+GLOBAL_OPTIONS = ["--debug"]
+# Accepted values after --resume; anything else means "resume the latest"
+RESUME_ID_RE = re.compile(r"^([0-9a-f]{8}|last)$")
+
+def print_version():
+    from importlib.metadata import version, PackageNotFoundError
+    try:
+        v = version("mimitaz")
+    except PackageNotFoundError:
+        v = "dev"
+    print(f"mimitaz version {v}")
+
+def entry_point():
+    """
+    Manual dispatch shim to support 'mim <query>' syntax alongside subcommands.
+    Kept free of heavy imports: typer, rich and pydantic load only once a
+    command actually needs them.
+    """
+    args = sys.argv[1:]
+
+    # Fast path: no need to build the Typer app just to print the version
+    if args and args[0] in ("--version", "-v"):
+        print_version()
+        return
+
+    # A running `mim daemon` answers plain prompts; nothing heavy is imported here
+    if not args or (args[0] not in KNOWN_COMMANDS and args[0] not in KNOWN_FLAGS):
+        from mimitaz.cli.forward import forward
+        code = forward(args)
+        if code is not None:
+            sys.exit(code)
+
+    from mimitaz.cli.main import app
+
+    # Early exit for no args -> REPL
+    if not args:
+        # Route to 'chat' without args -> REPL
+        sys.argv = [sys.argv[0], "chat"]
+        app()
+        return
+
+    # Global options stay in front of the (possibly implicit) subcommand
+    global_opts = []
+    while args and args[0] in GLOBAL_OPTIONS:
+        global_opts.append(args.pop(0))
+
+    # `mim --resume [id]`: the id is optional
+    if "--resume" in args:
+        i = args.index("--resume")
+        if i + 1 >= len(args) or not RESUME_ID_RE.match(args[i + 1]):
+            args.insert(i + 1, "last")
+
+    # Check for known commands or flags
+    first_arg = args[0] if args else "chat"
+
+    if first_arg in KNOWN_COMMANDS or first_arg in KNOWN_FLAGS:
+        # Standard Typer behavior
+        app(args=global_opts + args)
+    else:
+        # Treat as implicit 'chat' command
+        # Transform: mim "hello" -> mim chat "hello"
+        # We explicitly pass the args to avoid sys.argv ambiguity
+        app(args=global_opts + ["chat"] + args)
+
+if __name__ == "__main__":
+    entry_point()
@@ -0,0 +1,184 @@
+"""
+Thin-client side of `mim daemon`.
+
+When a daemon is listening, one-shot prompts are sent to it over a Unix
+socket and the answer is streamed back, skipping the settings/httpx imports
+and the TLS handshake. Only stdlib is imported on the raw (piped stdout)
+path. Anything the daemon does not handle -- or no daemon at all -- falls
+back to the normal in-process CLI.
+
+Protocol: JSON lines. The client sends one request object; with
+"stdin": true it is followed by the piped input in {"in": text} pieces and
+{"eof": true}. The daemon answers {"ok": true, "flush": policy}, then
+{"d": delta} per chunk, {"note": text} per code block written to disk,
+optionally {"stats": line}, and finally {"end": true} or {"error": message}.
+"""
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+from typing import List, Optional
+from mimitaz.config import daemon_socket_path
+
+# Chat options the daemon understands; anything else runs in-process
+FORWARD_FLAGS = {"--raw", "--no-raw", "--stats"}
+# Characters of piped input per message. Sent as UTF-8 (at most 4 bytes per character) with only
+# control characters escaped (6 bytes), a piece stays under the daemon's 64 KiB line limit.
+STDIN_PIECE = 8192
+
+def connect(path: Optional[Path] = None, timeout: float = 0.5) -> Optional[socket.socket]:
+    """A connection to the daemon, or None when none is listening."""
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    path = path or daemon_socket_path()
+    if not path.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return sock
+
+def parse_request(args: List[str]) -> Optional[dict]:
+    """The daemon request for `mim [options] prompt...`, or None if it must run in-process."""
+    from mimitaz.services.ingest import should_read_stdin
+
+    request = {"op": "chat", "raw": None, "flush": None, "stats": False, "cwd": os.getcwd()}
+    prompt = []
+    dash = False
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == "--":
+            prompt.extend(a for a in args[i + 1:] if a != "-")
+            dash = dash or "-" in args[i + 1:]
+            break
+        if arg in FORWARD_FLAGS:
+            if arg == "--stats":
+                request["stats"] = True
+            else:
+                request["raw"] = arg == "--raw"
+        elif arg == "--flush" and i + 1 < len(args):
+            request["flush"] = args[i + 1]
+            i += 1
+        elif arg.startswith("--flush="):
+            request["flush"] = arg.split("=", 1)[1]
+        elif arg == "-":
+            dash = True
+        elif arg.startswith("-"):
+            return None
+        else:
+            prompt.append(arg)
+        i += 1
+
+    request["prompt"] = " ".join(prompt).strip()
+    request["stdin"] = should_read_stdin(bool(request["prompt"]), dash)
+    if not request["prompt"] and not request["stdin"]:
+        return None # REPL
+    return request
+
+def forward(args: List[str]) -> Optional[int]:
+    """
+    Runs `mim <args>` through the daemon. Returns the exit code, or None
+    when the request should be handled in-process instead.
+    """
+    if os.environ.get("MIMITAZ_NO_DAEMON"):
+        return None
+    request = parse_request(args)
+    if request is None:
+        return None
+    sock = connect()
+    if sock is None:
+        return None
+
+    piped = request["stdin"]
+    with sock:
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        if piped:
+            try:
+                send_stdin(sock)
+            except ConnectionError:
+                pass # The daemon stopped reading; its error follows
+        stream = sock.makefile("rb")
+        header = stream.readline()
+        if not header:
+            if piped:
+                print("Error: the mim daemon closed the connection", file=sys.stderr)
+                return 1
+            return None # Daemon went away before accepting; run locally
+        flush_policy = request["flush"] or json.loads(header).get("flush", "line")
+        raw = (not sys.stdout.isatty()) if request["raw"] is None else request["raw"]
+        if raw:
+            return write_raw(stream, flush_policy)
+        return render(request["prompt"], stream)
+
+def send_stdin(sock: socket.socket):
+    """Streams piped input to the daemon piece by piece, never holding all of it."""
+    if hasattr(sys.stdin, "reconfigure"):
+        sys.stdin.reconfigure(errors="replace")
+    while True:
+        piece = sys.stdin.read(STDIN_PIECE)
+        if not piece:
+            break
+        sock.sendall(json.dumps({"in": piece}, ensure_ascii=False).encode("utf-8") + b"\n")
+    sock.sendall(b'{"eof": true}\n')
+
+def write_raw(stream, flush_policy: str) -> int:
+    out = sys.stdout
+    wrote = ""
+    code = 0
+    for line in stream:
+        event = json.loads(line)
+        if "d" in event:
+            wrote = event["d"] or wrote
+            out.write(event["d"])
+            if flush_policy == "chunk" or (flush_policy == "line" and "\n" in event["d"]):
+                out.flush()
+        elif "stats" in event:
+            print(f">>> {event['stats']}", file=sys.stderr)
+        elif "note" in event:
+            print(f">>> {event['note']}", file=sys.stderr)
+        elif "error" in event:
+            print(f">>> Error: {event['error']}", file=sys.stderr)
+            code = 1
+    if wrote and not wrote.endswith("\n"):
+        out.write("\n")
+    out.flush()
+    return code
+
+def render(prompt: str, stream) -> int:
+    """Terminal output: the normal Markdown renderer, fed from the socket."""
+    import asyncio
+    from mimitaz.cli.ui import UI
+    from mimitaz.services.llm.provider import StreamChunk
+
+    outcome = {"code": 0, "stats": None}
+
+    async def chunks():
+        loop = asyncio.get_running_loop()
+        while True:
+            line = await loop.run_in_executor(None, stream.readline)
+            if not line:
+                return
+            event = json.loads(line)
+            if "d" in event:
+                yield StreamChunk(delta=event["d"])
+            elif "stats" in event:
+                outcome["stats"] = event["stats"]
+            elif "note" in event:
+                UI.print_system_message(event["note"])
+            elif "error" in event:
+                outcome["code"] = 1
+                UI.print_system_message(f"Error: {event['error']}", type="error")
+
+    if prompt:
+        UI.print_user_message(prompt)
+    asyncio.run(UI.print_stream(chunks()))
+    if outcome["stats"]:
+        UI.print_system_message(outcome["stats"], type="info")
+    return outcome["code"]
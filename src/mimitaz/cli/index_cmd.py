@@ -0,0 +1,30 @@
+from pathlib import Path
+from typing import Optional
+import typer
+from rich import print as rprint
+from mimitaz.services.index import CodeIndex
+
+def index_command(
+    path: Path = typer.Argument(Path("."), help="Directory inside the project to index"),
+    rebuild: bool = typer.Option(False, "--rebuild", help="Re-read every file instead of only changed ones"),
+    search: Optional[str] = typer.Option(None, "--search", "-s", help="Show the snippets a question would retrieve"),
+    k: int = typer.Option(6, "--top-k", "-k", help="Results for --search"),
+):
+    """
+    Build or update the local code index used by `mim --context "..."`.
+    Only files changed since the last run are re-read.
+    """
+    index = CodeIndex.for_path(path)
+    if search is not None:
+        if not index.exists:
+            rprint(f"[red]No index for {index.root}. Run: mim index[/red]")
+            raise typer.Exit(1)
+        for path, start, end, score in index.search(search, k):
+            rprint(f"  [cyan]{score:6.2f}[/cyan]  {path}:{start}-{end}")
+        return
+
+    stats = index.update(rebuild=rebuild)
+    rprint(
+        f"[green]✔[/green] Indexed {index.root}: {stats.files} files, {stats.chunks} snippets "
+        f"[dim]({stats.indexed} read, {stats.removed} removed, {stats.segments} segments, {stats.seconds:.2f}s)[/dim]"
+    )
@@ -1,14 +1,37 @@
 import typer
 import asyncio
-import sys
+import signal
 from rich import print as rprint
 from mimitaz.config import settings
 from mimitaz.services.llm.factory import get_provider
-from mimitaz.services.llm.provider import Message
+from mimitaz.services.llm.provider import Message, StreamChunk
+from mimitaz.services.llm.cache import with_cache
+from mimitaz.services.llm.recording import with_recording
 from mimitaz.cli.ui import UI
+from mimitaz.cli.reader import LineReader
 from mimitaz.cli.config_cmd import config_app
 from mimitaz.cli.token_cmd import token_app
-from typing import Optional, List
+from mimitaz.cli.cache_cmd import cache_app
+from mimitaz.cli.route_cmd import route_app
+from mimitaz.cli.endpoint_cmd import endpoint_app
+from mimitaz.cli.batch_cmd import batch_command
+from mimitaz.cli.bench_cmd import bench_command
+from mimitaz.cli.sessions_cmd import sessions_app
+from mimitaz.cli.daemon_cmd import daemon_app
+from mimitaz.cli.index_cmd import index_command
+from mimitaz.cli.entry import entry_point
+from mimitaz.services import ingest
+from mimitaz.services.sessions import SessionStore
+from mimitaz.services.llm.tokens import estimate_tokens, context_window
+from mimitaz.services.llm.context import ConversationContext, provider_summarizer
+from mimitaz.services.llm.trace import RequestTrace, start_trace, end_trace, traced
+from mimitaz.services.llm.codeblocks import Block, extract_blocks
+from mimitaz.services.llm.pipeline import framed
+from pathlib import Path
+from typing import AsyncGenerator, AsyncIterator, Optional, List, Iterable
+
+# Network-only modules (httpx, provider classes) are imported inside the
+# coroutines that use them so subcommands like `mim config` start fast.
 
 # Core Typer App
 app = typer.Typer(
@@ -20,20 +43,66 @@ app = typer.Typer(
 
 app.add_typer(config_app, name="config")
 app.add_typer(token_app, name="token")
+app.add_typer(cache_app, name="cache")
+app.add_typer(route_app, name="route")
+app.add_typer(endpoint_app, name="endpoint")
+app.add_typer(sessions_app, name="sessions")
+app.add_typer(daemon_app, name="daemon")
+app.command("batch")(batch_command)
+app.command("bench")(bench_command)
+app.command("index")(index_command)
 
 # --- Commands ---
 
 @app.command("chat")
 def chat_command(
     ctx: typer.Context,
-    prompt: List[str] = typer.Argument(None, help="Input prompt"),
+    prompt: List[str] = typer.Argument(None, help="Input prompt ('-' also reads piped stdin)"),
+    raw: Optional[bool] = typer.Option(None, "--raw/--no-raw", help="Plain text output without formatting (default: on when stdout is not a terminal)"),
+    flush: Optional[str] = typer.Option(None, "--flush", help="Raw output flush policy: chunk, line or end"),
+    cache: Optional[bool] = typer.Option(None, "--cache/--no-cache", help="Replay identical requests from the local response cache"),
+    resume: Optional[str] = typer.Option(None, "--resume", help="Resume a saved REPL session by id (default: the latest)"),
+    stats: bool = typer.Option(False, "--stats", help="Print connect/headers/first-token/... timings after each answer"),
+    trace_file: Optional[str] = typer.Option(None, "--trace-file", help="Append per-request timing spans to this JSON-lines file"),
+    record: Optional[str] = typer.Option(None, "--record", help="Save every response stream, with timing, to this file"),
+    replay: Optional[str] = typer.Option(None, "--replay", help="Answer from a --record file instead of a provider"),
+    replay_speed: Optional[str] = typer.Option(None, "--replay-speed", help="Replay pacing: real, max or a factor like 2x"),
+    context: bool = typer.Option(False, "--context", help="Attach relevant snippets from the project index (see: mim index)"),
+    output_dir: Optional[str] = typer.Option(None, "--output-dir", "-o", help="Write each fenced code block to a file in this directory as soon as it is complete"),
 ):
     """Internal command to handle one-shot queries."""
-    text = " ".join(prompt).strip()
-    if text:
-        asyncio.run(run_processing(text))
+    if cache is not None:
+        settings.cache_enabled = cache
+    if stats:
+        settings.trace_stats = True
+    if trace_file:
+        settings.trace_file = trace_file
+    if record:
+        settings.record_file = record
+    if replay:
+        settings.provider = "replay"
+        settings.replay_file = replay
+    if replay_speed:
+        settings.replay_speed = replay_speed
+    if context:
+        settings.index_context = True
+    if output_dir:
+        settings.extract_dir = output_dir
+    try:
+        UI.configure_output(raw=raw, flush_policy=flush or settings.flush_policy)
+    except ValueError as e:
+        UI.print_system_message(f"{e}", type="error")
+        raise typer.Exit(1)
+
+    words = prompt or []
+    text = " ".join(w for w in words if w != "-").strip()
+    if ingest.should_read_stdin(bool(text), dash="-" in words):
+        # `git diff | mim "..."`: the piped input is read line by line and merged with the prompt
+        asyncio.run(run_processing(text, piped=ingest.iter_stdin(), require_context=context))
+    elif text:
+        asyncio.run(run_processing(text, require_context=context))
     else:
-        asyncio.run(run_repl())
+        asyncio.run(run_repl(resume=resume, require_context=context))
 
 # --- Callback ---
 @app.callback(invoke_without_command=True)
@@ -51,106 +120,359 @@ def main(
         rprint(f"[bold cyan]mimitaz[/] version {v}")
         raise typer.Exit()
     
-    if settings.debug or debug:
+    if debug:
         settings.debug = True
 
 # --- Core Logic ---
 
-async def run_processing(prompt: str):
+# Tokens kept free for the model's answer when sizing input chunks
+RESPONSE_RESERVE = 4096
+DEFAULT_PIPE_PROMPT = "Summarize this input."
+# Map/reduce passes over piped input before giving up (each should shrink it several times)
+MAX_REDUCE_ROUNDS = 4
+
+async def run_processing(prompt: str, piped: Optional[Iterable[str]] = None, require_context: bool = False):
     """Run a single query and exit."""
+    from mimitaz.services.http import clients
     try:
-        provider = get_provider()
-        UI.print_user_message(prompt)
-        messages = [Message(role="user", content=prompt)]
+        provider = with_cache(with_recording(get_provider(), settings.provider), settings.provider)
+        if prompt:
+            UI.print_user_message(prompt)
         
         api_key = settings.get_api_key()
+        if piped is None:
+            messages = [Message(role="user", content=prompt)]
+        else:
+            messages = await build_piped_messages(provider, prompt, piped, api_key)
+        if settings.index_context and prompt:
+            messages[-1] = attach_context(messages[-1], prompt, required=require_context)
 
-        response_stream = provider.stream_chat(
+        trace = start_trace(settings.provider, settings.model)
+        response_stream = traced(provider.stream_chat(
             messages=messages,
             model=settings.model,
             api_key=api_key
-        )
+        ), trace)
+        response_stream = framed(response_stream, settings.render_fps, settings.render_queue)
+        if settings.extract_dir:
+            response_stream = extract_blocks(response_stream, Path(settings.extract_dir), on_block=report_block)
         
-        chunk_generator = [chunk async for chunk in response_stream]
-        UI.print_stream(chunk_generator)
+        try:
+            result = await UI.print_stream(response_stream, started=trace.started)
+        finally:
+            finish_trace(trace)
+        if settings.debug:
+            UI.print_ttft(result)
+            print_hedge_report(provider)
+            print_route_report(provider)
         
     except Exception as e:
         handle_error(e)
+    finally:
+        await clients.aclose()
 
-async def run_repl():
-    """Interactive Loop."""
+async def build_piped_messages(provider, prompt: str, piped: Iterable[str], api_key) -> List[Message]:
+    """
+    Merges piped input with the prompt. Input larger than the model's context
+    is split on hunk/line boundaries, condensed per chunk with bounded
+    parallelism, and answered by a final reduce request.
+    """
+    from mimitaz.services.llm.mapreduce import map_chunks, reduce_messages
+    window = context_window(settings.model, settings.context_window)
+    budget = window - RESPONSE_RESERVE - estimate_tokens(prompt) - 256
+
+    chunks = ingest.split_lines(piped, budget)
+    first = next(chunks, "")
+    second = next(chunks, None)
+    if second is None:
+        content = "\n\n".join(part for part in (prompt, first) if part.strip())
+        if not content:
+            # e.g. an empty file or a closed pipe as stdin; never send an empty request
+            raise ValueError("Nothing to send: no prompt and the piped input is empty")
+        return [Message(role="user", content=content)]
+
+    task = prompt or DEFAULT_PIPE_PROMPT
+    parts = [first, second, *chunks]
+    for _ in range(MAX_REDUCE_ROUNDS):
+        UI.print_system_message(f"Input exceeds the context window; processing {len(parts)} parts ({settings.map_parallel} at a time)")
+        notes = await map_chunks(provider, task, parts, settings.model, api_key, parallel=settings.map_parallel)
+        messages = reduce_messages(task, notes)
+        # Notes can themselves overflow on huge inputs; condense them again
+        condensed = list(ingest.split_lines(messages[-1].content.splitlines(keepends=True), budget))
+        if len(condensed) <= 1:
+            return messages
+        if len(condensed) >= len(parts):
+            raise ValueError(f"Input is too large to condense: the notes from {len(parts)} parts still take {len(condensed)}")
+        parts = condensed
+    raise ValueError(f"Input is too large to condense: still {len(parts)} parts after {MAX_REDUCE_ROUNDS} rounds")
+
+async def run_repl(resume: Optional[str] = None, require_context: bool = False):
+    """
+    Interactive Loop. Input is read off the event loop, so connection
+    warm-up and history compaction run while the user types; Ctrl-C
+    during an answer stops only that answer.
+    """
+    from mimitaz.services.http import clients
     try:
-        provider = get_provider()
+        provider = with_cache(with_recording(get_provider(), settings.provider), settings.provider)
         api_key = settings.get_api_key()
+        session = open_session(resume)
     except ValueError as e:
         UI.print_system_message(f"{e}", type="error")
         return
 
     UI.print_banner()
-    messages_history = []
+
+    # History stays within a per-model token budget; old turns are dropped or summarized
+    history = ConversationContext(
+        settings.model,
+        budget=settings.history_budget,
+        threshold=settings.history_threshold,
+        reserve=RESPONSE_RESERVE,
+    )
+    summarizer = provider_summarizer(provider, settings.model, api_key) if settings.history_summarize else None
+    if resume:
+        # Only the tail that fits the context window is read back from the log
+        for message in session.tail(int(history.budget * history.target)):
+            history.append(message)
+        UI.print_system_message(f"Resumed session {session.id} ({len(history.turns)} of {session.message_count} messages loaded)")
+
+    reader = LineReader()
+    interrupts = Interrupts()
+    interrupts.install()
+    base_url = getattr(provider, "BASE_URL", None)
+    preload = asyncio.create_task(preload_model(provider)) if getattr(provider, "warm_up", None) else None
+    warm_delay = 0.0 # The first prompt opens the connection right away
+    compaction: Optional[asyncio.Task] = None
     
     while True:
+        warm = asyncio.create_task(keep_warm(clients, base_url, warm_delay)) if base_url else None
         try:
             UI.print_prompt()
-            user_input = input() 
+            user_input = await reader.readline()
             if not user_input.strip(): continue # Skip empty inputs
+            if compaction:
+                # Usually finished while the user was typing
+                await finish_background(compaction)
+                compaction = None
+            
+            message = history.fit(Message(role="user", content=user_input))
+            if len(message.content) < len(user_input):
+                UI.print_system_message("Input is larger than the context window; its middle was left out", type="warning")
+            # Retrieved before the turn is recorded: a failure must not leave an unanswered question behind
+            sent = attach_context(message, user_input, required=require_context) if settings.index_context else message
+            history.append(message)
+            if session:
+                session.append(message)
+            if history.total_tokens > history.budget:
+                # Hard limit: everything before a huge paste goes (fit() already bounds the paste itself)
+                await history.compact(keep=1)
             
-            messages_history.append(Message(role="user", content=user_input))
+            request = history.messages()
+            # Snippets go with this request only; the history keeps the plain question
+            request[-1] = sent
             
-            response_stream = provider.stream_chat(
-                messages=messages_history, 
+            trace = start_trace(settings.provider, settings.model)
+            response_stream = traced(provider.stream_chat(
+                messages=request, 
                 model=settings.model, 
                 api_key=api_key
-            )
+            ), trace)
+            # Network reading runs ahead in its own task; the renderer gets coalesced frames
+            response_stream = framed(response_stream, settings.render_fps, settings.render_queue)
+            if session:
+                # Deltas are appended to the session log as they arrive
+                response_stream = session.record(response_stream)
+            if settings.extract_dir:
+                response_stream = extract_blocks(response_stream, Path(settings.extract_dir), on_block=report_block)
             
-            # Consume stream and accumulate response
-            acc_response = ""
-            chunk_generator = []
-            async for chunk in response_stream:
-                chunk_generator.append(chunk)
-                acc_response += chunk.delta
+            # Rendered in its own task so Ctrl-C can cancel just this answer. Cancelling it
+            # unwinds the stream generators, which closes the HTTP response mid-body.
+            received: List[str] = []
+            answer = asyncio.create_task(UI.print_stream(collect_deltas(response_stream, received), started=trace.started))
+            interrupts.answer = answer
+            interrupts.answer_interrupted = False
+            try:
+                result = await answer
+            except asyncio.CancelledError:
+                # Told apart with a flag, not Task.cancelling() (Python 3.11+ only)
+                if not interrupts.answer_interrupted:
+                    raise # The session itself is ending
+                result = None
+            finally:
+                interrupts.answer = None
+                finish_trace(trace)
+            if result is None:
+                UI.print_system_message("Interrupted; the partial answer is kept in the conversation", type="warning")
+            elif settings.debug:
+                UI.print_ttft(result)
+                print_hedge_report(provider)
+                print_route_report(provider)
+            text = result.text if result else "".join(received)
+            if text:
+                history.append(Message(role="assistant", content=text))
+            if history.needs_compaction():
+                # Summarizing costs a request; it runs while the user reads and types
+                compaction = asyncio.create_task(history.compact(summarizer))
+            warm_delay = settings.http_keepalive_expiry * WARM_FRACTION
             
-            UI.print_stream(chunk_generator)
-            messages_history.append(Message(role="assistant", content=acc_response))
-            
-        except (KeyboardInterrupt, EOFError):
+        except (KeyboardInterrupt, EOFError, asyncio.CancelledError):
             print("\nExiting...")
             break
         except Exception as e:
              handle_error(e)
+        finally:
+            if warm:
+                warm.cancel()
 
-def handle_error(e: Exception):
+    interrupts.remove()
+    if compaction:
+        compaction.cancel()
+    if session:
+        session.close()
+    await clients.aclose()
+
+# Idle connections are refreshed at this share of the keep-alive expiry
+WARM_FRACTION = 0.8
+
+class Interrupts:
+    """
+    Ctrl-C in the REPL: cancels the answer being streamed, if any;
+    otherwise (at the prompt) ends the session, as before.
+    """
+
+    def __init__(self):
+        self.answer: Optional[asyncio.Task] = None
+        self.answer_interrupted = False # Set when Ctrl-C (not the session ending) cancelled the answer
+        self._main: Optional[asyncio.Task] = None
+        self._installed = False
+
+    def install(self):
+        self._main = asyncio.current_task()
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGINT, self._on_interrupt)
+            self._installed = True
+        except (NotImplementedError, RuntimeError):
+            pass # No loop signal handlers (Windows): Ctrl-C ends the session
+
+    def remove(self):
+        if self._installed:
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGINT)
+            self._installed = False
+
+    def _on_interrupt(self):
+        if self.answer is not None and not self.answer.done():
+            self.answer_interrupted = True
+            self.answer.cancel()
+        elif self._main is not None:
+            self._main.cancel()
+
+async def collect_deltas(stream: AsyncIterator[StreamChunk], parts: List[str]) -> AsyncGenerator[StreamChunk, None]:
+    """Passes a stream through, keeping its text in `parts` (what is left of an interrupted answer)."""
+    async for chunk in stream:
+        if chunk.delta:
+            parts.append(chunk.delta)
+        yield chunk
+
+async def keep_warm(clients, base_url: str, delay: float):
+    """While the user is at the prompt, keeps a pooled connection to the provider open."""
+    interval = max(settings.http_keepalive_expiry * WARM_FRACTION, 1.0)
+    await asyncio.sleep(delay)
+    while True:
+        await clients.prewarm(base_url)
+        await asyncio.sleep(interval)
+
+async def preload_model(provider):
+    """Loads a self-hosted endpoint's model while the user types the first prompt."""
+    if not provider.profile.warmup:
+        return
+    try:
+        seconds = await provider.warm_up()
+    except Exception as e:
+        UI.print_system_message(f"Could not preload {provider.model}: {e}", type="warning")
+        return
     if settings.debug:
-        import traceback
-        traceback.print_exc()
-    UI.print_system_message(f"Error: {str(e)}", type="error")
+        UI.print_system_message(f"{provider.model} loaded in {seconds:.2f}s")
+
+async def finish_background(task: asyncio.Task):
+    """Waits for a background task; its failure is reported, not raised."""
+    try:
+        await task
+    except Exception as e:
+        handle_error(e)
+
+def open_session(resume: Optional[str]):
+    """The session to record into: resumed by id, new, or None when sessions are off."""
+    if resume:
+        return SessionStore.from_settings().open(resume)
+    if not settings.sessions_enabled:
+        return None
+    return SessionStore.from_settings().create(settings.model)
 
-def entry_point():
+_warned_no_index = False
+
+def attach_context(message: Message, query: str, cwd: Optional[str] = None, required: bool = False) -> Message:
     """
-    Manual dispatch shim to support 'mim <query>' syntax alongside subcommands.
+    Prepends snippets retrieved from the project index for `query` to `message`.
+    Without an index the plain question is sent (with a one-time warning),
+    unless context was asked for explicitly (--context): then ValueError.
     """
-    args = sys.argv[1:]
+    global _warned_no_index
+    from mimitaz.services.index import retrieve, with_context
+    try:
+        snippets = retrieve(query, cwd)
+    except ValueError as e:
+        if required:
+            raise
+        if not _warned_no_index:
+            _warned_no_index = True
+            UI.print_system_message(f"{e}; sending the question without code context", type="warning")
+        return message
+    if settings.debug:
+        UI.print_system_message(f"context: {', '.join(f'{s.path}:{s.start}' for s in snippets) or 'no matches'}")
+    return with_context(message, snippets)
+
+def report_block(block: Block):
+    UI.print_system_message(block.describe())
+
+def finish_trace(trace: RequestTrace):
+    """Closes a request trace and reports it: --stats line and/or the JSON-lines trace file."""
+    end_trace(trace)
+    if settings.trace_stats:
+        UI.print_system_message(trace.summary(), type="info")
+    if settings.trace_file:
+        try:
+            trace.write(settings.trace_file)
+        except OSError as e:
+            UI.print_system_message(f"Could not write trace: {e}", type="warning")
 
-    # Early exit for no args -> REPL
-    if not args:
-        # Route to 'chat' without args -> REPL
-        sys.argv = [sys.argv[0], "chat"]
-        app()
+def print_hedge_report(provider):
+    """Which hedge target won the last request, and the p95 TTFT saved so far."""
+    report = getattr(provider, "last_report", None)
+    if report is None:
         return
+    line = f"hedge: {report.winner} won after {report.hedged} request(s), first token in {report.ttft * 1000:.0f} ms"
+    if report.p95_saved is not None:
+        line += f" • p95 saved {report.p95_saved * 1000:.0f} ms"
+    UI.print_system_message(line)
 
-    # Check for known commands or flags
-    first_arg = args[0]
-    known_commands = ["config", "chat"]
-    known_flags = ["--help", "--version", "-v"]
+def print_route_report(provider):
+    """Which target the router picked for the last request, and why."""
+    report = getattr(provider, "last_route", None)
+    if report is None:
+        return
+    line = f"router: {report.target} ({report.status}{', small prompt' if report.small else ''})"
+    if report.ttft is not None:
+        line += f", first token in {report.ttft * 1000:.0f} ms"
+    if report.tried > 1:
+        line += f" • {report.tried - 1} target(s) failed first"
+    UI.print_system_message(line)
 
-    if first_arg in known_commands or first_arg in known_flags:
-        # Standard Typer behavior
-        app()
-    else:
-        # Treat as implicit 'chat' command
-        # Transform: mim "hello" -> mim chat "hello"
-        # We explicitly pass the args to avoid sys.argv ambiguity
-        app(args=["chat"] + args)
+def handle_error(e: Exception):
+    if settings.debug:
+        import traceback
+        traceback.print_exc()
+    UI.print_system_message(f"Error: {str(e)}", type="error")
 
 if __name__ == "__main__":
     entry_point()
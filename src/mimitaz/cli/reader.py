@@ -0,0 +1,57 @@
+import asyncio
+import queue
+import sys
+import threading
+from typing import Optional
+
+class LineReader:
+    """
+    Async `input()`: lines are read on a daemon thread, so the event loop
+    keeps running (pre-warming, compaction) while the user types.
+
+    The thread only reads when a line is asked for, so nothing typed
+    while an answer streams is taken away from the terminal early. If a
+    read is abandoned (the caller was cancelled), the line the user
+    eventually enters is handed to the next `readline()` call.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdin
+        self._requests: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._pending: Optional[asyncio.Future] = None
+
+    def _run(self):
+        while True:
+            loop, future = self._requests.get()
+            try:
+                line = self.stream.readline()
+                error = None if line else EOFError()
+            except Exception as e:
+                line, error = "", e
+            try:
+                loop.call_soon_threadsafe(_resolve, future, line.rstrip("\r\n"), error)
+            except RuntimeError:
+                return # The loop is gone; nobody is waiting any more
+
+    async def readline(self) -> str:
+        """The next line without its newline; EOFError at end of input."""
+        if self._pending is None:
+            loop = asyncio.get_running_loop()
+            self._pending = loop.create_future()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="mimitaz-input", daemon=True)
+                self._thread.start()
+            self._requests.put((loop, self._pending))
+        # Shielded: cancelling the caller must not lose a line that is still being typed
+        result = await asyncio.shield(self._pending)
+        self._pending = None
+        return result
+
+def _resolve(future: asyncio.Future, line: str, error: Optional[BaseException]):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(line)
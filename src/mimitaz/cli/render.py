@@ -0,0 +1,85 @@
+import re
+from typing import List, Optional
+
+# Opening/closing code fence: up to 3 spaces of indent, then ``` or ~~~ (3+)
+FENCE_RE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+
+class IncrementalMarkdown:
+    """
+    Block-aware splitter for a Markdown document that arrives in pieces.
+
+    Text is consumed line by line. Once a block is known to be complete
+    (a paragraph followed by a blank line and an unindented line, or a
+    closed fenced code block) it is handed back exactly once and never
+    looked at again. Only the open tail block has to be re-rendered.
+    """
+
+    def __init__(self):
+        self._block: List[str] = []   # Lines of the open block
+        self._partial = ""            # Incomplete trailing line
+        self._fence: Optional[str] = None  # Opening fence while inside a code block
+        self._after_blank = False     # Saw a blank line; block ends unless the next line is indented
+
+    @property
+    def tail(self) -> str:
+        """The uncommitted text: open block plus any partial line."""
+        if not self._block:
+            return self._partial
+        return "\n".join(self._block) + "\n" + self._partial
+
+    def feed(self, delta: str) -> List[str]:
+        """Adds a delta and returns the blocks it completed (possibly none)."""
+        self._partial += delta
+        if "\n" not in delta:
+            return []
+
+        *lines, self._partial = self._partial.split("\n")
+        done = []
+        for line in lines:
+            block = self._push_line(line)
+            if block:
+                done.append(block)
+        return done
+
+    def close(self) -> str:
+        """Ends the stream and returns whatever is left uncommitted."""
+        rest = self.tail.rstrip("\n")
+        self._block = []
+        self._partial = ""
+        self._fence = None
+        self._after_blank = False
+        return rest
+
+    def _push_line(self, line: str) -> Optional[str]:
+        if self._fence is not None:
+            self._block.append(line)
+            match = FENCE_RE.match(line)
+            if match and match.group(1).startswith(self._fence) and not line.strip().strip(self._fence[0]):
+                self._fence = None
+                return self._commit()
+            return None
+
+        if not line.strip():
+            if self._block:
+                self._after_blank = True
+                self._block.append(line)
+            return None
+
+        committed = None
+        match = FENCE_RE.match(line)
+        if match:
+            # A fence may interrupt a paragraph, so the paragraph ends here
+            committed = self._commit()
+            self._fence = match.group(1)
+        elif self._after_blank and not line[0].isspace():
+            committed = self._commit()
+
+        self._after_blank = False
+        self._block.append(line)
+        return committed
+
+    def _commit(self) -> Optional[str]:
+        text = "\n".join(self._block).strip("\n")
+        self._block = []
+        self._after_blank = False
+        return text or None
@@ -0,0 +1,40 @@
+import typer
+from rich import print as rprint
+from mimitaz.config import settings
+from mimitaz.services.llm.hedge import parse_targets
+from mimitaz.services.llm.router import RouterStats, Weights, rank
+
+route_app = typer.Typer(help="Inspect the latency-aware router (provider = router)")
+
+@route_app.command("stats")
+def route_stats():
+    """Show the measured latency, throughput and error rate per target, best first."""
+    stats = RouterStats().current()
+    weights = Weights.from_settings()
+    pools = [("large", settings.router_targets), ("small", settings.router_small_targets)]
+    if not any(spec for _, spec in pools):
+        rprint("[yellow]No router targets. Run: mim config set router.targets openai:gpt-4o,...[/yellow]")
+        return
+
+    for pool, spec in pools:
+        targets = parse_targets(spec, settings.model)
+        if not targets:
+            continue
+        rprint(f"[bold]{pool.capitalize()} targets (half-life {settings.router_half_life:.0f}s):[/bold]")
+        for i, candidate in enumerate(rank(targets, stats, weights, explore=0.0)):
+            entry = stats.get(candidate.target.label)
+            marker = "[green]→[/green]" if i == 0 else " "
+            line = f" {marker} [cyan]{candidate.target.label}[/cyan]  {candidate.status}"
+            if entry is not None and entry.samples:
+                ttft = f"{entry.ttft * 1000:.0f} ms" if entry.ttft is not None else "n/a"
+                rate = f"{entry.rate:.0f} tok/s" if entry.rate is not None else "n/a"
+                line += f"  [dim]ttft {ttft} · {rate} · errors {entry.error_rate:.0%} · weight {entry.samples:.1f}[/dim]"
+            if candidate.cost is not None:
+                line += f"  [dim]score {candidate.cost:.2f}s[/dim]"
+            rprint(line)
+
+@route_app.command("reset")
+def route_reset():
+    """Forget all measurements; every target is explored again."""
+    RouterStats().reset()
+    rprint("[green]✓ Router statistics cleared.[/green]")
@@ -0,0 +1,23 @@
+import time
+import typer
+from rich import print as rprint
+from mimitaz.services.sessions import SessionStore, Session
+
+sessions_app = typer.Typer(help="Manage saved REPL sessions")
+
+@sessions_app.command("list")
+def sessions_list(
+    limit: int = typer.Option(20, "--limit", "-n", help="How many sessions to show"),
+):
+    """List saved sessions, newest first."""
+    store = SessionStore.from_settings()
+    sessions = store.list(limit=limit)
+    if not sessions:
+        rprint("[dim]No saved sessions.[/dim]")
+        return
+
+    for info in sessions:
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(info.created))
+        count = Session(store, info.id).message_count
+        rprint(f"  [cyan]{info.id}[/cyan]  [dim]{when}  {info.model}  {count} msgs[/dim]  {info.title}")
+    rprint("[dim]Resume with: mim --resume <id>[/dim]")
@@ -1,8 +1,11 @@
 from rich.console import Console
-from rich.markdown import Markdown
 from rich.theme import Theme
-from rich.live import Live
 from importlib.metadata import version
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+import sys
+import time
+from mimitaz.cli.render import IncrementalMarkdown
 
 # GLM-style minimalist theme
 glm_theme = Theme({
@@ -12,15 +15,42 @@ glm_theme = Theme({
     "user": "bold cyan",
     "assistant": "white",
     "code.hilite": "bold magenta",
+    "gradient": "bold cyan",
 })
 
 console = Console(theme=glm_theme)
+# Diagnostics go here in raw mode so they never end up in a pipe
+err_console = Console(theme=glm_theme, stderr=True)
+
+FLUSH_POLICIES = ("chunk", "line", "end")
+
+@dataclass
+class StreamResult:
+    """Outcome of rendering a stream: the full text plus timing."""
+    text: str
+    ttft: Optional[float] = None  # Seconds until the first non-empty delta
+    chunks: int = 0
 
 class UI:
     """
     Minimalist GLM-style UI Renderer.
     "Invisible" interface - just text and content.
     """
+
+    # Raw mode writes plain deltas to stdout and skips all rich rendering
+    raw: bool = False
+    flush_policy: str = "line"
+
+    @classmethod
+    def configure_output(cls, raw: Optional[bool] = None, flush_policy: str = "line"):
+        """
+        Selects the output mode. `raw=None` picks raw output automatically
+        when stdout is not a terminal (e.g. `mim ... > out.sql`).
+        """
+        if flush_policy not in FLUSH_POLICIES:
+            raise ValueError(f"Unknown flush policy '{flush_policy}'. Use one of: {', '.join(FLUSH_POLICIES)}")
+        cls.raw = (not sys.stdout.isatty()) if raw is None else raw
+        cls.flush_policy = flush_policy
     
     @staticmethod
     def print_banner():
@@ -51,27 +81,85 @@ class UI:
     @staticmethod
     def print_user_message(content: str):
         """Retroactively prints the user message if we are replaying history."""
+        if UI.raw:
+            return
         console.print(">", style="user", end=" ")
         console.print(content)
 
     @staticmethod
     def print_system_message(content: str, type: str = "info"):
         """Prints a transient or helpful system message."""
-        console.print(f"[{type}]>>> {content}[/]")
+        target = err_console if UI.raw else console
+        target.print(f"[{type}]>>> {content}[/]")
 
     @staticmethod
-    def print_stream(generator):
+    async def print_stream(stream: AsyncIterator, started: Optional[float] = None) -> StreamResult:
         """
-        Consumes a StreamChunk iterator and renders it live.
+        Consumes a StreamChunk async iterator and renders each delta as it arrives.
+        `started` is the perf_counter() timestamp the request was issued at,
+        used to report time-to-first-token.
         """
+        if started is None:
+            started = time.perf_counter()
+        if UI.raw:
+            return await UI.write_raw(stream, started)
+        # Imported here: Markdown pulls in markdown-it and pygments
+        from rich.markdown import Markdown
+        from rich.live import Live
         console.print() # Spacing
         
-        acc_text = ""
+        parts = []
+        ttft = None
+        chunks = 0
+        # Finished blocks are printed once above the live region;
+        # only the open tail block is re-rendered per chunk.
+        renderer = IncrementalMarkdown()
         # vertical_overflow="visible" is key for long responses
         with Live(console=console, refresh_per_second=12, vertical_overflow="visible") as live:
-            for chunk in generator:
+            async for chunk in stream:
+                chunks += 1
                 if chunk.delta:
-                    acc_text += chunk.delta
-                    live.update(Markdown(acc_text))
+                    if ttft is None:
+                        ttft = time.perf_counter() - started
+                    parts.append(chunk.delta)
+                    for block in renderer.feed(chunk.delta):
+                        live.console.print(Markdown(block))
+                        live.console.print()
+                    live.update(Markdown(renderer.tail))
+            live.update(Markdown(renderer.close()))
         
         console.print() # Final spacing
+        return StreamResult(text="".join(parts), ttft=ttft, chunks=chunks)
+
+    @staticmethod
+    async def write_raw(stream: AsyncIterator, started: float) -> StreamResult:
+        """
+        Writes deltas straight to the (buffered) stdout, flushing according to
+        UI.flush_policy: after every chunk, at line ends, or only at the end.
+        """
+        out = sys.stdout
+        policy = UI.flush_policy
+        parts = []
+        ttft = None
+        chunks = 0
+        async for chunk in stream:
+            chunks += 1
+            if chunk.delta:
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+                parts.append(chunk.delta)
+                out.write(chunk.delta)
+                if policy == "chunk" or (policy == "line" and "\n" in chunk.delta):
+                    out.flush()
+        if parts and not parts[-1].endswith("\n"):
+            out.write("\n")
+        out.flush()
+        return StreamResult(text="".join(parts), ttft=ttft, chunks=chunks)
+
+    @staticmethod
+    def print_ttft(result: StreamResult):
+        """Reports time-to-first-token for the last response."""
+        if result.ttft is None:
+            return
+        target = err_console if UI.raw else console
+        target.print(f"[info]first token in {result.ttft * 1000:.0f} ms[/]")
@@ -1,12 +1,92 @@
 from pathlib import Path
-from typing import Optional, Dict, Any, Tuple
-from pydantic import SecretStr, Field
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Dict, Any
 import json
+import os
 
 # GLM-style config persistence
 CONFIG_FILE = Path.home() / ".mimitaz_config.json"
 
+def daemon_socket_path() -> Path:
+    """Unix socket of `mim daemon` (MIMITAZ_DAEMON_SOCKET overrides it)."""
+    override = os.environ.get("MIMITAZ_DAEMON_SOCKET")
+    return Path(override).expanduser() if override else Path.home() / ".mimitaz" / "daemon.sock"
+
+# JSON config key -> Settings field
+JSON_KEY_MAP = {
+    "debug": "debug",
+    "provider": "provider",
+    "model": "model",
+    "openai.api_key": "openai_api_key",
+    "anthropic.api_key": "anthropic_api_key",
+    "zhipu.api_key": "zhipu_api_key",
+    "http.max_connections": "http_max_connections",
+    "http.max_keepalive": "http_max_keepalive",
+    "http.keepalive_expiry": "http_keepalive_expiry",
+    "http.http2": "http2",
+    "http.connect_timeout": "connect_timeout",
+    "http.read_timeout": "read_timeout",
+    "output.flush": "flush_policy",
+    "output.dir": "extract_dir",
+    "output.fps": "render_fps",
+    "output.queue": "render_queue",
+    "context_window": "context_window",
+    "map.parallel": "map_parallel",
+    "cache.enabled": "cache_enabled",
+    "cache.dir": "cache_dir",
+    "cache.max_mb": "cache_max_mb",
+    "cache.ttl": "cache_ttl",
+    "cache.fast_forward": "cache_fast_forward",
+    "prompt_cache.enabled": "prompt_cache",
+    "index.dir": "index_dir",
+    "index.top_k": "index_top_k",
+    "index.max_tokens": "index_max_tokens",
+    "index.context": "index_context",
+    "batch.rpm": "batch_rpm",
+    "batch.tpm": "batch_tpm",
+    "history.budget": "history_budget",
+    "history.threshold": "history_threshold",
+    "history.summarize": "history_summarize",
+    "sessions.enabled": "sessions_enabled",
+    "sessions.dir": "sessions_dir",
+    "hedge.targets": "hedge_targets",
+    "hedge.delay": "hedge_delay",
+    "router.targets": "router_targets",
+    "router.small_targets": "router_small_targets",
+    "router.small_max_tokens": "router_small_max_tokens",
+    "router.half_life": "router_half_life",
+    "router.weight_ttft": "router_weight_ttft",
+    "router.weight_throughput": "router_weight_throughput",
+    "router.weight_errors": "router_weight_errors",
+    "retry.max_attempts": "retry_max_attempts",
+    "retry.max_elapsed": "retry_max_elapsed",
+    "breaker.threshold": "breaker_threshold",
+    "breaker.reset": "breaker_reset",
+    "trace.stats": "trace_stats",
+    "record.file": "record_file",
+    "replay.file": "replay_file",
+    "replay.speed": "replay_speed",
+    "trace.file": "trace_file",
+}
+
+# Endpoint profiles are keyed by name: "endpoints.local.base_url", "endpoints.local.headers.X-Team"
+ENDPOINT_PREFIX = "endpoints."
+
+def add_endpoint_key(endpoints: Dict[str, Dict[str, Any]], key: str, value: Any):
+    """Files a flat "endpoints.<name>.<field>" config entry into `endpoints`."""
+    name, _, field = key[len(ENDPOINT_PREFIX):].partition(".")
+    if not name or not field:
+        return
+    profile = endpoints.setdefault(name, {})
+    if field.startswith("headers."):
+        profile.setdefault("headers", {})[field[len("headers."):]] = value
+    elif field == "headers" and isinstance(value, str):
+        try:
+            profile["headers"] = json.loads(value) # Set as a JSON object string
+        except ValueError:
+            pass
+    else:
+        profile[field] = value
+
 def load_json_config() -> Dict[str, Any]:
     """
     Load settings from the ~/.mimitaz_config.json file.
@@ -19,78 +99,56 @@ def load_json_config() -> Dict[str, Any]:
         data = json.loads(CONFIG_FILE.read_text())
         # Normalize keys: "openai.api_key" -> "openai_api_key" for Pydantic
         normalized = {}
+        endpoints: Dict[str, Dict[str, Any]] = {}
         for k, v in data.items():
-            if k == "provider": normalized["provider"] = v
-            if k == "model": normalized["model"] = v
-            if k == "openai.api_key": normalized["openai_api_key"] = v
-            if k == "anthropic.api_key": normalized["anthropic_api_key"] = v
-            if k == "zhipu.api_key": normalized["zhipu_api_key"] = v
+            if k in JSON_KEY_MAP:
+                normalized[JSON_KEY_MAP[k]] = v
+            elif k == "endpoints" and isinstance(v, dict):
+                # Also accepted as one nested object when the file is edited by hand
+                for name, profile in v.items():
+                    endpoints.setdefault(name, {}).update(profile)
+            elif k.startswith(ENDPOINT_PREFIX):
+                add_endpoint_key(endpoints, k, v)
+        # A profile still being set up (no base_url yet) must not break every command
+        endpoints = {name: p for name, p in endpoints.items() if p.get("base_url")}
+        if endpoints:
+            normalized["endpoints"] = endpoints
         return normalized
     except Exception:
         return {} # Fail silently for CLI resilience
 
-class Settings(BaseSettings):
+class LazySettings:
     """
-    Application Configuration.
-    Priority: Env Vars > JSON Config File > Defaults
+    Proxy for the Settings singleton.
+    pydantic-settings is imported, and the config file read, on first attribute
+    access, so commands that never touch settings (e.g. `mim --version`) skip it.
     """
-    
-    debug: bool = Field(default=False)
-    
-    # Model Provider Config
-    provider: str = Field(default="openai") # Default to openai
-    model: str = Field(default="gpt-4o")
-    
-    # API Keys
-    openai_api_key: Optional[SecretStr] = Field(default=None, alias="MIMITAZ_OPENAI_KEY")
-    anthropic_api_key: Optional[SecretStr] = Field(default=None, alias="MIMITAZ_ANTHROPIC_KEY")
-    zhipu_api_key: Optional[SecretStr] = Field(default=None, alias="MIMITAZ_ZHIPU_KEY")
-    
-    model_config = SettingsConfigDict(
-        env_prefix="MIMITAZ_",
-        env_file=".env",
-        extra="ignore"
-    )
 
-    @classmethod
-    def settings_customise_sources(
-        cls,
-        settings_cls: Any,
-        init_settings: Any,
-        env_settings: Any,
-        dotenv_settings: Any,
-        file_secret_settings: Any,
-    ) -> Tuple[Any, ...]:
-        # Inject our JSON loader into the Pydantic source chain
-        return (
-            init_settings,
-            env_settings,
-            dotenv_settings,
-            load_json_config, 
-            file_secret_settings,
-        )
+    def __init__(self):
+        object.__setattr__(self, "_instance", None)
+
+    def _load(self):
+        if self._instance is None:
+            from mimitaz.settings import Settings
+            object.__setattr__(self, "_instance", Settings())
+        return self._instance
+
+    def reload(self):
+        """Drops the loaded settings so the next access re-reads env and config file."""
+        object.__setattr__(self, "_instance", None)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._load(), name)
 
-    def get_api_key(self) -> SecretStr:
-        """Helper to get the key for the active provider."""
-        if self.provider == "mock":
-             return SecretStr("mock")
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._load(), name, value)
 
-        if self.provider == "openai":
-            if not self.openai_api_key:
-                raise ValueError("OpenAI Key missing. Run: mim config set openai.api_key sk-...")
-            return self.openai_api_key
-            
-        elif self.provider == "anthropic":
-            if not self.anthropic_api_key:
-                raise ValueError("Anthropic Key missing. Run: mim token set <key>")
-            return self.anthropic_api_key
-            
-        elif self.provider in ("zhipu", "glm"):
-            if not self.zhipu_api_key:
-                raise ValueError("GLM/Zhipu Key missing. Run: mim token set <key>")
-            return self.zhipu_api_key
-            
-        raise ValueError(f"Unknown provider: {self.provider}")
+def __getattr__(name: str) -> Any:
+    # Backwards compatible `from mimitaz.config import Settings`
+    if name == "Settings":
+        from mimitaz.settings import Settings
+        return Settings
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Global settings singleton
-settings = Settings()
+settings = LazySettings()
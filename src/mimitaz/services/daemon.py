@@ -0,0 +1,168 @@
+import asyncio
+import json
+import os
+import time
+from contextlib import aclosing
+from pathlib import Path
+from typing import List, Optional
+from mimitaz.config import settings, CONFIG_FILE, daemon_socket_path
+
+def config_mtime() -> float:
+    try:
+        return CONFIG_FILE.stat().st_mtime
+    except OSError:
+        return 0.0
+
+async def read_stdin(reader: asyncio.StreamReader) -> List[str]:
+    """The client's piped input, sent as {"in": text} pieces up to {"eof": true}."""
+    pieces = []
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("client went away while sending input")
+        event = json.loads(line)
+        if "in" not in event:
+            return pieces
+        pieces.append(event["in"])
+
+class Daemon:
+    """
+    Long-lived `mim` process serving one-shot prompts over a Unix socket.
+    Settings, the provider (with its cache/recording wrappers) and the pooled
+    HTTP connections stay loaded between requests; the config file is
+    re-read when it changes. Requests are handled concurrently.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else daemon_socket_path()
+        self.started = time.time()
+        self.requests = 0
+        self._provider = None
+        self._config_mtime = config_mtime()
+        self._stop = asyncio.Event()
+
+    def provider(self):
+        from mimitaz.services.llm.factory import get_provider
+        from mimitaz.services.llm.cache import with_cache
+        from mimitaz.services.llm.recording import with_recording
+
+        mtime = config_mtime()
+        if mtime != self._config_mtime:
+            settings.reload()
+            self._provider = None
+            self._config_mtime = mtime
+        if self._provider is None:
+            self._provider = with_cache(with_recording(get_provider(), settings.provider), settings.provider)
+        return self._provider
+
+    async def serve(self):
+        from mimitaz.services.http import clients
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            self.path.unlink() # Stale socket from a crashed daemon (callers check it is not live)
+        server = await asyncio.start_unix_server(self._handle, path=str(self.path))
+        os.chmod(self.path, 0o600) # Prompts and answers are private to this user
+
+        try:
+            provider = self.provider()
+            base_url = getattr(provider, "BASE_URL", None)
+            if base_url:
+                await clients.prewarm(base_url)
+            if getattr(provider, "warm_up", None) and provider.profile.warmup:
+                # Self-hosted endpoint: load the model before the first request needs it
+                await provider.warm_up()
+        except Exception:
+            pass # Misconfigured or unreachable provider: reported per request instead
+
+        try:
+            async with server:
+                await self._stop.wait()
+        finally:
+            if self.path.exists():
+                self.path.unlink()
+            await clients.aclose()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        async def send(event: dict):
+            writer.write(json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n")
+            await writer.drain()
+
+        try:
+            line = await reader.readline()
+            if not line:
+                return
+            request = json.loads(line)
+            op = request.get("op", "chat")
+            if op == "ping":
+                await send({"ok": True, "pid": os.getpid(), "uptime": time.time() - self.started, "requests": self.requests})
+            elif op == "stop":
+                await send({"ok": True})
+                self._stop.set()
+            else:
+                self.requests += 1
+                piped = await read_stdin(reader) if request.get("stdin") else None
+                await self._chat(request, send, piped)
+        except (ConnectionError, ValueError):
+            pass # Client went away or sent garbage
+        finally:
+            writer.close()
+
+    async def _chat(self, request: dict, send, piped: Optional[List[str]] = None):
+        from mimitaz.cli.main import build_piped_messages, attach_context
+        from mimitaz.services.llm.provider import Message
+        from mimitaz.services.llm.trace import start_trace, end_trace, traced
+        from mimitaz.services.llm.pipeline import framed
+        from mimitaz.services.llm.codeblocks import extract_blocks
+        from mimitaz.services.ingest import chunk_lines
+
+        await send({"ok": True, "flush": request.get("flush") or settings.flush_policy})
+        try:
+            provider = self.provider()
+            api_key = settings.get_api_key()
+            prompt = request.get("prompt", "")
+            if piped is not None:
+                messages = await build_piped_messages(provider, prompt, chunk_lines(piped), api_key)
+            else:
+                messages = [Message(role="user", content=prompt)]
+            if settings.index_context and prompt:
+                # The project is the client's working directory, not the daemon's
+                messages[-1] = attach_context(messages[-1], prompt, request.get("cwd"))
+
+            trace = start_trace(settings.provider, settings.model)
+            stream = traced(provider.stream_chat(messages=messages, model=settings.model, api_key=api_key), trace)
+            # One socket write per frame rather than per delta
+            stream = framed(stream, settings.render_fps, settings.render_queue)
+            written = []
+            if settings.extract_dir:
+                # Relative to where `mim` was run, like the in-process path
+                directory = Path(request.get("cwd") or ".") / Path(settings.extract_dir).expanduser()
+                stream = extract_blocks(stream, directory, on_block=written.append)
+            try:
+                # Closing the stream promptly also closes the provider's HTTP response
+                async with aclosing(stream):
+                    async for chunk in stream:
+                        if chunk.delta:
+                            await send({"d": chunk.delta})
+                        while written:
+                            await send({"note": written.pop(0).describe()})
+                while written:
+                    await send({"note": written.pop(0).describe()}) # Unterminated block at the end
+            finally:
+                end_trace(trace) # Also when the stream fails, so the trace is always closed and detached
+            if request.get("stats") or settings.trace_stats:
+                await send({"stats": trace.summary()})
+            if settings.trace_file:
+                trace.write(settings.trace_file)
+            await send({"end": True})
+        except ConnectionError:
+            raise
+        except Exception as e:
+            await send({"error": str(e)})
+
+def main():
+    """Foreground entry point used by `mim daemon start` for the detached process."""
+    asyncio.run(Daemon().serve())
+
+if __name__ == "__main__":
+    main()
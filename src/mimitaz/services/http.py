@@ -0,0 +1,87 @@
+import asyncio
+import importlib.util
+from typing import Optional
+from urllib.parse import urlsplit
+import httpx
+from mimitaz.config import settings
+
+class ClientManager:
+    """
+    Process-wide pooled HTTP client shared by all providers.
+    Keeps TCP/TLS connections alive between REPL turns so only the first
+    request to a host pays for the handshake.
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def get(self) -> httpx.AsyncClient:
+        """Returns the shared client, creating it on first use in the running loop."""
+        loop = asyncio.get_running_loop()
+        # Connections are bound to the loop that opened them; a new asyncio.run() needs a new pool.
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._discard()
+            self._client = self._build()
+            self._loop = loop
+        return self._client
+
+    def _discard(self):
+        """Releases the previous loop's client; its pooled sockets would otherwise stay open."""
+        client, loop = self._client, self._loop
+        self._client = None
+        self._loop = None
+        if client is None or client.is_closed:
+            return
+        if loop is not None and loop.is_running():
+            # A loop in another thread: it closes its own pool
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            return
+        # The loop is gone (asyncio.run() closes it), so aclose() cannot run: close the sockets directly
+        pool = getattr(client._transport, "_pool", None)
+        for connection in list(getattr(pool, "connections", [])):
+            try:
+                sock = connection._connection._network_stream.get_extra_info("socket")
+                getattr(sock, "_sock", sock).close() # The real socket behind asyncio's TransportSocket
+            except Exception:
+                pass
+
+    def _build(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        )
+        timeout = httpx.Timeout(
+            settings.read_timeout,
+            connect=settings.connect_timeout,
+        )
+        return httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2_available())
+
+    async def prewarm(self, url: str):
+        """
+        Opens (and pools) a connection to the host behind `url`.
+        Any response, even a 404, leaves a warm keep-alive connection behind.
+        """
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}/"
+        try:
+            await self.get().head(origin, timeout=settings.connect_timeout)
+        except httpx.HTTPError:
+            pass # Best effort; the real request will surface any error
+
+    async def aclose(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+def http2_available() -> bool:
+    """HTTP/2 is opt-in and needs the optional 'h2' package (pip install mimitaz[http2])."""
+    return settings.http2 and importlib.util.find_spec("h2") is not None
+
+# Global client manager singleton
+clients = ClientManager()
+
+def get_client() -> httpx.AsyncClient:
+    return clients.get()
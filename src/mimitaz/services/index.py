@@ -0,0 +1,333 @@
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import subprocess
+import time
+from array import array
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from stat import S_ISREG
+from typing import Dict, List, Optional, Tuple
+from mimitaz.config import settings
+from mimitaz.services.llm.provider import Message
+from mimitaz.services.llm.tokens import estimate_tokens
+
+INDEX_VERSION = 2
+CHUNK_LINES = 40 # Lines per retrievable snippet
+MAX_FILE_BYTES = 1024 * 1024
+# Merge everything back into one segment past this many, or once stale docs outnumber live ones
+MAX_SEGMENTS = 8
+# Directories never indexed when the tree is not a git checkout
+SKIP_DIRS = {".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv", "dist", "build", "target", ".mypy_cache", ".pytest_cache", ".tox"}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+WORD_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+# Word parts (camelCase / snake_case pieces and plain words), at least two characters
+PART_RE = re.compile(r"[A-Z]{2,}(?=[A-Z][a-z])|[A-Z][a-z]+|[a-z]{2,}|[A-Z]{2,}|[0-9]{2,}")
+
+TF_BITS = 16 # Postings are packed as doc << TF_BITS | tf
+TF_MASK = (1 << TF_BITS) - 1
+
+def term_counts(text: str) -> Counter:
+    """Lowercased word parts; compound identifiers are also counted whole."""
+    counts = Counter(map(str.lower, PART_RE.findall(text)))
+    # Checked once per distinct word: the per-word test is what dominates indexing otherwise
+    for word, n in Counter(WORD_RE.findall(text)).items():
+        word = word.strip("_")
+        if "_" in word or not (word.islower() or word.isupper() or word.istitle()):
+            counts[word.lower()] += n
+    return counts
+
+def tokenize(text: str) -> List[str]:
+    return list(term_counts(text))
+
+def chunk_text(text: str) -> List[tuple]:
+    """(start line, end line, length, {term: tf}) per snippet."""
+    lines = text.splitlines()
+    chunks = []
+    for start in range(0, len(lines), CHUNK_LINES):
+        counts = term_counts("\n".join(lines[start:start + CHUNK_LINES]))
+        if counts:
+            chunks.append((start + 1, min(start + CHUNK_LINES, len(lines)), sum(counts.values()), counts))
+    return chunks
+
+def project_root(path: Optional[Path] = None) -> Path:
+    """The enclosing git checkout of `path` (default: cwd), or `path` itself."""
+    path = Path(path or Path.cwd()).resolve()
+    for candidate in (path, *path.parents):
+        if (candidate / ".git").exists():
+            return candidate
+    return path
+
+def default_index_dir(root: Path) -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    key = hashlib.blake2b(str(root).encode("utf-8"), digest_size=8).hexdigest()
+    return Path(base) / "mimitaz" / "index" / key
+
+def list_files(root: Path) -> List[str]:
+    """Relative paths to index: git's view of the tree (tracked + untracked, minus ignored) when available."""
+    try:
+        proc = subprocess.run(
+            ["git", "-C", str(root), "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            capture_output=True, check=True,
+        )
+        return [p for p in proc.stdout.decode("utf-8", errors="surrogateescape").split("\0") if p]
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+        rel = os.path.relpath(dirpath, root)
+        for name in filenames:
+            files.append(name if rel == "." else os.path.join(rel, name))
+    return files
+
+@dataclass
+class UpdateStats:
+    files: int
+    indexed: int # Read and tokenized
+    removed: int
+    chunks: int
+    segments: int
+    seconds: float
+
+@dataclass
+class Snippet:
+    path: str
+    start: int
+    end: int
+    score: float
+    text: str
+
+class CodeIndex:
+    """
+    BM25 index over a project tree, split into fixed line-range snippets.
+
+    The index is a set of immutable segments, each holding the snippets of
+    some files: a lexicon of term -> (offset, count), packed postings and a
+    doc table, the arrays mmapped at query time. meta.json maps every file to
+    (mtime_ns, size, digest, segment, docs, length); an update stats the tree,
+    re-reads only files whose mtime/size moved, re-tokenizes only those whose
+    content hash changed, and writes them as one new segment. Docs of a file
+    count only in the segment meta.json points at, so older copies are simply
+    masked until the segments are merged by a full rebuild.
+    """
+
+    def __init__(self, root: Path, directory: Optional[Path] = None):
+        self.root = Path(root)
+        self.directory = Path(directory) if directory else default_index_dir(self.root)
+        self._meta: Optional[dict] = None
+
+    @classmethod
+    def for_path(cls, path: Optional[Path] = None) -> "CodeIndex":
+        root = project_root(path)
+        directory = Path(settings.index_dir).expanduser() / default_index_dir(root).name if settings.index_dir else None
+        return cls(root, directory)
+
+    @property
+    def exists(self) -> bool:
+        return (self.directory / "meta.json").exists()
+
+    def _load_meta(self) -> Optional[dict]:
+        try:
+            meta = json.loads((self.directory / "meta.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("version") == INDEX_VERSION else None
+
+    def update(self, rebuild: bool = False) -> UpdateStats:
+        started = time.perf_counter()
+        previous = self._load_meta()
+        meta = None if rebuild else previous
+        old = meta["files"] if meta else {}
+        files: Dict[str, list] = {}
+        changed: Dict[str, list] = {} # rel -> [mtime_ns, size, digest, chunks]
+
+        for rel in list_files(self.root):
+            try:
+                st = os.stat(self.root / rel)
+            except OSError:
+                continue
+            if not S_ISREG(st.st_mode) or st.st_size > MAX_FILE_BYTES:
+                continue
+            prev = old.get(rel)
+            if prev and prev[0] == st.st_mtime_ns and prev[1] == st.st_size:
+                files[rel] = prev
+                continue
+            try:
+                data = (self.root / rel).read_bytes()
+            except OSError:
+                continue
+            if b"\0" in data[:4096]:
+                continue # Binary
+            digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+            if prev and prev[2] == digest:
+                files[rel] = [st.st_mtime_ns, st.st_size, *prev[2:]] # Touched, not changed
+                continue
+            changed[rel] = [st.st_mtime_ns, st.st_size, digest, chunk_text(data.decode("utf-8", errors="replace"))]
+
+        removed = len(old.keys() - files.keys() - changed.keys())
+        segments = dict(meta["segments"]) if meta else {}
+        # Numbering continues across rebuilds: a new segment never overwrites one the current
+        # meta.json (and readers that have it mmapped) still points at; _write_meta drops the old ones
+        next_segment = previous["next"] if previous else 0
+        fresh = sum(len(entry[3]) for entry in changed.values())
+        live = sum(entry[4] for entry in files.values()) + fresh
+        if meta and (len(segments) + bool(changed) > MAX_SEGMENTS or sum(segments.values()) + fresh > 2 * live):
+            stats = self.update(rebuild=True) # Compact: one fresh segment, stale docs dropped
+            stats.removed = removed
+            return stats
+        if changed:
+            name = f"s{next_segment}"
+            next_segment += 1
+            segments[name] = self._write_segment(name, changed, files)
+
+        if changed or removed or meta is None or files != old:
+            used = {entry[3] for entry in files.values()}
+            segments = {name: docs for name, docs in segments.items() if name in used}
+            self._write_meta({
+                "version": INDEX_VERSION,
+                "root": str(self.root),
+                "next": next_segment,
+                "segments": segments,
+                "docs": live,
+                "length": sum(entry[5] for entry in files.values()),
+                "files": files,
+            })
+        return UpdateStats(len(files), len(changed), removed, live, len(segments), time.perf_counter() - started)
+
+    def _write_segment(self, name: str, changed: Dict[str, list], files: Dict[str, list]) -> int:
+        """Writes the snippets of `changed` as segment `name`, recording each file in `files`; returns the doc count."""
+        docs = array("I") # 4 per doc: file number in this segment, start line, end line, length
+        postings: Dict[str, List[int]] = defaultdict(list)
+        paths = sorted(changed)
+        for number, rel in enumerate(paths):
+            mtime_ns, size, digest, chunks = changed[rel]
+            first = len(docs) // 4
+            length = 0
+            for start, end, terms, counts in chunks:
+                base = (len(docs) // 4) << TF_BITS
+                docs.extend((number, start, end, terms))
+                length += terms
+                for term, tf in counts.items():
+                    # A 40-line snippet can still be one very long line; BM25 saturates long before the cap
+                    postings[term].append(base | min(tf, TF_MASK))
+            files[rel] = [mtime_ns, size, digest, name, len(docs) // 4 - first, length]
+
+        packed = array("Q")
+        lexicon = {}
+        for term, entry in postings.items():
+            lexicon[term] = (len(packed), len(entry))
+            packed.extend(entry)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for suffix, data in (("docs", docs), ("post", packed)):
+            with open(self.directory / f"{name}.{suffix}", "wb") as f:
+                data.tofile(f)
+        (self.directory / f"{name}.json").write_text(
+            json.dumps({"paths": paths, "lexicon": lexicon}, separators=(",", ":")), encoding="utf-8"
+        )
+        return len(docs) // 4
+
+    def _write_meta(self, meta: dict):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.directory / "meta.json.tmp"
+        tmp.write_text(json.dumps(meta, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.directory / "meta.json") # Written last: readers never see a half-written update
+        self._meta = None
+        # Segments no longer referenced (merged away, or left by an interrupted update)
+        for path in self.directory.iterdir():
+            segment = path.name.split(".", 1)[0]
+            if path.suffix in (".docs", ".post", ".json") and segment != "meta" and segment not in meta["segments"]:
+                path.unlink(missing_ok=True)
+
+    def _view(self, name: str, fmt: str):
+        path = self.directory / name
+        if path.stat().st_size == 0:
+            return memoryview(b"").cast(fmt)
+        with open(path, "rb") as f:
+            return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)).cast(fmt)
+
+    def search(self, query: str, k: int = 6) -> List[Tuple[str, int, int, float]]:
+        """Top-k (path, start line, end line, score) for `query`."""
+        if self._meta is None:
+            self._meta = self._load_meta()
+        meta = self._meta
+        if not meta or not meta["docs"]:
+            return []
+        files, n_docs = meta["files"], meta["docs"]
+        avgdl = meta["length"] / n_docs
+        terms = set(tokenize(query))
+
+        # Per segment: its term postings and which of its docs are live
+        segments = []
+        df = Counter()
+        for name in meta["segments"]:
+            info = json.loads((self.directory / f"{name}.json").read_text(encoding="utf-8"))
+            paths = info["paths"]
+            alive = [files.get(rel, (None,) * 4)[3] == name for rel in paths]
+            docs, packed = self._view(f"{name}.docs", "I"), self._view(f"{name}.post", "Q")
+            hits = {}
+            for term in terms:
+                entry = info["lexicon"].get(term)
+                if entry is None:
+                    continue
+                offset, count = entry
+                postings = [p for p in packed[offset:offset + count] if alive[docs[(p >> TF_BITS) * 4]]]
+                if postings:
+                    hits[term] = postings
+                    df[term] += len(postings)
+            segments.append((paths, docs, hits))
+
+        scored = []
+        for paths, docs, hits in segments:
+            scores: Dict[int, float] = {}
+            for term, postings in hits.items():
+                idf = math.log(1 + (n_docs - df[term] + 0.5) / (df[term] + 0.5))
+                for p in postings:
+                    doc, tf = p >> TF_BITS, p & TF_MASK
+                    norm = K1 * (1 - B + B * docs[doc * 4 + 3] / avgdl)
+                    scores[doc] = scores.get(doc, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+            for doc, score in heapq.nlargest(k, scores.items(), key=lambda item: item[1]):
+                scored.append((paths[docs[doc * 4]], docs[doc * 4 + 1], docs[doc * 4 + 2], score))
+        return heapq.nlargest(k, scored, key=lambda hit: hit[3])
+
+    def snippets(self, query: str, k: int = 6, max_tokens: int = 4000) -> List[Snippet]:
+        """Top-k hits with their current text, within a token budget."""
+        results = []
+        used = 0
+        for path, start, end, score in self.search(query, k):
+            try:
+                lines = (self.root / path).read_text(encoding="utf-8", errors="replace").splitlines()
+            except OSError:
+                continue
+            text = "\n".join(lines[start - 1:end])
+            cost = estimate_tokens(text)
+            if used + cost > max_tokens:
+                break
+            used += cost
+            results.append(Snippet(path, start, end, score, text))
+        return results
+
+def with_context(message: Message, snippets: List[Snippet]) -> Message:
+    """The user message with retrieved snippets prepended (the stored history keeps the plain question)."""
+    if not snippets:
+        return message
+    blocks = [f"{s.path}:{s.start}-{s.end}\n```\n{s.text}\n```" for s in snippets]
+    context = "Relevant code from the project (retrieved automatically):\n\n" + "\n\n".join(blocks)
+    return Message(role=message.role, content=f"{context}\n\n{message.content}")
+
+def retrieve(query: str, path: Optional[Path] = None) -> List[Snippet]:
+    """Snippets for `query` from the index of the project at `path` (default: cwd); ValueError if there is none."""
+    index = CodeIndex.for_path(path)
+    if not index.exists:
+        raise ValueError(f"No index for {index.root}. Run: mim index")
+    return index.snippets(query, k=settings.index_top_k, max_tokens=settings.index_max_tokens)
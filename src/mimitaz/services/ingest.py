@@ -0,0 +1,96 @@
+import os
+import stat
+import sys
+from typing import Iterable, Iterator, List, TextIO
+from mimitaz.services.llm.tokens import CHARS_PER_TOKEN
+
+# Lines that start a new logical unit in a diff; preferred split points
+FILE_MARKER = "diff --git "
+HUNK_MARKER = "@@ "
+
+def stdin_mode() -> int:
+    try:
+        return os.fstat(sys.stdin.fileno()).st_mode
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+def stdin_is_piped() -> bool:
+    """
+    True when stdin is a pipe, file or socket. Terminals and other character
+    devices (e.g. an inherited /dev/null or pty in editors and cron) are not input.
+    """
+    mode = stdin_mode()
+    return stat.S_ISFIFO(mode) or stat.S_ISREG(mode) or stat.S_ISSOCK(mode)
+
+def should_read_stdin(has_prompt: bool, dash: bool = False) -> bool:
+    """
+    Whether a one-shot `mim` reads stdin as input: always with "-", and
+    otherwise only when it is piped and either there is no prompt or it is a
+    regular file. A pipe next to a prompt is left alone, since callers that
+    inherit one and never close it (editor integrations, subprocess
+    defaults) would wait forever.
+    """
+    if dash:
+        return True
+    if not stdin_is_piped():
+        return False
+    return not has_prompt or stat.S_ISREG(stdin_mode())
+
+def iter_stdin(stream: TextIO = None) -> Iterator[str]:
+    """Yields piped input line by line (newlines kept) without reading it all at once."""
+    stream = stream or sys.stdin
+    if hasattr(stream, "reconfigure"):
+        stream.reconfigure(errors="replace") # Binary noise must not abort the run
+    yield from stream
+
+def chunk_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """Re-splits text that arrives in arbitrary pieces into lines (newlines kept)."""
+    carry = ""
+    for chunk in chunks:
+        lines = (carry + chunk).splitlines(keepends=True)
+        carry = lines.pop() if lines and not lines[-1].endswith("\n") else ""
+        yield from lines
+    if carry:
+        yield carry
+
+def split_lines(lines: Iterable[str], max_tokens: int) -> Iterator[str]:
+    """
+    Groups lines into chunks of at most `max_tokens` (estimated).
+    Splits at the last diff file/hunk boundary inside the chunk when there is one,
+    otherwise at a line boundary. Single lines longer than the budget are cut.
+    """
+    budget = max(1, max_tokens) * CHARS_PER_TOKEN
+    current: List[str] = []
+    size = 0
+    boundary = 0 # Index in `current` of the last line that starts a file or hunk
+    in_header = False # Between "diff --git" and its first hunk
+
+    for line in lines:
+        while len(line) > budget:
+            if current:
+                yield "".join(current)
+                current, size, boundary = [], 0, 0
+            yield line[:budget]
+            line = line[budget:]
+
+        while size + len(line) > budget and current:
+            cut = boundary if boundary > 0 else len(current)
+            yield "".join(current[:cut])
+            current = current[cut:]
+            size = sum(len(l) for l in current)
+            boundary = 0
+
+        if line.startswith(FILE_MARKER):
+            in_header = True
+            if current:
+                boundary = len(current)
+        elif line.startswith(HUNK_MARKER):
+            # Keep a file header together with its first hunk
+            if not in_header and current:
+                boundary = len(current)
+            in_header = False
+        current.append(line)
+        size += len(line)
+
+    if current:
+        yield "".join(current)
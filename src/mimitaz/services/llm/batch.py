@@ -0,0 +1,256 @@
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, TYPE_CHECKING
+from mimitaz.services.llm.provider import LLMProvider, Message
+from mimitaz.services.llm.tokens import estimate_tokens
+
+if TYPE_CHECKING:
+    from pydantic import SecretStr
+
+class TokenBucket:
+    """Refills `per_minute` units evenly over a minute; 0 means unlimited."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.level = per_minute
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def set_limit(self, per_minute: float):
+        """Changes the limit in place; what was already spent stays spent."""
+        if per_minute == self.capacity:
+            return
+        if self.capacity:
+            self._refill()
+            self.level = min(self.level, per_minute)
+        else:
+            self.level = per_minute
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if they are now)."""
+        if not self.capacity:
+            return 0.0
+        self._refill()
+        # A single request larger than the whole bucket only waits for a full bucket
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        if self.capacity:
+            self._refill()
+            self.level -= amount # May go negative; later requests wait it off
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limiter shared by all workers."""
+
+    def __init__(self, rpm: float = 0, tpm: float = 0):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int):
+        """Waits until one request of roughly `tokens` input tokens may be sent."""
+        async with self._lock:
+            while True:
+                delay = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+            self.requests.take(1)
+            self.tokens.take(tokens)
+
+    def configure(self, rpm: float = 0, tpm: float = 0):
+        self.requests.set_limit(rpm)
+        self.tokens.set_limit(tpm)
+
+    def consume(self, tokens: int):
+        """Charges tokens known only after the fact (the generated output)."""
+        self.tokens.take(tokens)
+
+# One limiter per provider name, so limits hold across concurrent batches in a process
+_limiters: Dict[str, RateLimiter] = {}
+
+def limiter_for(provider: str, rpm: float = 0, tpm: float = 0) -> RateLimiter:
+    if provider not in _limiters:
+        _limiters[provider] = RateLimiter(rpm, tpm)
+    else:
+        _limiters[provider].configure(rpm, tpm) # The latest limits win
+    return _limiters[provider]
+
+@dataclass
+class BatchItem:
+    index: int
+    id: Any
+    messages: List[Message]
+    model: Optional[str] = None
+    temperature: Optional[float] = None
+
+@dataclass
+class BatchResult:
+    index: int
+    id: Any
+    output: str = ""
+    error: Optional[str] = None
+    ttft: Optional[float] = None
+    elapsed: float = 0.0
+
+    def to_json(self) -> str:
+        record = {"id": self.id, "index": self.index, "output": self.output}
+        if self.error is not None:
+            record["error"] = self.error
+        record["ttft"] = round(self.ttft, 4) if self.ttft is not None else None
+        record["elapsed"] = round(self.elapsed, 4)
+        return json.dumps(record, ensure_ascii=False)
+
+def parse_item(index: int, line: str) -> BatchItem:
+    """
+    One JSONL line -> BatchItem. Accepts a bare JSON string (the prompt) or an
+    object with "prompt" and/or "messages", plus optional "id", "system",
+    "model" and "temperature".
+    """
+    data = json.loads(line)
+    if isinstance(data, str):
+        data = {"prompt": data}
+    if not isinstance(data, dict):
+        raise ValueError("expected a JSON object or string")
+
+    messages = [Message(role=m["role"], content=m["content"]) for m in data.get("messages", [])]
+    if data.get("system"):
+        messages.insert(0, Message(role="system", content=data["system"]))
+    if data.get("prompt"):
+        messages.append(Message(role="user", content=data["prompt"]))
+    if not messages:
+        raise ValueError("item has neither 'prompt' nor 'messages'")
+
+    return BatchItem(
+        index=index,
+        id=data.get("id", index),
+        messages=messages,
+        model=data.get("model"),
+        temperature=data.get("temperature"),
+    )
+
+async def run_item(
+    provider: LLMProvider,
+    item: BatchItem,
+    model: str,
+    api_key: "SecretStr",
+    limiter: RateLimiter,
+) -> BatchResult:
+    result = BatchResult(index=item.index, id=item.id)
+    await limiter.acquire(sum(estimate_tokens(m.content) for m in item.messages))
+
+    started = time.perf_counter()
+    parts = []
+    try:
+        kwargs = {} if item.temperature is None else {"temperature": item.temperature}
+        stream = provider.stream_chat(messages=item.messages, model=item.model or model, api_key=api_key, **kwargs)
+        async for chunk in stream:
+            if chunk.delta:
+                if result.ttft is None:
+                    result.ttft = time.perf_counter() - started
+                parts.append(chunk.delta)
+    except Exception as e:
+        result.error = str(e) or type(e).__name__
+
+    result.output = "".join(parts)
+    result.elapsed = time.perf_counter() - started
+    limiter.consume(estimate_tokens(result.output))
+    return result
+
+async def run_batch(
+    provider: LLMProvider,
+    lines: Iterable[str],
+    model: str,
+    api_key: "SecretStr",
+    emit: Callable[[BatchResult], None],
+    concurrency: int = 8,
+    limiter: Optional[RateLimiter] = None,
+    ordered: bool = False,
+) -> int:
+    """
+    Runs every JSONL line in `lines` through `provider` with at most
+    `concurrency` requests in flight, calling `emit` as each result is ready
+    (or in input order when `ordered`). Input is read lazily and results are
+    not retained, so huge files are never held in memory; in ordered mode at
+    most a few times `concurrency` results wait behind a slow item. Returns
+    the count.
+    Files (and stdin) are read in a worker thread, so a slow pipe never
+    blocks the requests in flight.
+    """
+    concurrency = max(1, concurrency)
+    limiter = limiter or RateLimiter()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    pending: Dict[int, BatchResult] = {}
+    emitted = 0
+    next_index = 0
+    # Ordered: inputs read ahead of the oldest unfinished one, so a slow item cannot pile up results
+    window = concurrency * 4
+    advanced = asyncio.Event()
+
+    def deliver(result: BatchResult):
+        nonlocal next_index, emitted
+        if not ordered:
+            emit(result)
+            emitted += 1
+            return
+        pending[result.index] = result
+        while next_index in pending:
+            emit(pending.pop(next_index))
+            emitted += 1
+            next_index += 1
+            advanced.set()
+
+    async def read_lines():
+        readline = getattr(lines, "readline", None)
+        if readline is None:
+            for line in lines:
+                yield line
+            return
+        loop = asyncio.get_running_loop()
+        while True:
+            line = await loop.run_in_executor(None, readline)
+            if not line:
+                return
+            yield line
+
+    async def produce():
+        index = 0
+        async for line in read_lines():
+            if not line.strip():
+                continue
+            while ordered and index - next_index >= window:
+                advanced.clear()
+                await advanced.wait()
+            try:
+                await queue.put(parse_item(index, line))
+            except (ValueError, KeyError, TypeError) as e:
+                await queue.put(BatchResult(index=index, id=index, error=f"invalid input: {e}"))
+            index += 1
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def work():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            if isinstance(item, BatchResult):
+                deliver(item)
+                continue
+            deliver(await run_item(provider, item, model, api_key, limiter))
+
+    await asyncio.gather(produce(), *(work() for _ in range(concurrency)))
+    return emitted
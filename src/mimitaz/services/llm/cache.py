@@ -0,0 +1,245 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncGenerator, List, Optional, TYPE_CHECKING
+from mimitaz.config import settings
+from mimitaz.services.llm.provider import LLMProvider, Message, StreamChunk
+
+if TYPE_CHECKING:
+    from pydantic import SecretStr
+
+STATS_FILE = "stats.json"
+# Eviction frees down to this fraction of max_bytes
+EVICT_TO = 0.9
+
+def default_cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "mimitaz" / "responses"
+
+def cache_key(provider: str, model: str, messages: List[Message], temperature: float) -> str:
+    """Content address of a request: same provider, model, messages and temperature -> same key."""
+    payload = json.dumps(
+        {
+            "provider": provider,
+            "model": model,
+            "messages": [[m.role, m.content] for m in messages],
+            "temperature": temperature,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+@dataclass
+class CacheStats:
+    entries: int
+    bytes: int
+    max_bytes: int
+    hits: int
+    misses: int
+
+class ResponseCache:
+    """
+    On-disk, content-addressed store of streamed responses.
+    Entries live at <dir>/<key[:2]>/<key>.json and hold each chunk with its
+    inter-arrival time. File mtime tracks last use for LRU eviction; the
+    creation time inside the entry drives TTL expiry. The total size is kept
+    in the stats file, so the directory is only scanned when it goes over
+    max_bytes.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, ttl: float):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+    @classmethod
+    def from_settings(cls) -> "ResponseCache":
+        directory = Path(settings.cache_dir).expanduser() if settings.cache_dir else default_cache_dir()
+        return cls(directory, settings.cache_max_mb * 1024 * 1024, settings.cache_ttl)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _entries(self) -> List[Path]:
+        if not self.directory.exists():
+            return []
+        return list(self.directory.glob("??/*.json"))
+
+    def get(self, key: str) -> Optional[List[list]]:
+        """Returns the recorded [delta, finish_reason, dt] chunks, or None on a miss."""
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._count("misses")
+            return None
+
+        if self.ttl and time.time() - entry.get("created", 0) > self.ttl:
+            size = path.stat().st_size
+            path.unlink(missing_ok=True)
+            self._count("misses", freed=size)
+            return None
+
+        os.utime(path) # Mark as recently used
+        self._count("hits")
+        return entry["chunks"]
+
+    def put(self, key: str, chunks: List[list]):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            replaced = path.stat().st_size
+        except OSError:
+            replaced = 0
+        data = json.dumps({"created": time.time(), "chunks": chunks}, separators=(",", ":")).encode("utf-8")
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path) # Atomic: readers never see a partial entry
+
+        counters = self._read_counters()
+        if "bytes" in counters:
+            total = counters["bytes"] + len(data) - replaced
+        else:
+            total = self._size() # Cache written by an older version: count it once
+        if total > self.max_bytes:
+            total = self.evict()
+        counters["bytes"] = max(0, total)
+        self._write_counters(counters)
+
+    def _size(self) -> int:
+        total = 0
+        for path in self._entries():
+            try:
+                total += path.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    def evict(self) -> int:
+        """
+        Drops least recently used entries until the cache fits under max_bytes,
+        with some headroom so that the next puts do not scan again. Returns
+        the size left.
+        """
+        entries = []
+        total = 0
+        for path in self._entries():
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        if total <= self.max_bytes:
+            return total
+        low_water = self.max_bytes * EVICT_TO
+        for _, size, path in sorted(entries):
+            path.unlink(missing_ok=True)
+            total -= size
+            if total <= low_water:
+                break
+        return total
+
+    def clear(self) -> int:
+        """Removes every entry. Returns how many were deleted."""
+        # Only the cache's own files: cache.dir may point at a directory holding other data
+        entries = self._entries()
+        for path in entries:
+            path.unlink(missing_ok=True)
+        for shard in {path.parent for path in entries}:
+            try:
+                shard.rmdir() # Left in place if anything else lives there
+            except OSError:
+                pass
+        (self.directory / STATS_FILE).unlink(missing_ok=True)
+        return len(entries)
+
+    def stats(self) -> CacheStats:
+        entries = self._entries()
+        counters = self._read_counters()
+        return CacheStats(
+            entries=len(entries),
+            bytes=sum(p.stat().st_size for p in entries),
+            max_bytes=self.max_bytes,
+            hits=counters.get("hits", 0),
+            misses=counters.get("misses", 0),
+        )
+
+    def _read_counters(self) -> dict:
+        try:
+            return json.loads((self.directory / STATS_FILE).read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _count(self, name: str, freed: int = 0):
+        counters = self._read_counters()
+        counters[name] = counters.get(name, 0) + 1
+        if freed and "bytes" in counters:
+            counters["bytes"] = max(0, counters["bytes"] - freed)
+        self._write_counters(counters)
+
+    def _write_counters(self, counters: dict):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            (self.directory / STATS_FILE).write_text(json.dumps(counters))
+        except OSError:
+            pass # Best effort: the size is recounted by the next eviction
+
+class CachedProvider(LLMProvider):
+    """
+    Wraps a provider with the response cache.
+    Hits replay the recorded StreamChunks (instantly, or with the original
+    pacing when fast_forward is off) without any API call.
+    """
+
+    def __init__(self, inner: LLMProvider, name: str, cache: ResponseCache, fast_forward: bool = True):
+        self.inner = inner
+        self.name = name
+        self.cache = cache
+        self.fast_forward = fast_forward
+
+    def __getattr__(self, name: str):
+        # Expose the wrapped provider's attributes (e.g. BASE_URL for pre-warming)
+        return getattr(self.inner, name)
+
+    async def stream_chat(
+        self,
+        messages: List[Message],
+        model: str,
+        api_key: "SecretStr",
+        temperature: float = 0.7
+    ) -> AsyncGenerator[StreamChunk, None]:
+        key = cache_key(self.name, model, messages, temperature)
+        recorded = self.cache.get(key)
+        if recorded is not None:
+            for delta, finish_reason, dt in recorded:
+                if not self.fast_forward and dt:
+                    await asyncio.sleep(dt)
+                yield StreamChunk(delta=delta, finish_reason=finish_reason)
+            return
+
+        chunks = []
+        last = time.perf_counter()
+        async for chunk in self.inner.stream_chat(messages=messages, model=model, api_key=api_key, temperature=temperature):
+            now = time.perf_counter()
+            chunks.append([chunk.delta, chunk.finish_reason, round(now - last, 4)])
+            last = now
+            yield chunk
+
+        # Only complete streams are stored; an interrupted one never gets here
+        self.cache.put(key, chunks)
+
+    async def validate_connection(self, api_key: "SecretStr") -> bool:
+        return await self.inner.validate_connection(api_key)
+
+def with_cache(provider: LLMProvider, name: str) -> LLMProvider:
+    """Wraps `provider` in the response cache when it is enabled in settings."""
+    if not settings.cache_enabled:
+        return provider
+    return CachedProvider(provider, name, ResponseCache.from_settings(), fast_forward=settings.cache_fast_forward)
@@ -0,0 +1,184 @@
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncGenerator, AsyncIterator, Callable, List, Optional
+from mimitaz.services.llm.provider import StreamChunk
+
+# Opening fence with its info string: ```python src/app.py
+OPEN_RE = re.compile(r"^ {0,3}(`{3,}|~{3,})\s*([^`]*?)\s*$")
+# Something that looks like a relative file path: has a name and an extension
+PATH_RE = re.compile(r"[\w][\w.\-/]*\.[A-Za-z0-9]{1,10}")
+# Filename hints inside the info string: title="app.py", file=app.py, python:app.py
+INFO_HINT_RE = re.compile(r"""(?:title|file|filename|name|path)=["']?([^"'\s]+)|^[\w+#-]+:(\S+)$""")
+# First line of the block naming its file: "# app.py", "// file: src/x.ts", "<!-- index.html -->"
+COMMENT_HINT_RE = re.compile(r"^\s*(?:#|//|--|;|/\*|<!--)\s*(?:file(?:name)?:\s*)?(\S+?)\s*(?:\*/|-->)?\s*$", re.IGNORECASE)
+# A path the text right before the fence points at: `src/app.py`, **app.py**, app.py:
+LEAD_HINT_RE = re.compile(r"`([^`\s]+)`|\*\*([^*\s]+)\*\*|^\s*([\w.\-/]+):?\s*$")
+
+EXTENSIONS = {
+    "python": "py", "py": "py", "python3": "py",
+    "javascript": "js", "js": "js", "jsx": "jsx", "typescript": "ts", "ts": "ts", "tsx": "tsx",
+    "bash": "sh", "sh": "sh", "shell": "sh", "zsh": "sh", "console": "txt",
+    "json": "json", "yaml": "yaml", "yml": "yaml", "toml": "toml", "ini": "ini",
+    "rust": "rs", "go": "go", "java": "java", "kotlin": "kt", "swift": "swift",
+    "c": "c", "cpp": "cpp", "c++": "cpp", "csharp": "cs", "cs": "cs", "ruby": "rb", "php": "php",
+    "html": "html", "css": "css", "scss": "scss", "sql": "sql", "markdown": "md", "md": "md",
+    "diff": "diff", "patch": "diff", "xml": "xml", "lua": "lua", "r": "r", "text": "txt", "txt": "txt",
+}
+# Suffixes trusted in hints outside the info string (so `os.path` or `json.dumps` are not file names)
+KNOWN_SUFFIXES = set(EXTENSIONS.values()) | {"h", "hpp", "vue", "svelte", "cfg", "conf", "env", "lock", "gradle", "mjs", "cjs"}
+# Languages whose files are conventionally named, not suffixed
+FILENAMES = {"dockerfile": "Dockerfile", "makefile": "Makefile"}
+
+@dataclass
+class Block:
+    path: Path
+    language: str
+    lines: int
+    closed: bool # False: the stream ended inside the block
+
+    def describe(self) -> str:
+        note = "" if self.closed else " (unterminated)"
+        return f"wrote {self.path} ({self.lines} lines){note}"
+
+def looks_like_file(candidate: str) -> bool:
+    return bool(PATH_RE.fullmatch(candidate)) and ("/" in candidate or candidate.rsplit(".", 1)[1].lower() in KNOWN_SUFFIXES)
+
+class BlockExtractor:
+    """
+    Pulls fenced code blocks out of Markdown that arrives in pieces and
+    writes each one to `directory` the moment its closing fence is seen.
+
+    The file name comes from a hint when there is one (the info string,
+    a comment on the block's first line, or a path mentioned on the line
+    before the fence) and is block-<n>.<ext> otherwise. Hinted names are
+    overwritten (the model is revising that file); numbered ones never
+    replace an existing file. Files are written to a temporary name and
+    renamed, so watchers never see half a block.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.blocks: List[Block] = []
+        self._partial = ""
+        self._lead = "" # Last non-blank line outside a block
+        self._fence: Optional[str] = None
+        self._info = ""
+        self._body: List[str] = []
+
+    def feed(self, delta: str) -> List[Block]:
+        """Adds a delta and returns the blocks it completed (possibly none)."""
+        self._partial += delta
+        if "\n" not in delta:
+            return []
+        *lines, self._partial = self._partial.split("\n")
+        done = []
+        for line in lines:
+            block = self._push_line(line)
+            if block:
+                done.append(block)
+        return done
+
+    def close(self) -> List[Block]:
+        """Ends the stream; a block still open (a cut-off answer) is written as it stands."""
+        done = []
+        if self._partial:
+            block = self._push_line(self._partial)
+            self._partial = ""
+            if block:
+                done.append(block)
+        if self._fence is not None:
+            done.append(self._write(closed=False))
+        return done
+
+    def _push_line(self, line: str) -> Optional[Block]:
+        if self._fence is None:
+            match = OPEN_RE.match(line)
+            if match:
+                self._fence, self._info, self._body = match.group(1), match.group(2), []
+            elif line.strip():
+                self._lead = line
+            return None
+
+        stripped = line.strip()
+        if stripped.startswith(self._fence) and not stripped.strip(self._fence[0]) and len(line) - len(line.lstrip()) <= 3:
+            return self._write(closed=True)
+        self._body.append(line)
+        return None
+
+    def _write(self, closed: bool) -> Block:
+        language = self._info.split()[0].lower() if self._info else ""
+        hinted = self._hint()
+        path = self._resolve(hinted) if hinted else self._numbered(language)
+        text = "\n".join(self._body) + "\n"
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+
+        block = Block(path, language, len(self._body), closed)
+        self.blocks.append(block)
+        self._fence, self._info, self._body, self._lead = None, "", [], ""
+        return block
+
+    def _hint(self) -> Optional[str]:
+        words = self._info.split()
+        for word in words[1:] if words else []:
+            match = INFO_HINT_RE.search(word)
+            if match or PATH_RE.fullmatch(word):
+                return (match.group(1) or match.group(2)) if match else word
+        if words:
+            match = INFO_HINT_RE.search(words[0])
+            if match and match.group(2):
+                return match.group(2)
+            if PATH_RE.fullmatch(words[0]) and words[0].lower() not in EXTENSIONS:
+                return words[0] # ```app.py
+        if self._body:
+            match = COMMENT_HINT_RE.match(self._body[0])
+            if match and looks_like_file(match.group(1)):
+                return match.group(1)
+        if self._lead and len(self._lead) <= 160:
+            for match in LEAD_HINT_RE.finditer(self._lead):
+                candidate = next(g for g in match.groups() if g).rstrip(":")
+                if looks_like_file(candidate):
+                    return candidate
+        return None
+
+    def _resolve(self, name: str) -> Path:
+        """`name` inside the output directory; absolute or escaping paths keep only their file name."""
+        relative = Path(name)
+        if relative.is_absolute() or ".." in relative.parts:
+            relative = Path(relative.name)
+        return self.directory / relative
+
+    def _numbered(self, language: str) -> Path:
+        if language in FILENAMES:
+            name = FILENAMES[language]
+            path = self.directory / name
+            n = 2
+            while path.exists():
+                path, n = self.directory / f"{name}.{n}", n + 1
+            return path
+        ext = EXTENSIONS.get(language) or (language if language.isalnum() and len(language) <= 10 else "txt")
+        n = len(self.blocks) + 1
+        while (self.directory / f"block-{n}.{ext}").exists():
+            n += 1
+        return self.directory / f"block-{n}.{ext}"
+
+async def extract_blocks(
+    stream: AsyncIterator[StreamChunk], directory: Path, on_block: Optional[Callable[[Block], None]] = None,
+) -> AsyncGenerator[StreamChunk, None]:
+    """Passes a stream through, writing each fenced code block to `directory` as soon as it closes."""
+    extractor = BlockExtractor(directory)
+    async for chunk in stream:
+        if chunk.delta:
+            # Written before the closing fence is passed on: by the time it is shown, the file is there
+            for block in extractor.feed(chunk.delta):
+                if on_block:
+                    on_block(block)
+        yield chunk
+    for block in extractor.close():
+        if on_block:
+            on_block(block)
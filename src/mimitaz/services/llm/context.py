@@ -0,0 +1,140 @@
+from typing import Awaitable, Callable, Dict, List, Optional
+from mimitaz.services.llm.provider import Message
+from mimitaz.services.llm.tokens import CHARS_PER_TOKEN, estimate_tokens, context_window
+
+# Per-message framing overhead (role markers etc.) added to the content estimate
+MESSAGE_OVERHEAD = 4
+
+SUMMARY_HEADER = "Summary of the earlier conversation:"
+ELIDED = "\n\n[... {count} characters omitted: the message did not fit in the context window ...]\n\n"
+
+SUMMARIZE_INSTRUCTIONS = (
+    "Condense the conversation below into a short summary that preserves facts, decisions, "
+    "code identifiers and open questions needed to continue it. Reply with the summary only."
+)
+
+# (messages to condense, previous summary or "") -> new summary text
+Summarizer = Callable[[List[Message], str], Awaitable[str]]
+
+class ConversationContext:
+    """
+    REPL history kept within a per-model token budget.
+
+    Token counts are estimated once per message and kept as a running total.
+    When the history crosses `threshold` of the budget, the oldest turns are
+    dropped (or folded into a running summary) until it is back under
+    `target`, so the size of each request stays roughly constant however long
+    the session runs. The system message is pinned and never dropped.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        budget: Optional[int] = None,
+        threshold: float = 0.75,
+        target: float = 0.5,
+        reserve: int = 4096,
+    ):
+        self.budget = budget or max(1024, context_window(model) - reserve)
+        self.threshold = threshold
+        self.target = target
+        self.system: Optional[Message] = None
+        self.summary = ""
+        self.turns: List[Message] = []
+        self._tokens: Dict[Message, int] = {} # Messages are frozen, so equal ones share an entry
+        self._total = 0
+        self._summary: Optional[Message] = None # System message carrying the summary
+
+    def tokens(self, message: Message) -> int:
+        if message not in self._tokens:
+            self._tokens[message] = estimate_tokens(message.content) + MESSAGE_OVERHEAD
+        return self._tokens[message]
+
+    @property
+    def total_tokens(self) -> int:
+        pinned = sum(self.tokens(m) for m in self._pinned())
+        return self._total + pinned
+
+    def fit(self, message: Message) -> Message:
+        """
+        `message`, or a shortened copy that fits in the budget next to the
+        system prompt and summary. The middle is cut: pasted input often ends
+        with the actual question.
+        """
+        room = self.budget - sum(self.tokens(m) for m in self._pinned()) - MESSAGE_OVERHEAD
+        if self.tokens(message) - MESSAGE_OVERHEAD <= room:
+            return message
+        keep = max(0, room * CHARS_PER_TOKEN - len(ELIDED) - 16)
+        head, tail = message.content[:keep // 2], message.content[len(message.content) - keep // 2:]
+        elided = ELIDED.format(count=len(message.content) - 2 * (keep // 2))
+        return Message(role=message.role, content=head + elided + tail)
+
+    def set_system(self, content: str):
+        if self.system is not None:
+            self._tokens.pop(self.system, None)
+        self.system = Message(role="system", content=content)
+
+    def append(self, message: Message):
+        if message.role == "system":
+            self.set_system(message.content)
+            return
+        self.turns.append(message)
+        self._total += self.tokens(message)
+
+    def messages(self) -> List[Message]:
+        """The request history: system prompt, summary, then retained turns."""
+        return self._pinned() + self.turns
+
+    def _pinned(self) -> List[Message]:
+        return [m for m in (self.system, self._summary) if m is not None]
+
+    def needs_compaction(self) -> bool:
+        return self.total_tokens > self.budget * self.threshold
+
+    async def compact(self, summarizer: Optional[Summarizer] = None, keep: int = 2):
+        """
+        Drops the oldest turns until the history fits under `target` of the
+        budget, always keeping the last `keep` messages and starting on a user
+        turn. With a summarizer, dropped turns are folded into the summary.
+        """
+        limit = self.budget * self.target
+        dropped: List[Message] = []
+        while len(self.turns) > keep and self.total_tokens > limit:
+            dropped.append(self._drop_oldest())
+        # Providers expect the history to open with a user turn
+        while len(self.turns) > 1 and self.turns[0].role != "user":
+            dropped.append(self._drop_oldest())
+
+        if dropped and summarizer is not None:
+            self.summary = (await summarizer(dropped, self.summary)).strip()
+            self._refresh_summary()
+
+    def _drop_oldest(self) -> Message:
+        message = self.turns.pop(0)
+        self._total -= self.tokens(message)
+        self._tokens.pop(message, None)
+        return message
+
+    def _refresh_summary(self):
+        if self._summary is not None:
+            self._tokens.pop(self._summary, None)
+        self._summary = Message(role="system", content=f"{SUMMARY_HEADER}\n{self.summary}") if self.summary else None
+
+def transcript(messages: List[Message]) -> str:
+    return "\n\n".join(f"{m.role.upper()}: {m.content}" for m in messages)
+
+def provider_summarizer(provider, model: str, api_key) -> Summarizer:
+    """Builds a Summarizer that asks `provider` to condense dropped turns."""
+    from mimitaz.services.llm.mapreduce import collect
+
+    async def summarize(messages: List[Message], previous: str) -> str:
+        body = transcript(messages)
+        if previous:
+            body = f"{SUMMARY_HEADER}\n{previous}\n\n{body}"
+        request = [
+            Message(role="system", content=SUMMARIZE_INSTRUCTIONS),
+            Message(role="user", content=body),
+        ]
+        return await collect(provider.stream_chat(messages=request, model=model, api_key=api_key, temperature=0.0))
+
+    return summarize
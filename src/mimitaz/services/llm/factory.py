@@ -1,24 +1,43 @@
+from importlib import import_module
+from typing import Dict, Optional
 from mimitaz.config import settings
 from mimitaz.services.llm.provider import LLMProvider
-from mimitaz.services.llm.providers.mock import MockProvider
-from mimitaz.services.llm.providers.openai import OpenAIProvider
-from mimitaz.services.llm.providers.anthropic import AnthropicProvider
-from mimitaz.services.llm.providers.zhipu import ZhipuProvider
 
-def get_provider() -> LLMProvider:
+# Provider name -> "module:Class". Modules (and httpx) are only imported
+# when a provider is actually selected.
+PROVIDERS: Dict[str, str] = {
+    "mock": "mimitaz.services.llm.providers.mock:MockProvider",
+    "openai": "mimitaz.services.llm.providers.openai:OpenAIProvider",
+    "anthropic": "mimitaz.services.llm.providers.anthropic:AnthropicProvider",
+    "zhipu": "mimitaz.services.llm.providers.zhipu:ZhipuProvider",
+    "glm": "mimitaz.services.llm.providers.zhipu:ZhipuProvider",
+    "hedge": "mimitaz.services.llm.hedge:HedgedProvider",
+    "router": "mimitaz.services.llm.router:RoutedProvider",
+    "replay": "mimitaz.services.llm.recording:ReplayProvider",
+}
+
+def register_provider(name: str, target: str):
+    """Registers a provider class by import path, e.g. "pkg.module:MyProvider"."""
+    PROVIDERS[name] = target
+
+def get_provider(name: Optional[str] = None) -> LLMProvider:
     """
     Factory function to return the configured provider.
     """
-    if settings.debug and settings.provider == "mock":
-        return MockProvider()
-    
-    if settings.provider == "openai":
-        return OpenAIProvider()
-    
-    if settings.provider == "anthropic":
-        return AnthropicProvider()
-    
-    if settings.provider in ("zhipu", "glm"):
-        return ZhipuProvider()
-        
-    raise ValueError(f"Unknown provider '{settings.provider}'. Check your configuration.")
+    name = name or settings.provider
+
+    # The mock backend is only reachable in debug mode
+    if name == "mock" and not settings.debug:
+        raise ValueError("The 'mock' provider is only available in debug mode (--debug).")
+
+    target = PROVIDERS.get(name)
+    if target is None and name in settings.endpoints:
+        # A server defined in the config (endpoints.<name>.*)
+        from mimitaz.services.llm.providers.endpoint import EndpointProvider
+        return EndpointProvider(name)
+    if target is None:
+        raise ValueError(f"Unknown provider '{name}'. Check your configuration.")
+
+    module_path, class_name = target.split(":")
+    provider_cls = getattr(import_module(module_path), class_name)
+    return provider_cls()
@@ -0,0 +1,241 @@
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncGenerator, AsyncIterator, List, Optional, Set, Tuple, TYPE_CHECKING
+from mimitaz.config import settings
+from mimitaz.services.llm.provider import LLMProvider, Message, StreamChunk
+
+if TYPE_CHECKING:
+    from pydantic import SecretStr
+
+STATS_FILE = Path.home() / ".mimitaz" / "hedge_stats.json"
+MAX_SAMPLES = 500
+# How long a losing primary is kept alive to learn its real time-to-first-token
+MEASURE_TIMEOUT = 30.0
+
+@dataclass
+class HedgeTarget:
+    provider: str
+    model: str
+
+    @property
+    def label(self) -> str:
+        return f"{self.provider}:{self.model}"
+
+@dataclass
+class HedgeReport:
+    winner: str
+    ttft: float
+    hedged: int # Requests sent
+    saved: Optional[float] = None # Primary TTFT minus winner TTFT, once known
+    p95_saved: Optional[float] = None
+
+def parse_targets(spec: str, default_model: str) -> List[HedgeTarget]:
+    """
+    "openai:gpt-4o, anthropic:claude-3-5-sonnet-latest, local" -> targets. Without a
+    model, an endpoint profile's own model is used, otherwise `default_model`.
+    """
+    targets = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        provider, _, model = item.partition(":")
+        provider, model = provider.strip(), model.strip()
+        if not model:
+            profile = settings.endpoints.get(provider)
+            model = (profile.model if profile is not None else None) or default_model
+        targets.append(HedgeTarget(provider=provider, model=model))
+    return targets
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+class HedgeStats:
+    """Recent TTFT savings, kept in a small JSON file so p95 spans sessions."""
+
+    def __init__(self, path: Path = STATS_FILE):
+        self.path = path
+
+    def samples(self) -> List[float]:
+        try:
+            return json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return []
+
+    def add(self, saved: float):
+        samples = (self.samples() + [round(saved, 4)])[-MAX_SAMPLES:]
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(samples))
+        except OSError:
+            pass
+
+    def p95(self) -> Optional[float]:
+        return percentile(self.samples(), 95)
+
+async def prime(stream: AsyncIterator[StreamChunk]) -> List[StreamChunk]:
+    """Reads a stream up to and including its first token (or its end)."""
+    held = []
+    while True:
+        try:
+            chunk = await stream.__anext__()
+        except StopAsyncIteration:
+            return held
+        held.append(chunk)
+        if chunk.delta or chunk.finish_reason:
+            return held
+
+class HedgedProvider(LLMProvider):
+    """
+    Races an ordered list of provider/model targets.
+    The primary is sent first; whenever `delay` seconds pass without a first
+    token the next target is sent too. The first stream to produce a token is
+    kept and the others are cancelled (closing their HTTP responses). When a
+    backup wins, the primary is watched until its first token so the TTFT
+    saved can be reported, then cancelled as well.
+    """
+
+    def __init__(self, targets: Optional[List[HedgeTarget]] = None, delay: Optional[float] = None):
+        self.targets = targets or parse_targets(settings.hedge_targets, settings.model)
+        if not self.targets:
+            raise ValueError("No hedge targets. Run: mim config set hedge.targets openai:gpt-4o,anthropic:claude-3-5-sonnet-latest")
+        self.delay = settings.hedge_delay if delay is None else delay
+        self.stats = HedgeStats()
+        self.last_report: Optional[HedgeReport] = None
+        self._background: Set[asyncio.Task] = set()
+
+    def _open(self, target: HedgeTarget, messages: List[Message], temperature: float) -> AsyncIterator[StreamChunk]:
+        from mimitaz.services.llm.factory import get_provider
+        provider = get_provider(target.provider)
+        api_key = settings.get_api_key(target.provider)
+        return provider.stream_chat(messages=messages, model=target.model, api_key=api_key, temperature=temperature)
+
+    async def stream_chat(
+        self,
+        messages: List[Message],
+        model: str,
+        api_key: "SecretStr",
+        temperature: float = 0.7
+    ) -> AsyncGenerator[StreamChunk, None]:
+        started = time.perf_counter()
+        racers: List[Tuple[asyncio.Task, AsyncIterator[StreamChunk]]] = []
+        labels: List[str] = [] # Target of each racer
+        pending: Set[asyncio.Task] = set()
+        last_error: Optional[BaseException] = None
+        next_target = 0
+        winner = None
+
+        def launch():
+            """Sends the next target that can be opened; one that cannot (e.g. no key) is skipped."""
+            nonlocal next_target, last_error
+            while next_target < len(self.targets):
+                target = self.targets[next_target]
+                next_target += 1
+                try:
+                    stream = self._open(target, messages, temperature)
+                except Exception as e:
+                    last_error = e
+                    continue
+                task = asyncio.create_task(prime(stream))
+                racers.append((task, stream))
+                labels.append(target.label)
+                pending.add(task)
+                return
+
+        try:
+            launch()
+            while winner is None:
+                more = next_target < len(self.targets)
+                if not pending and not more:
+                    raise last_error or RuntimeError("All hedge targets failed")
+                if not pending:
+                    launch() # A target failed outright: move on immediately
+                    continue
+                done, _ = await asyncio.wait(pending, timeout=self.delay if more else None, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    launch() # No first token yet: hedge with the next target
+                    continue
+                pending.difference_update(done)
+                # Several can finish in one wait: the earliest target wins, not set order
+                for i, (task, _) in enumerate(racers):
+                    if task not in done:
+                        continue
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                    elif winner is None:
+                        winner = i
+        except BaseException:
+            await self._cancel(racers)
+            raise
+
+        ttft = time.perf_counter() - started
+        task, stream = racers[winner]
+        losers = [r for i, r in enumerate(racers) if i != winner]
+        report = HedgeReport(winner=labels[winner], ttft=ttft, hedged=len(racers))
+        if winner == 0:
+            report.saved = 0.0
+            self.stats.add(0.0)
+            await self._cancel(losers)
+        elif losers[0][0].done():
+            await self._cancel(losers) # The primary already failed: nothing to measure, only close it
+        else:
+            await self._cancel(losers[1:])
+            self._watch_primary(losers[0], started, ttft)
+        report.p95_saved = self.stats.p95()
+        self.last_report = report
+
+        try:
+            for chunk in task.result():
+                yield chunk
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+
+    def _watch_primary(self, racer: Tuple[asyncio.Task, AsyncIterator[StreamChunk]], started: float, winner_ttft: float):
+        """Lets the losing primary run to its first token to measure the saving, then closes it."""
+        task, stream = racer
+
+        async def watch():
+            try:
+                await asyncio.wait_for(asyncio.shield(task), MEASURE_TIMEOUT)
+            except asyncio.TimeoutError:
+                # Still no token: the saving is at least the time waited
+                self.stats.add(time.perf_counter() - started - winner_ttft)
+            except asyncio.CancelledError:
+                # Shutting down (e.g. a one-shot finished first); same lower bound
+                self.stats.add(time.perf_counter() - started - winner_ttft)
+                raise
+            except Exception:
+                pass # The primary failed outright; nothing to compare against
+            else:
+                self.stats.add(time.perf_counter() - started - winner_ttft)
+            finally:
+                await self._cancel([racer])
+
+        watcher = asyncio.create_task(watch())
+        self._background.add(watcher)
+        watcher.add_done_callback(self._background.discard)
+
+    @staticmethod
+    async def _cancel(racers: List[Tuple[asyncio.Task, AsyncIterator[StreamChunk]]]):
+        for task, _ in racers:
+            task.cancel()
+        for task, stream in racers:
+            try:
+                await task
+            except BaseException:
+                pass
+            try:
+                await stream.aclose()
+            except BaseException:
+                pass
+
+    async def validate_connection(self, api_key: "SecretStr") -> bool:
+        return True
@@ -0,0 +1,56 @@
+import asyncio
+from typing import AsyncGenerator, List, TYPE_CHECKING
+from mimitaz.services.llm.provider import LLMProvider, Message, StreamChunk
+
+if TYPE_CHECKING:
+    from pydantic import SecretStr
+
+MAP_INSTRUCTIONS = (
+    "You are reading part {index} of {total} of a large input that did not fit in one request. "
+    "The user's request about the whole input is:\n\n{prompt}\n\n"
+    "Extract everything in this part that is relevant to the request, as concise notes. "
+    "Your notes will be combined with the notes from the other parts."
+)
+
+REDUCE_INSTRUCTIONS = (
+    "The input was too large for one request, so it was split into {total} parts "
+    "and each part was condensed into notes. Answer the user's request using these notes "
+    "as if you had read the whole input."
+)
+
+async def collect(stream: AsyncGenerator[StreamChunk, None]) -> str:
+    """Drains a stream into a single string."""
+    return "".join([chunk.delta async for chunk in stream])
+
+async def map_chunks(
+    provider: LLMProvider,
+    prompt: str,
+    chunks: List[str],
+    model: str,
+    api_key: "SecretStr",
+    parallel: int = 4,
+) -> List[str]:
+    """
+    Runs one request per chunk, at most `parallel` at a time.
+    Returns the per-chunk notes in input order.
+    """
+    gate = asyncio.Semaphore(max(1, parallel))
+    total = len(chunks)
+
+    async def run(index: int, chunk: str) -> str:
+        messages = [
+            Message(role="system", content=MAP_INSTRUCTIONS.format(index=index + 1, total=total, prompt=prompt)),
+            Message(role="user", content=chunk),
+        ]
+        async with gate:
+            return await collect(provider.stream_chat(messages=messages, model=model, api_key=api_key, temperature=0.0))
+
+    return await asyncio.gather(*(run(i, c) for i, c in enumerate(chunks)))
+
+def reduce_messages(prompt: str, notes: List[str]) -> List[Message]:
+    """Builds the final request that answers `prompt` from the per-chunk notes."""
+    sections = "\n\n".join(f"## Part {i + 1}\n{n.strip()}" for i, n in enumerate(notes))
+    return [
+        Message(role="system", content=REDUCE_INSTRUCTIONS.format(total=len(notes))),
+        Message(role="user", content=f"{prompt}\n\n{sections}"),
+    ]
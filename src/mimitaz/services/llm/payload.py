@@ -0,0 +1,131 @@
+import gzip
+import json
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from mimitaz.services.llm.provider import Message
+
+# Anthropic allows at most 4 cache breakpoints per request
+MAX_BREAKPOINTS = 4
+EPHEMERAL = {"type": "ephemeral"}
+# Serialized messages kept for reuse: every turn re-sends the whole history
+FRAGMENT_CACHE_BYTES = 32 * 1024 * 1024
+# Smaller bodies are not worth the compression time
+GZIP_MIN_BYTES = 32 * 1024
+
+class Raw:
+    """JSON that is already serialized, as byte pieces; `dumps` splices them into the body as is."""
+    __slots__ = ("parts",)
+
+    def __init__(self, parts: List[bytes]):
+        self.parts = parts
+
+def _encode(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def dumps(payload: Dict[str, Any]) -> bytes:
+    """
+    Byte-stable request body: fixed separators, no ASCII escaping, keys in
+    insertion order. Identical history prefixes serialize to identical bytes,
+    which is what provider-side prefix caching matches on.
+
+    Raw values (the message arrays below) are spliced in without being
+    encoded again, and the body is copied once; the bytes are the same.
+    """
+    if not any(isinstance(value, Raw) for value in payload.values()):
+        return _encode(payload)
+    pieces = [b"{"]
+    for key, value in payload.items():
+        if len(pieces) > 1:
+            pieces.append(b",")
+        pieces.append(_encode(key) + b":")
+        if isinstance(value, Raw):
+            pieces.extend(value.parts)
+        else:
+            pieces.append(_encode(value))
+    pieces.append(b"}")
+    return b"".join(pieces)
+
+class FragmentCache:
+    """
+    Serialized turns keyed by (Message, breakpoint). Messages are immutable,
+    so a long conversation encodes each turn once instead of once per
+    request. Least recently used entries go beyond `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int = FRAGMENT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[Message, bool], bytes]" = OrderedDict()
+
+    def get(self, message: Message, breakpoint: bool = False) -> bytes:
+        key = (message, breakpoint)
+        fragment = self._entries.get(key)
+        if fragment is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return fragment
+        self.misses += 1
+        if breakpoint:
+            # Anthropic cache breakpoint: the content becomes a text block with cache_control
+            content = [{"type": "text", "text": message.content, "cache_control": EPHEMERAL}]
+            fragment = _encode({"role": message.role, "content": content})
+        else:
+            fragment = _encode({"role": message.role, "content": message.content})
+        self._entries[key] = fragment
+        self.bytes += len(fragment)
+        while self.bytes > self.max_bytes and len(self._entries) > 1:
+            _, dropped = self._entries.popitem(last=False)
+            self.bytes -= len(dropped)
+        return fragment
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = self.hits = self.misses = 0
+
+fragments = FragmentCache()
+
+def _array(parts: List[bytes]) -> Raw:
+    pieces = [b"["]
+    for part in parts:
+        if len(pieces) > 1:
+            pieces.append(b",")
+        pieces.append(part)
+    pieces.append(b"]")
+    return Raw(pieces)
+
+def openai_messages(messages: List[Message]) -> Raw:
+    return _array([fragments.get(m) for m in messages])
+
+def compress(body: bytes) -> Tuple[bytes, Dict[str, str]]:
+    """Gzips a large body for endpoints that accept Content-Encoding: gzip; the headers to add with it."""
+    if len(body) < GZIP_MIN_BYTES:
+        return body, {}
+    # Fastest level: the point is fewer bytes on a slow uplink, not the best ratio
+    return gzip.compress(body, compresslevel=1, mtime=0), {"Content-Encoding": "gzip"}
+
+def anthropic_system(messages: List[Message], cache: bool) -> Optional[List[Dict[str, Any]]]:
+    """System messages as text blocks; the first one (the stable prompt) gets a cache breakpoint."""
+    blocks = [{"type": "text", "text": m.content} for m in messages if m.role == "system" and m.content]
+    if not blocks:
+        return None
+    if cache:
+        blocks[0]["cache_control"] = EPHEMERAL
+    return blocks
+
+def anthropic_messages(messages: List[Message], cache: bool) -> Raw:
+    """
+    Conversation turns. With caching on, breakpoints go on the newest message
+    (writing the whole prefix for the next turn) and on the previous user
+    turn, where the last request wrote its prefix (so it is read back).
+    """
+    turns = [m for m in messages if m.role != "system"]
+    marks = set()
+    if cache and turns:
+        candidates = [len(turns) - 1]
+        previous_user = next((i for i in range(len(turns) - 2, -1, -1) if turns[i].role == "user"), None)
+        if previous_user is not None:
+            candidates.append(previous_user)
+        marks = set(candidates[:MAX_BREAKPOINTS - 1]) # One breakpoint is kept for the system prompt
+    return _array([fragments.get(m, i in marks) for i, m in enumerate(turns)])
@@ -0,0 +1,137 @@
+import asyncio
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Optional
+from mimitaz.services.llm.provider import StreamChunk
+from mimitaz.services.llm.trace import current_trace
+
+# A frame is cut early once this many characters are pending, whatever the frame rate
+FRAME_MAX_CHARS = 16 * 1024
+
+_END = object()
+
+@dataclass(slots=True)
+class FrameStats:
+    """What the pipeline did for one response."""
+    chunks: int = 0 # Received from the provider
+    frames: int = 0 # Handed to the renderer
+    chars: int = 0
+    peak_depth: int = 0 # Most chunks waiting in the queue at once
+    stalls: int = 0 # Times the reader found the queue full and had to wait
+    queue_size: int = 0
+
+    def summary(self) -> str:
+        line = f"{self.chunks}→{self.frames} frames · queue peak {self.peak_depth}/{self.queue_size}"
+        if self.stalls:
+            line += f" · {self.stalls} stalls"
+        return line
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "chunks": self.chunks, "frames": self.frames, "chars": self.chars,
+            "peak_depth": self.peak_depth, "stalls": self.stalls, "queue_size": self.queue_size,
+        }
+
+async def framed(
+    stream: AsyncIterator[StreamChunk], fps: float = 30.0, queue_size: int = 256, stats: Optional[FrameStats] = None,
+) -> AsyncGenerator[StreamChunk, None]:
+    """
+    Decouples reading a response from rendering it.
+
+    A producer task drains `stream` (the socket) into a bounded queue; the
+    consumer wakes at most `fps` times a second and hands on everything
+    queued since as one coalesced chunk, so a provider sending one-char
+    deltas costs one render per frame instead of one per delta. The first
+    delta is passed on at once (time-to-first-token is not delayed), and a
+    frame is cut early past FRAME_MAX_CHARS. A full queue makes the
+    producer wait, which is the backpressure that bounds memory when the
+    renderer cannot keep up. `fps=0` renders whatever is queued as soon as
+    the renderer is free.
+
+    Stats land in `stats` and, when a request trace is active, on it.
+    """
+    stats = stats if stats is not None else FrameStats()
+    stats.queue_size = queue_size
+    trace = current_trace()
+    if trace is not None:
+        trace.frames = stats
+    queue: "asyncio.Queue" = asyncio.Queue(maxsize=queue_size)
+
+    async def produce():
+        try:
+            # Closed explicitly: cancelled while waiting on a full queue (not on the
+            # socket), the stream is suspended mid-body and must still let go of its response
+            async with aclosing(stream):
+                async for chunk in stream:
+                    if queue.full():
+                        stats.stalls += 1
+                    await queue.put(chunk)
+                    depth = queue.qsize()
+                    if depth > stats.peak_depth:
+                        stats.peak_depth = depth
+            await queue.put(_END)
+        except Exception as e:
+            await queue.put(e)
+
+    loop = asyncio.get_running_loop()
+    interval = 1.0 / fps if fps > 0 else 0.0
+    producer = asyncio.create_task(produce())
+    parts: List[str] = []
+    pending = 0 # Characters in `parts`
+    finish_reason = None
+    usage = None
+    last_frame = -interval # The first delta goes out immediately
+    done = False
+    error: Optional[Exception] = None
+    try:
+        while True:
+            if not done and not parts and finish_reason is None and usage is None:
+                item = await queue.get()
+            else:
+                item = queue.get_nowait() if not queue.empty() else None
+            # Take everything already queued: one wake-up, one frame
+            while item is not None:
+                if item is _END:
+                    done = True
+                    break
+                if isinstance(item, Exception):
+                    # What arrived before the failure is still rendered
+                    error, done = item, True
+                    break
+                stats.chunks += 1
+                if item.delta:
+                    parts.append(item.delta)
+                    pending += len(item.delta)
+                if item.finish_reason is not None:
+                    finish_reason = item.finish_reason
+                if item.usage:
+                    usage = {**usage, **item.usage} if usage else item.usage
+                item = queue.get_nowait() if not queue.empty() else None
+
+            wait = last_frame + interval - loop.time()
+            if not done and wait > 0 and pending < FRAME_MAX_CHARS:
+                await asyncio.sleep(wait) # More deltas queue up meanwhile
+                continue
+
+            if parts or finish_reason is not None or usage is not None:
+                delta = parts[0] if len(parts) == 1 else "".join(parts)
+                stats.frames += 1
+                stats.chars += pending
+                frame = StreamChunk(delta=delta, finish_reason=finish_reason, usage=usage)
+                parts.clear()
+                pending = 0
+                finish_reason = usage = None
+                last_frame = loop.time()
+                yield frame
+            if error is not None:
+                raise error
+            if done:
+                return
+    finally:
+        if not producer.done():
+            # Renderer gone (cancelled, closed): stop reading, which closes the HTTP response
+            producer.cancel()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
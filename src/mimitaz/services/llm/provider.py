@@ -1,28 +1,35 @@
-from typing import Protocol, AsyncGenerator, List, Any
+from typing import Protocol, AsyncGenerator, Dict, List, Any, TYPE_CHECKING
 from dataclasses import dataclass
-from pydantic import SecretStr
 
-@dataclass
+if TYPE_CHECKING:
+    from pydantic import SecretStr
+
+# Slotted: chunks are created per delta on the streaming hot path. Messages are
+# also frozen, so they can be shared between history, requests and caches.
+@dataclass(frozen=True, slots=True)
 class Message:
     role: str  # "user", "assistant", "system"
     content: str
 
-@dataclass
+@dataclass(slots=True)
 class StreamChunk:
     delta: str
     finish_reason: str | None = None
+    usage: Dict[str, Any] | None = None # Token counts reported by the provider, if any
 
 class LLMProvider(Protocol):
     """
     Protocol definition for Model Providers.
     Any class implementing this can be used as a backend for Mimitaz.
+    HTTP providers should pass `trace.http_extensions()` to their requests
+    so connection and header timings land in the active RequestTrace.
     """
     
     async def stream_chat(
         self, 
         messages: List[Message], 
         model: str, 
-        api_key: SecretStr,
+        api_key: "SecretStr",
         temperature: float = 0.7
     ) -> AsyncGenerator[StreamChunk, None]:
         """
@@ -30,7 +37,7 @@ class LLMProvider(Protocol):
         """
         ...
 
-    async def validate_connection(self, api_key: SecretStr) -> bool:
+    async def validate_connection(self, api_key: "SecretStr") -> bool:
         """
         Ping the provider to check if the key is valid.
         """
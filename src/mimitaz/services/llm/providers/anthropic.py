@@ -1,7 +1,13 @@
-import httpx
 from typing import AsyncGenerator, List
 from pydantic import SecretStr
 from mimitaz.services.llm.provider import LLMProvider, Message, StreamChunk
+from mimitaz.services.http import get_client
+from mimitaz.services.llm.resilience import with_retries, raise_for_status, stream_error
+from mimitaz.services.llm.sse import aiter_events, parse_event
+from mimitaz.services.llm.trace import http_extensions
+from mimitaz.services.llm.payload import dumps, anthropic_system, anthropic_messages
+from mimitaz.services.llm.usage import anthropic_usage
+from mimitaz.config import settings
 
 class AnthropicProvider(LLMProvider):
     """
@@ -11,6 +17,9 @@ class AnthropicProvider(LLMProvider):
     BASE_URL = "https://api.anthropic.com/v1/messages"
     API_VERSION = "2023-06-01"
 
+    def __init__(self, base_url: str = BASE_URL):
+        self.BASE_URL = base_url
+
     async def stream_chat(
         self, 
         messages: List[Message], 
@@ -18,6 +27,18 @@ class AnthropicProvider(LLMProvider):
         api_key: SecretStr, 
         temperature: float = 0.7
     ) -> AsyncGenerator[StreamChunk, None]:
+        # Transient failures (429, 529 overloaded, ...) are retried until the first token arrives
+        request = lambda: self._stream_chat(messages, model, api_key, temperature)
+        async for chunk in with_retries(self.BASE_URL, request):
+            yield chunk
+
+    async def _stream_chat(
+        self,
+        messages: List[Message],
+        model: str,
+        api_key: SecretStr,
+        temperature: float
+    ) -> AsyncGenerator[StreamChunk, None]:
         
         headers = {
             "x-api-key": api_key.get_secret_value(),
@@ -27,36 +48,44 @@ class AnthropicProvider(LLMProvider):
         
         # Anthropic doesn't support "system" in the messages list conventionally,
         # it likes a separate top-level parameter. We extract it.
-        system_prompt = next((m.content for m in messages if m.role == "system"), "")
-        clean_messages = [{"role": m.role, "content": m.content} for m in messages if m.role != "system"]
+        # With prompt caching, the system prompt and history prefix carry cache breakpoints.
+        cache = settings.prompt_cache
+        system_blocks = anthropic_system(messages, cache)
         
         payload = {
             "model": model,
-            "messages": clean_messages,
+            "messages": anthropic_messages(messages, cache),
             "stream": True,
             "temperature": temperature,
             "max_tokens": 4096,
         }
-        if system_prompt:
-            payload["system"] = system_prompt
+        if system_blocks:
+            payload["system"] = system_blocks
+
+        client = get_client()
+        async with client.stream("POST", self.BASE_URL, content=dumps(payload), headers=headers, extensions=http_extensions()) as response:
+            await raise_for_status(response, label="Anthropic API")
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            async with client.stream("POST", self.BASE_URL, json=payload, headers=headers) as response:
-                if response.status_code != 200:
-                    error_body = await response.read()
-                    raise RuntimeError(f"Anthropic API Error ({response.status_code}): {error_body.decode()}")
+            async for event in aiter_events(response.aiter_bytes()):
+                chunk = parse_event(event, label="Anthropic API")
+                kind = chunk.get("type", event.event)
 
-                async for line in response.aiter_lines():
-                    if line.startswith("data: "):
-                        data = line[6:]
-                        import json
-                        try:
-                            chunk = json.loads(data)
-                            if chunk["type"] == "content_block_delta":
-                                delta = chunk["delta"].get("text", "")
-                                yield StreamChunk(delta=delta)
-                        except Exception:
-                            continue
+                if kind == "content_block_delta":
+                    delta = chunk.get("delta") or {}
+                    if delta.get("type", "text_delta") == "text_delta" and delta.get("text"):
+                        yield StreamChunk(delta=delta["text"])
+                elif kind == "message_start":
+                    usage = (chunk.get("message") or {}).get("usage")
+                    if usage:
+                        yield StreamChunk(delta="", usage=anthropic_usage(usage))
+                elif kind == "message_delta":
+                    stop_reason = (chunk.get("delta") or {}).get("stop_reason")
+                    usage = anthropic_usage(chunk["usage"]) if chunk.get("usage") else None
+                    yield StreamChunk(delta="", finish_reason=stop_reason, usage=usage)
+                elif kind == "message_stop":
+                    break
+                elif kind == "error":
+                    raise stream_error(chunk.get("error"), label="Anthropic API")
 
     async def validate_connection(self, api_key: SecretStr) -> bool:
         # Anthropic doesn't have a cheap 'list models' endpoint that is easy to ping without cost,
@@ -0,0 +1,116 @@
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, TYPE_CHECKING
+import httpx
+from pydantic import SecretStr
+from mimitaz.config import settings
+from mimitaz.services.http import get_client
+from mimitaz.services.llm.payload import dumps
+from mimitaz.services.llm.providers.generic import GenericOpenAIProvider
+from mimitaz.services.llm.resilience import ProviderHTTPError
+
+if TYPE_CHECKING:
+    from mimitaz.settings import EndpointProfile
+
+CHAT_PATH = "/chat/completions"
+# Probes answer quickly or not at all; a cold model is the warm-up's business
+PROBE_TIMEOUT = 5.0
+
+@dataclass
+class Health:
+    ok: bool
+    latency: float # Seconds for the probe round-trip
+    status: Optional[int] = None
+    models: List[str] = field(default_factory=list) # As listed by the server
+    error: Optional[str] = None
+
+def api_root(base_url: str) -> str:
+    """http://host:port/v1 for both the API root and the full chat completions URL."""
+    root = base_url.rstrip("/")
+    return root[:-len(CHAT_PATH)] if root.endswith(CHAT_PATH) else root
+
+def keep_alive_value(value: str) -> Any:
+    # Ollama takes a duration ("30m") or a number of seconds (-1: keep loaded forever)
+    return int(value) if re.fullmatch(r"-?\d+", value.strip()) else value
+
+class EndpointProvider(GenericOpenAIProvider):
+    """
+    An OpenAI-compatible server defined in the config (`endpoints.<name>.*`),
+    typically a local llama.cpp, vLLM or Ollama instance.
+
+    Adds the profile's headers, timeouts and keep_alive to every request,
+    and can preload the model (`warm_up`) so the first prompt is not
+    stuck behind loading the weights, and check the server (`probe`).
+    """
+
+    def __init__(self, name: str, profile: Optional["EndpointProfile"] = None):
+        self.name = name
+        self.profile = profile or settings.endpoints[name]
+        self.root = api_root(self.profile.base_url)
+        super().__init__(base_url=self.root + CHAT_PATH)
+        self.headers = dict(self.profile.headers)
+        if self.profile.connect_timeout or self.profile.read_timeout:
+            self.timeout = httpx.Timeout(
+                self.profile.read_timeout or settings.read_timeout,
+                connect=self.profile.connect_timeout or settings.connect_timeout,
+            )
+        if self.profile.keep_alive:
+            self.body = {"keep_alive": keep_alive_value(self.profile.keep_alive)}
+        self.gzip = self.profile.gzip
+
+    @property
+    def model(self) -> str:
+        return self.profile.model or settings.model
+
+    def _key(self) -> SecretStr:
+        return self.profile.api_key or SecretStr("")
+
+    async def warm_up(self) -> float:
+        """
+        Loads the model into the server's memory and returns the seconds it
+        took. With keep_alive set, Ollama's native API is used first: it
+        loads (and pins) a model without generating anything. Otherwise, or
+        on servers without that API, a one-token completion does the job.
+        """
+        client = get_client()
+        headers = self.request_headers(self._key())
+        started = time.perf_counter()
+        if self.profile.keep_alive:
+            native = self.root[:-3] if self.root.endswith("/v1") else self.root
+            body = {"model": self.model, "keep_alive": keep_alive_value(self.profile.keep_alive)}
+            response = await client.post(native + "/api/generate", content=dumps(body), headers=headers, timeout=self.timeout)
+            if response.status_code == 200:
+                return time.perf_counter() - started
+            # Not Ollama: fall through to a regular request
+
+        payload = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": "hi"}],
+            "max_tokens": 1,
+            "stream": False,
+            **self.body,
+        }
+        response = await client.post(self.BASE_URL, content=dumps(payload), headers=headers, timeout=self.timeout)
+        if response.status_code != 200:
+            raise ProviderHTTPError(f"{self.name} warm-up failed ({response.status_code}): {response.text[:200]}", status=response.status_code)
+        return time.perf_counter() - started
+
+    async def probe(self) -> Health:
+        """Lists the server's models: is it up, how far away, and does it serve the configured model?"""
+        started = time.perf_counter()
+        try:
+            response = await get_client().get(self.root + "/models", headers=self.request_headers(self._key()), timeout=PROBE_TIMEOUT)
+        except httpx.HTTPError as e:
+            return Health(False, time.perf_counter() - started, error=str(e) or type(e).__name__)
+        latency = time.perf_counter() - started
+        if response.status_code != 200:
+            return Health(False, latency, response.status_code, error=response.text[:200])
+        try:
+            models = [m.get("id", "") for m in response.json().get("data", [])]
+        except (ValueError, AttributeError):
+            models = []
+        return Health(True, latency, response.status_code, models)
+
+    async def validate_connection(self, api_key: SecretStr) -> bool:
+        return (await self.probe()).ok
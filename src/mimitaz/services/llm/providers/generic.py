@@ -1,8 +1,13 @@
-import os
-import httpx
-from typing import AsyncGenerator, List, Optional
+from typing import Any, AsyncGenerator, Dict, List, Optional
+from httpx import USE_CLIENT_DEFAULT
 from pydantic import SecretStr
 from mimitaz.services.llm.provider import LLMProvider, Message, StreamChunk
+from mimitaz.services.http import get_client
+from mimitaz.services.llm.resilience import with_retries, raise_for_status, stream_error
+from mimitaz.services.llm.sse import aiter_events, parse_event
+from mimitaz.services.llm.trace import http_extensions
+from mimitaz.services.llm.payload import compress, dumps, openai_messages
+from mimitaz.services.llm.usage import openai_usage
 
 class GenericOpenAIProvider(LLMProvider):
     """
@@ -10,8 +15,15 @@ class GenericOpenAIProvider(LLMProvider):
     Used for OpenAI, DeepSeek, Zhipu (GLM), etc.
     """
     
+    # Ask for a final usage chunk (prompt, cached and completion token counts)
+    STREAM_USAGE = True
+
     def __init__(self, base_url: str = "https://api.openai.com/v1/chat/completions"):
         self.BASE_URL = base_url
+        self.headers: Dict[str, str] = {} # Extra headers sent with every request
+        self.body: Dict[str, Any] = {} # Extra request fields
+        self.timeout: Any = USE_CLIENT_DEFAULT # An httpx.Timeout overrides the pool's
+        self.gzip = False # Compress large bodies (only for servers that accept Content-Encoding: gzip)
 
     async def stream_chat(
         self, 
@@ -20,39 +32,65 @@ class GenericOpenAIProvider(LLMProvider):
         api_key: SecretStr, 
         temperature: float = 0.7
     ) -> AsyncGenerator[StreamChunk, None]:
+        # Transient failures are retried until the first token arrives
+        request = lambda: self._stream_chat(messages, model, api_key, temperature)
+        async for chunk in with_retries(self.BASE_URL, request):
+            yield chunk
+
+    async def _stream_chat(
+        self,
+        messages: List[Message],
+        model: str,
+        api_key: SecretStr,
+        temperature: float
+    ) -> AsyncGenerator[StreamChunk, None]:
         
-        headers = {
-            "Authorization": f"Bearer {api_key.get_secret_value()}",
-            "Content-Type": "application/json",
-            "Accept": "text/event-stream",
-        }
+        headers = self.request_headers(api_key)
+        headers["Accept"] = "text/event-stream"
         
         payload = {
             "model": model,
-            "messages": [{"role": m.role, "content": m.content} for m in messages],
+            "messages": openai_messages(messages),
             "stream": True,
             "temperature": temperature,
         }
+        if self.STREAM_USAGE:
+            payload["stream_options"] = {"include_usage": True}
+        payload.update(self.body)
+        body = dumps(payload)
+        if self.gzip:
+            body, encoding = compress(body)
+            headers.update(encoding)
+
+        client = get_client()
+        async with client.stream(
+            "POST", self.BASE_URL, content=body, headers=headers, timeout=self.timeout, extensions=http_extensions(),
+        ) as response:
+            await raise_for_status(response)
+
+            async for event in aiter_events(response.aiter_bytes()):
+                if event.data == "[DONE]":
+                    break
+                chunk = parse_event(event)
+                if "error" in chunk:
+                    raise stream_error(chunk["error"])
+
+                choices = chunk.get("choices") or []
+                delta = finish_reason = None
+                if choices:
+                    delta = (choices[0].get("delta") or {}).get("content")
+                    finish_reason = choices[0].get("finish_reason")
+                usage = openai_usage(chunk["usage"]) if chunk.get("usage") else None
+                if delta or finish_reason or usage:
+                    yield StreamChunk(delta=delta or "", finish_reason=finish_reason, usage=usage)
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            async with client.stream("POST", self.BASE_URL, json=payload, headers=headers) as response:
-                if response.status_code != 200:
-                    error_body = await response.read()
-                    raise RuntimeError(f"API Error ({response.status_code}): {error_body.decode()}")
-
-                async for line in response.aiter_lines():
-                    if line.startswith("data: "):
-                        data = line[6:]
-                        if data == "[DONE]":
-                            break
-                        
-                        import json
-                        try:
-                            chunk = json.loads(data)
-                            delta = chunk["choices"][0]["delta"].get("content", "")
-                            yield StreamChunk(delta=delta)
-                        except Exception:
-                            continue
+    def request_headers(self, api_key: SecretStr) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json", **self.headers}
+        key = api_key.get_secret_value()
+        if key:
+            # Local servers often run without a key
+            headers["Authorization"] = f"Bearer {key}"
+        return headers
 
     async def validate_connection(self, api_key: SecretStr) -> bool:
         # Simple ping check would go here
@@ -1,6 +1,6 @@
 from pydantic import SecretStr
-import httpx
 from mimitaz.services.llm.providers.generic import GenericOpenAIProvider
+from mimitaz.services.http import get_client
 
 class OpenAIProvider(GenericOpenAIProvider):
     """
@@ -12,6 +12,5 @@ class OpenAIProvider(GenericOpenAIProvider):
 
     async def validate_connection(self, api_key: SecretStr) -> bool:
         headers = {"Authorization": f"Bearer {api_key.get_secret_value()}"}
-        async with httpx.AsyncClient() as client:
-            resp = await client.get("https://api.openai.com/v1/models", headers=headers)
-            return resp.status_code == 200
+        resp = await get_client().get("https://api.openai.com/v1/models", headers=headers)
+        return resp.status_code == 200
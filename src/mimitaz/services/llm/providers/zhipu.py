@@ -4,6 +4,9 @@ class ZhipuProvider(GenericOpenAIProvider):
     """
     ZhipuAI (GLM-4) Integration via OpenAI-compatible endpoint.
     """
+    # stream_options is not part of GLM's API; usage arrives with the final chunk
+    STREAM_USAGE = False
+
     def __init__(self):
         # ZhipuAI's OpenAI-compatible endpoint
         super().__init__(base_url="https://open.bigmodel.cn/api/paas/v4/chat/completions")
@@ -0,0 +1,186 @@
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncGenerator, List, Optional, Set, TYPE_CHECKING
+from mimitaz.config import settings
+from mimitaz.services.llm.cache import cache_key
+from mimitaz.services.llm.provider import LLMProvider, Message, StreamChunk
+
+if TYPE_CHECKING:
+    from pydantic import SecretStr
+
+FORMAT_VERSION = 1
+
+@dataclass
+class Recording:
+    """One captured stream: request identity plus [dt_ms, delta, finish_reason?, usage?] chunks."""
+    key: str
+    provider: str
+    model: str
+    created: float
+    chunks: List[list] = field(default_factory=list)
+    complete: bool = False
+
+    def header(self) -> str:
+        return json.dumps({
+            "v": FORMAT_VERSION, "key": self.key, "provider": self.provider, "model": self.model,
+            "created": self.created, "chunks": len(self.chunks), "complete": self.complete,
+        }, separators=(",", ":"))
+
+def encode_chunk(chunk: StreamChunk, dt: float) -> list:
+    """Compact row; trailing empty fields are dropped."""
+    row = [round(dt * 1000, 1), chunk.delta, chunk.finish_reason, chunk.usage]
+    while len(row) > 2 and row[-1] is None:
+        row.pop()
+    return row
+
+def decode_chunk(row: list) -> StreamChunk:
+    return StreamChunk(
+        delta=row[1],
+        finish_reason=row[2] if len(row) > 2 else None,
+        usage=row[3] if len(row) > 3 else None,
+    )
+
+def write_recording(path: Path, recording: Recording):
+    """Appends a recording: a header line, then one line per chunk."""
+    path = Path(path).expanduser()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lines = [recording.header()] + [json.dumps(row, ensure_ascii=False, separators=(",", ":")) for row in recording.chunks]
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+def read_recordings(path: Path) -> List[Recording]:
+    recordings: List[Recording] = []
+    remaining = 0
+    with open(Path(path).expanduser(), encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if remaining:
+                recordings[-1].chunks.append(record)
+                remaining -= 1
+                continue
+            if not isinstance(record, dict) or record.get("v") != FORMAT_VERSION:
+                raise ValueError(f"{path} is not a mimitaz recording (unexpected line: {line[:60]!r})")
+            remaining = record["chunks"]
+            recordings.append(Recording(
+                key=record["key"], provider=record["provider"], model=record["model"],
+                created=record["created"], complete=record["complete"],
+            ))
+    return recordings
+
+class RecordingProvider(LLMProvider):
+    """
+    Wraps a provider and appends every stream it produces to `path`, chunk by
+    chunk with inter-arrival times (the first one measured from the request),
+    so real provider chunking and pacing can be replayed offline.
+    Interrupted streams are kept and marked incomplete.
+    """
+
+    def __init__(self, inner: LLMProvider, name: str, path: Path):
+        self.inner = inner
+        self.name = name
+        self.path = Path(path)
+
+    def __getattr__(self, name: str):
+        # Expose the wrapped provider's attributes (e.g. BASE_URL for pre-warming)
+        return getattr(self.inner, name)
+
+    async def stream_chat(
+        self,
+        messages: List[Message],
+        model: str,
+        api_key: "SecretStr",
+        temperature: float = 0.7
+    ) -> AsyncGenerator[StreamChunk, None]:
+        recording = Recording(
+            key=cache_key(self.name, model, messages, temperature),
+            provider=self.name, model=model, created=time.time(),
+        )
+        last = time.perf_counter()
+        try:
+            async for chunk in self.inner.stream_chat(messages=messages, model=model, api_key=api_key, temperature=temperature):
+                now = time.perf_counter()
+                recording.chunks.append(encode_chunk(chunk, now - last))
+                last = now
+                yield chunk
+            recording.complete = True
+        finally:
+            if recording.chunks:
+                write_recording(self.path, recording)
+
+    async def validate_connection(self, api_key: "SecretStr") -> bool:
+        return await self.inner.validate_connection(api_key)
+
+def parse_speed(value: str) -> Optional[float]:
+    """"real" -> 1.0, "max" -> None (no delays), "4" or "4x" -> 4.0 times faster."""
+    value = str(value).strip().lower()
+    if value == "max":
+        return None
+    if value == "real":
+        return 1.0
+    try:
+        speed = float(value.rstrip("x"))
+    except ValueError:
+        raise ValueError(f"Invalid replay speed '{value}'. Use real, max or a factor like 2x.")
+    if speed <= 0:
+        raise ValueError("Replay speed must be positive.")
+    return speed
+
+class ReplayProvider(LLMProvider):
+    """
+    Plays back streams captured by RecordingProvider at real, scaled or
+    maximum speed. A recording of the same request is preferred; otherwise
+    recordings are used in file order (wrapping around).
+    """
+
+    def __init__(self, path: Optional[Path] = None, speed: Optional[str] = None):
+        path = path or settings.replay_file
+        if not path:
+            raise ValueError("No recording to replay. Use --replay FILE or: mim config set replay.file FILE")
+        self.path = Path(path).expanduser()
+        try:
+            self.recordings = read_recordings(self.path)
+        except OSError as e:
+            raise ValueError(f"Cannot read recording {self.path}: {e}")
+        if not self.recordings:
+            raise ValueError(f"{self.path} contains no recordings.")
+        self.speed = parse_speed(speed or settings.replay_speed)
+        self._used: Set[int] = set()
+        self._next = 0
+
+    def _pick(self, keys: Set[str]) -> Recording:
+        for i, recording in enumerate(self.recordings):
+            if recording.key in keys and i not in self._used:
+                self._used.add(i)
+                return recording
+        index = self._next % len(self.recordings)
+        self._next += 1
+        return self.recordings[index]
+
+    async def stream_chat(
+        self,
+        messages: List[Message],
+        model: str,
+        api_key: "SecretStr",
+        temperature: float = 0.7
+    ) -> AsyncGenerator[StreamChunk, None]:
+        # Keys include the provider the request was recorded from
+        providers = {r.provider for r in self.recordings}
+        recording = self._pick({cache_key(p, model, messages, temperature) for p in providers})
+        for row in recording.chunks:
+            if self.speed is not None and row[0]:
+                await asyncio.sleep(row[0] / 1000 / self.speed)
+            yield decode_chunk(row)
+
+    async def validate_connection(self, api_key: "SecretStr") -> bool:
+        return True
+
+def with_recording(provider: LLMProvider, name: str) -> LLMProvider:
+    """Wraps `provider` in a RecordingProvider when a record file is set."""
+    if not settings.record_file or name == "replay":
+        return provider
+    return RecordingProvider(provider, name, Path(settings.record_file).expanduser())
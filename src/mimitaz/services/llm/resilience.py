@@ -0,0 +1,202 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, Dict, List, Optional
+import httpx
+from mimitaz.config import settings
+from mimitaz.services.llm.provider import StreamChunk
+
+# Statuses worth retrying: timeouts, rate limits, transient server errors, Anthropic "overloaded".
+# 409 is what OpenAI and Anthropic return for a request that lost a lock race (their own SDKs retry it).
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+
+class ProviderHTTPError(RuntimeError):
+    """Non-success HTTP response from a provider."""
+
+    def __init__(self, message: str, status: int, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.status in RETRYABLE_STATUS
+
+# In-band error events on an already-open stream -> equivalent HTTP status
+STREAM_ERROR_STATUS = {
+    "overloaded_error": 529,
+    "rate_limit_error": 429,
+    "rate_limit_exceeded": 429,
+    "api_error": 500,
+    "server_error": 500,
+    "timeout_error": 504,
+}
+
+def stream_error(error: Any, label: str = "API") -> ProviderHTTPError:
+    """Turns an error event received mid-stream into a ProviderHTTPError (retryable when transient)."""
+    if isinstance(error, dict):
+        kind = error.get("type") or error.get("code") or ""
+        message = error.get("message") or kind or "unknown error"
+    else:
+        kind, message = "", str(error)
+    status = STREAM_ERROR_STATUS.get(kind, 0)
+    return ProviderHTTPError(f"{label} Error ({kind or 'stream'}): {message}", status=status)
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the provider while its circuit is open."""
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After header (seconds or HTTP date) -> seconds from now."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+async def raise_for_status(response: httpx.Response, label: str = "API"):
+    """Reads the error body of a non-200 streaming response and raises ProviderHTTPError."""
+    if response.status_code == 200:
+        return
+    body = await response.aread()
+    raise ProviderHTTPError(
+        f"{label} Error ({response.status_code}): {body.decode(errors='replace')}",
+        status=response.status_code,
+        retry_after=parse_retry_after(response.headers.get("retry-after")),
+    )
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    max_elapsed: float = 30.0 # Total time budget across attempts
+
+    @classmethod
+    def from_settings(cls) -> "RetryPolicy":
+        return cls(max_attempts=settings.retry_max_attempts, max_elapsed=settings.retry_max_elapsed)
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Exponential backoff with full jitter; a server-provided Retry-After wins."""
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+class CircuitBreaker:
+    """
+    Fails fast after `threshold` consecutive failures. After `reset_timeout`
+    seconds one trial request is let through (half-open); its outcome closes
+    or re-opens the circuit. Other requests keep failing fast while the
+    trial is in flight.
+    """
+
+    def __init__(self, name: str, threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial = False # The half-open trial request is in flight
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout and not self.trial:
+            return "half-open"
+        return "open"
+
+    def before_request(self) -> bool:
+        """Raises CircuitOpenError while open; returns True when this request is the half-open trial."""
+        state = self.state
+        if state == "open":
+            if self.trial:
+                raise CircuitOpenError(f"{self.name} keeps failing; waiting for a trial request to get through")
+            wait = self.reset_timeout - (time.monotonic() - self.opened_at)
+            raise CircuitOpenError(f"{self.name} keeps failing; skipping requests for another {wait:.0f}s")
+        if state == "half-open":
+            self.trial = True
+            return True
+        return False
+
+    def end_trial(self):
+        """Lets the next request be a trial again (the outcome, if any, was recorded)."""
+        self.trial = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.threshold or self.opened_at is not None:
+            self.opened_at = time.monotonic()
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+def breaker_for(name: str) -> CircuitBreaker:
+    """Per-endpoint circuit breaker shared by every request in the process."""
+    if name not in _breakers:
+        _breakers[name] = CircuitBreaker(name, settings.breaker_threshold, settings.breaker_reset)
+    return _breakers[name]
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, ProviderHTTPError):
+        return error.retryable
+    return isinstance(error, httpx.TransportError)
+
+async def with_retries(
+    name: str,
+    open_stream: Callable[[], AsyncIterator[StreamChunk]],
+    policy: Optional[RetryPolicy] = None,
+) -> AsyncGenerator[StreamChunk, None]:
+    """
+    Runs `open_stream()` and retries transient failures (connection errors,
+    429/5xx/529) with backoff, but only until the first token has been
+    yielded: once output has reached the caller, errors propagate so nothing
+    is ever duplicated. Empty leading chunks are held back until then.
+    """
+    policy = policy or RetryPolicy.from_settings()
+    breaker = breaker_for(name)
+    started = time.monotonic()
+    attempt = 0
+
+    while True:
+        trial = breaker.before_request()
+        held: List[StreamChunk] = []
+        streaming = False
+        try:
+            async for chunk in open_stream():
+                if not streaming:
+                    if not chunk.delta and not chunk.finish_reason:
+                        held.append(chunk)
+                        continue
+                    streaming = True
+                    breaker.record_success()
+                    for early in held:
+                        yield early
+                yield chunk
+            if not streaming:
+                breaker.record_success()
+                for early in held:
+                    yield early
+            return
+        except Exception as e:
+            if streaming or not is_transient(e):
+                raise
+            breaker.record_failure()
+            delay = policy.delay(attempt, getattr(e, "retry_after", None))
+            attempt += 1
+            if attempt >= policy.max_attempts or time.monotonic() - started + delay > policy.max_elapsed:
+                raise
+        finally:
+            if trial:
+                # Also on cancellation or a non-transient error: the next request may try
+                breaker.end_trial()
+        await asyncio.sleep(delay)
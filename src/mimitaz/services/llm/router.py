@@ -0,0 +1,274 @@
+import json
+import os
+import random
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import AsyncGenerator, AsyncIterator, Dict, List, Optional, Tuple, TYPE_CHECKING
+from mimitaz.config import settings
+from mimitaz.services.llm.hedge import HedgeTarget, parse_targets, prime
+from mimitaz.services.llm.provider import LLMProvider, Message, StreamChunk
+from mimitaz.services.llm.tokens import context_window, estimate_tokens
+
+if TYPE_CHECKING:
+    from pydantic import SecretStr
+
+STATS_FILE = Path.home() / ".mimitaz" / "router_stats.json"
+ANSWER_TOKENS = 400 # Typical answer length, to turn throughput into seconds
+ERROR_PENALTY = 30.0 # Seconds a failed request is scored as costing
+UNHEALTHY_ERROR_RATE = 0.5
+UNKNOWN_BELOW = 0.25 # Decayed sample count under which a target counts as unmeasured
+MIN_RATE_TOKENS = 20 # Shorter answers say little about throughput
+EXPLORE = 0.05 # Chance of trying the runner-up, so its numbers stay current
+CONTEXT_MARGIN = 1024 # Tokens left for the answer when checking that a prompt fits
+
+@dataclass
+class TargetStats:
+    """
+    Time-decayed sums for one provider:model. Every sample counts 1 when
+    recorded and half as much `half_life` seconds later, so averages follow
+    recent behaviour and a target that degraded hours ago is measured afresh.
+    """
+    updated: float = 0.0
+    samples: float = 0.0
+    errors: float = 0.0
+    ttft_n: float = 0.0
+    ttft_sum: float = 0.0
+    rate_n: float = 0.0
+    rate_sum: float = 0.0
+
+    def decay(self, now: float, half_life: float) -> "TargetStats":
+        factor = 0.5 ** (max(now - self.updated, 0.0) / half_life) if self.updated else 0.0
+        return TargetStats(
+            updated=now, samples=self.samples * factor, errors=self.errors * factor,
+            ttft_n=self.ttft_n * factor, ttft_sum=self.ttft_sum * factor,
+            rate_n=self.rate_n * factor, rate_sum=self.rate_sum * factor,
+        )
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.samples if self.samples else 0.0
+
+    @property
+    def ttft(self) -> Optional[float]:
+        return self.ttft_sum / self.ttft_n if self.ttft_n else None
+
+    @property
+    def rate(self) -> Optional[float]:
+        return self.rate_sum / self.rate_n if self.rate_n else None
+
+class RouterStats:
+    """Per-target stats in a small JSON file, shared by every `mim` process."""
+
+    def __init__(self, path: Path = STATS_FILE, half_life: Optional[float] = None):
+        self.path = path
+        self.half_life = half_life or settings.router_half_life
+
+    def load(self) -> Dict[str, TargetStats]:
+        try:
+            raw = json.loads(self.path.read_text())
+            return {label: TargetStats(**values) for label, values in raw.items()}
+        except (OSError, ValueError, TypeError):
+            return {}
+
+    def current(self, now: Optional[float] = None) -> Dict[str, TargetStats]:
+        now = now or time.time()
+        return {label: stats.decay(now, self.half_life) for label, stats in self.load().items()}
+
+    def record(self, label: str, ttft: Optional[float] = None, rate: Optional[float] = None, error: bool = False):
+        now = time.time()
+        all_stats = self.load() # Re-read: another process may have written since
+        stats = all_stats.get(label, TargetStats()).decay(now, self.half_life)
+        stats.samples += 1
+        if error:
+            stats.errors += 1
+        if ttft is not None:
+            stats.ttft_n += 1
+            stats.ttft_sum += ttft
+        if rate is not None:
+            stats.rate_n += 1
+            stats.rate_sum += rate
+        all_stats[label] = stats
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({k: asdict(v) for k, v in all_stats.items()}))
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    def reset(self):
+        self.path.unlink(missing_ok=True)
+
+@dataclass
+class Weights:
+    ttft: float = 1.0
+    throughput: float = 1.0
+    errors: float = 1.0
+
+    @classmethod
+    def from_settings(cls) -> "Weights":
+        return cls(settings.router_weight_ttft, settings.router_weight_throughput, settings.router_weight_errors)
+
+def cost(stats: TargetStats, weights: Weights) -> float:
+    """Expected seconds for a typical answer: first token, then generation, plus a penalty per failure."""
+    ttft = stats.ttft if stats.ttft is not None else ERROR_PENALTY
+    generation = ANSWER_TOKENS / stats.rate if stats.rate else 0.0
+    return weights.ttft * ttft + weights.throughput * generation + weights.errors * stats.error_rate * ERROR_PENALTY
+
+@dataclass
+class Candidate:
+    target: HedgeTarget
+    status: str # "unmeasured", "healthy", "unhealthy", "circuit open"
+    cost: Optional[float] = None
+
+@dataclass
+class RouteReport:
+    target: str
+    status: str
+    ttft: Optional[float]
+    tried: int # Targets attempted (failover before the first token)
+    small: bool # Chosen from the small-model pool
+
+def target_failure(error: Exception) -> bool:
+    """
+    Whether `error` says something about the target's health: an HTTP error
+    status or a network failure. Config mistakes (unknown provider, missing
+    key) and an open circuit are not held against it.
+    """
+    import httpx
+    from mimitaz.services.llm.resilience import ProviderHTTPError
+    return isinstance(error, (ProviderHTTPError, httpx.HTTPError))
+
+def circuit_open(target: HedgeTarget) -> bool:
+    """Whether this process's circuit breaker for the target's endpoint is refusing requests."""
+    from mimitaz.services.llm.factory import get_provider
+    from mimitaz.services.llm.resilience import breaker_for
+    try:
+        url = getattr(get_provider(target.provider), "BASE_URL", None)
+    except ValueError:
+        return False
+    return url is not None and breaker_for(url).state == "open"
+
+def rank(targets: List[HedgeTarget], stats: Dict[str, TargetStats], weights: Weights, explore: float = EXPLORE) -> List[Candidate]:
+    """
+    Targets in the order to try them: unmeasured ones first (to learn about
+    them), then healthy ones cheapest first, then the rest as a last resort.
+    Occasionally the runner-up is promoted so its numbers stay fresh.
+    """
+    unmeasured, healthy, unhealthy = [], [], []
+    for target in targets:
+        entry = stats.get(target.label)
+        if circuit_open(target):
+            unhealthy.append(Candidate(target, "circuit open", cost(entry, weights) if entry else None))
+        elif entry is None or entry.samples < UNKNOWN_BELOW:
+            unmeasured.append(Candidate(target, "unmeasured"))
+        elif entry.error_rate >= UNHEALTHY_ERROR_RATE:
+            unhealthy.append(Candidate(target, "unhealthy", cost(entry, weights)))
+        else:
+            healthy.append(Candidate(target, "healthy", cost(entry, weights)))
+    healthy.sort(key=lambda c: c.cost)
+    unhealthy.sort(key=lambda c: c.cost if c.cost is not None else float("inf"))
+    if len(healthy) > 1 and random.random() < explore:
+        healthy[0], healthy[1] = healthy[1], healthy[0]
+    return unmeasured + healthy + unhealthy
+
+def prompt_tokens(messages: List[Message]) -> int:
+    return sum(estimate_tokens(m.content) for m in messages)
+
+class RoutedProvider(LLMProvider):
+    """
+    Sends each request to the backend that is currently fastest and healthy.
+
+    Every response updates time-decayed TTFT, throughput and error averages
+    per provider:model (see TargetStats), persisted across runs. Targets are
+    ranked by expected answer time (see cost()) with configurable weights;
+    prompts up to `router.small_max_tokens` go to the small-model pool when
+    one is configured, and targets whose context window is too small for
+    the prompt are skipped. A target that fails before its first token is
+    recorded as an error and the next one is tried.
+    """
+
+    def __init__(self, targets: Optional[List[HedgeTarget]] = None, small_targets: Optional[List[HedgeTarget]] = None):
+        self.targets = targets or parse_targets(settings.router_targets, settings.model)
+        if not self.targets:
+            raise ValueError("No router targets. Run: mim config set router.targets openai:gpt-4o,anthropic:claude-3-5-sonnet-latest")
+        self.small_targets = small_targets if small_targets is not None else parse_targets(settings.router_small_targets, settings.model)
+        self.stats = RouterStats()
+        self.weights = Weights.from_settings()
+        self.last_route: Optional[RouteReport] = None
+
+    def plan(self, messages: List[Message]) -> Tuple[List[Candidate], bool]:
+        """Candidates in the order they would be tried, and whether the small pool was used."""
+        size = prompt_tokens(messages)
+        small = bool(self.small_targets) and size <= settings.router_small_max_tokens
+        pool = self.small_targets if small else self.targets
+        fits = [t for t in pool if context_window(t.model) >= size + CONTEXT_MARGIN] or pool
+        stats = self.stats.current()
+        order = rank(fits, stats, self.weights)
+        if small:
+            # The large models stay available as a fallback
+            order += rank([t for t in self.targets if t not in fits], stats, self.weights, explore=0.0)
+        return order, small
+
+    def _open(self, target: HedgeTarget, messages: List[Message], temperature: float) -> AsyncIterator[StreamChunk]:
+        from mimitaz.services.llm.factory import get_provider
+        provider = get_provider(target.provider)
+        api_key = settings.get_api_key(target.provider)
+        return provider.stream_chat(messages=messages, model=target.model, api_key=api_key, temperature=temperature)
+
+    async def stream_chat(
+        self,
+        messages: List[Message],
+        model: str,
+        api_key: "SecretStr",
+        temperature: float = 0.7
+    ) -> AsyncGenerator[StreamChunk, None]:
+        order, small = self.plan(messages)
+        last_error: Optional[Exception] = None
+        for tried, candidate in enumerate(order, 1):
+            target = candidate.target
+            started = time.perf_counter()
+            try:
+                stream = self._open(target, messages, temperature)
+            except Exception as e:
+                last_error = e
+                continue # Not usable here (e.g. no API key); says nothing about its health
+            try:
+                held = await prime(stream)
+            except Exception as e:
+                if target_failure(e):
+                    self.stats.record(target.label, error=True)
+                last_error = e
+                continue # Nothing shown yet: fail over to the next target
+            first = time.perf_counter()
+            ttft = first - started if held else None
+            self.last_route = RouteReport(target.label, candidate.status, ttft, tried, small)
+
+            chars = 0
+            output_tokens = None
+            try:
+                for chunk in held:
+                    chars += len(chunk.delta)
+                    yield chunk
+                async for chunk in stream:
+                    chars += len(chunk.delta)
+                    if chunk.usage and chunk.usage.get("output_tokens"):
+                        output_tokens = chunk.usage["output_tokens"]
+                    yield chunk
+            except Exception as e:
+                if target_failure(e):
+                    self.stats.record(target.label, ttft=ttft, error=True)
+                raise
+            finally:
+                await stream.aclose()
+
+            tokens = output_tokens or chars // 4
+            elapsed = time.perf_counter() - first
+            rate = tokens / elapsed if tokens >= MIN_RATE_TOKENS and elapsed > 0 else None
+            self.stats.record(target.label, ttft=ttft, rate=rate)
+            return
+        raise last_error or RuntimeError("All router targets failed")
+
+    async def validate_connection(self, api_key: "SecretStr") -> bool:
+        return True
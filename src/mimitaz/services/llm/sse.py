@@ -0,0 +1,132 @@
+import json
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+from mimitaz.services.llm.resilience import ProviderHTTPError
+
+try:
+    import orjson # Optional faster JSON backend: pip install mimitaz[fast]
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+@dataclass
+class ServerSentEvent:
+    event: str = "message"
+    data: str = ""
+    id: Optional[str] = None
+    retry: Optional[int] = None
+
+    def json(self) -> Any:
+        return json_loads(self.data)
+
+class SSEDecoder:
+    """
+    Incremental Server-Sent Events decoder (WHATWG event-stream format).
+    Takes raw byte chunks split at arbitrary points and returns complete
+    events. Handles CRLF/CR/LF line endings, comments, multi-line data,
+    event types, ids and retry hints.
+    """
+
+    def __init__(self):
+        self._buffer = b""
+        self._started = False
+        self._event = ""
+        self._data: List[str] = []
+        self._id: Optional[str] = None
+        self._retry: Optional[int] = None
+
+    def feed(self, chunk: bytes) -> List[ServerSentEvent]:
+        if not self._started:
+            if not chunk:
+                return []
+            self._started = True
+            if chunk.startswith(b"\xef\xbb\xbf"):
+                chunk = chunk[3:]
+
+        if b"\n" not in chunk and b"\r" not in chunk:
+            self._buffer += chunk # No line ends yet: nothing to decode
+            return []
+
+        buffer = self._buffer + chunk
+        if b"\r" in buffer:
+            # A trailing CR may be the first half of a CRLF split across chunks
+            held = b"\r" if buffer.endswith(b"\r") else b""
+            if held:
+                buffer = buffer[:-1]
+            buffer = buffer.replace(b"\r\n", b"\n").replace(b"\r", b"\n") + held
+
+        *lines, self._buffer = buffer.split(b"\n")
+        events = []
+        for line in lines:
+            event = self._line(line)
+            if event is not None:
+                events.append(event)
+        return events
+
+    def flush(self) -> List[ServerSentEvent]:
+        """End of stream: processes a final unterminated line and event."""
+        events = []
+        rest, self._buffer = self._buffer.rstrip(b"\r"), b""
+        for line in (rest, b""):
+            event = self._line(line)
+            if event is not None:
+                events.append(event)
+        return events
+
+    def _line(self, line: bytes) -> Optional[ServerSentEvent]:
+        if not line:
+            return self._dispatch()
+        if line.startswith(b":"):
+            return None # Comment / keep-alive
+
+        name, sep, value = line.partition(b":")
+        if sep and value.startswith(b" "):
+            value = value[1:]
+        field = name.decode("utf-8", errors="replace")
+        text = value.decode("utf-8", errors="replace")
+
+        if field == "data":
+            self._data.append(text)
+        elif field == "event":
+            self._event = text
+        elif field == "id":
+            if "\0" not in text:
+                self._id = text
+        elif field == "retry":
+            if text.isdigit():
+                self._retry = int(text)
+        return None
+
+    def _dispatch(self) -> Optional[ServerSentEvent]:
+        if not self._data:
+            self._event = ""
+            return None
+        event = ServerSentEvent(
+            event=self._event or "message",
+            data="\n".join(self._data),
+            id=self._id,
+            retry=self._retry,
+        )
+        self._event = ""
+        self._data = []
+        return event
+
+def parse_event(event: ServerSentEvent, label: str = "API") -> Dict[str, Any]:
+    """JSON object carried by an event. Malformed payloads raise instead of being skipped."""
+    try:
+        payload = event.json()
+    except ValueError:
+        payload = None
+    if not isinstance(payload, dict):
+        # Reported like a bad gateway so it is retried if no token was received yet
+        raise ProviderHTTPError(f"{label} sent a malformed stream event: {event.data[:200]!r}", status=502)
+    return payload
+
+async def aiter_events(chunks: AsyncIterator[bytes]) -> AsyncIterator[ServerSentEvent]:
+    """Decodes an async byte stream (e.g. response.aiter_bytes()) into events."""
+    decoder = SSEDecoder()
+    async for chunk in chunks:
+        for event in decoder.feed(chunk):
+            yield event
+    for event in decoder.flush():
+        yield event
@@ -0,0 +1,31 @@
+from typing import Optional
+
+# Rough tokenizer-free estimate; good enough for budgeting.
+CHARS_PER_TOKEN = 4
+
+# Context window (tokens) by model name prefix. Longest prefix wins.
+CONTEXT_WINDOWS = {
+    "gpt-4o": 128_000,
+    "gpt-4-turbo": 128_000,
+    "gpt-4": 8_192,
+    "gpt-3.5-turbo": 16_385,
+    "o1": 128_000,
+    "claude-3": 200_000,
+    "claude": 200_000,
+    "glm-4": 128_000,
+    "glm": 128_000,
+}
+DEFAULT_CONTEXT_WINDOW = 8_192
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of `text`."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def context_window(model: str, override: Optional[int] = None) -> int:
+    """Returns the context window for `model`, or `override` if configured."""
+    if override:
+        return override
+    for prefix in sorted(CONTEXT_WINDOWS, key=len, reverse=True):
+        if model.startswith(prefix):
+            return CONTEXT_WINDOWS[prefix]
+    return DEFAULT_CONTEXT_WINDOW
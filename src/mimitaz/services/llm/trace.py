@@ -0,0 +1,137 @@
+import json
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, Optional
+from mimitaz.services.llm.provider import StreamChunk
+from mimitaz.services.llm.tokens import estimate_tokens
+from mimitaz.services.llm.usage import describe_cache
+
+# Span names in request order
+SPANS = ("connect", "tls", "acquired", "sent", "headers", "first_token", "last_token", "rendered")
+
+# httpcore trace events (http11.* / http2.* prefixes stripped) -> span
+HTTP_EVENTS = {
+    "connection.connect_tcp.complete": "connect", # Includes DNS resolution
+    "connection.start_tls.complete": "tls",
+    "send_request_headers.started": "acquired", # A pooled or new connection is in hand
+    "send_request_body.complete": "sent",
+    "receive_response_headers.complete": "headers",
+}
+
+@dataclass
+class RequestTrace:
+    """
+    Timeline of one model request, as offsets (ms) from when it was issued.
+    Network spans come from the httpx "trace" extension; token spans from the
+    stream itself. A retried request keeps the spans of its last attempt.
+    """
+    provider: str
+    model: str
+    started: float = field(default_factory=time.perf_counter)
+    spans: Dict[str, float] = field(default_factory=dict)
+    chunks: int = 0
+    tokens: int = 0
+    attempts: int = 0
+    usage: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    frames: Optional[Any] = None # pipeline.FrameStats, when the response went through framed()
+
+    def mark(self, span: str):
+        self.spans[span] = round((time.perf_counter() - self.started) * 1000, 2)
+
+    async def on_http_event(self, name: str, info: Dict[str, Any]):
+        """httpx/httpcore trace callback."""
+        prefix, _, event = name.partition(".")
+        span = HTTP_EVENTS.get(name) or (HTTP_EVENTS.get(event) if prefix in ("http11", "http2") else None)
+        if span is None:
+            return
+        if span == "sent":
+            self.attempts += 1
+        self.mark(span)
+
+    def summary(self) -> str:
+        parts = [f"{span} {self.spans[span]:.0f}" for span in SPANS if span in self.spans]
+        line = " · ".join(parts) + " ms" if parts else "no spans"
+        line += f" · {self.chunks} chunks · {self.tokens} tok"
+        first, last = self.spans.get("first_token"), self.spans.get("last_token")
+        if first is not None and last is not None and last > first:
+            line += f" · {self.tokens / ((last - first) / 1000):.0f} tok/s"
+        cache = describe_cache(self.usage)
+        if cache:
+            line += f" · {cache}"
+        if self.attempts > 1:
+            line += f" · {self.attempts} attempts"
+        if self.frames is not None and self.frames.chunks:
+            line += f" · {self.frames.summary()}"
+        return line
+
+    def to_json(self) -> str:
+        record = {
+            "ts": round(time.time(), 3),
+            "provider": self.provider,
+            "model": self.model,
+            "spans_ms": self.spans,
+            "chunks": self.chunks,
+            "tokens": self.tokens,
+            "attempts": self.attempts,
+        }
+        if self.usage:
+            record["usage"] = self.usage
+        if self.error:
+            record["error"] = self.error
+        if self.frames is not None:
+            record["frames"] = self.frames.as_dict()
+        return json.dumps(record, ensure_ascii=False)
+
+    def write(self, path: Path):
+        """Appends the trace as one JSON line (e.g. for a metrics shipper to tail)."""
+        path = Path(path).expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(self.to_json() + "\n")
+
+_current: ContextVar[Optional[RequestTrace]] = ContextVar("mimitaz_trace", default=None)
+
+def start_trace(provider: str, model: str) -> RequestTrace:
+    """Starts a trace that requests made in this context report into."""
+    trace = RequestTrace(provider=provider, model=model)
+    _current.set(trace)
+    return trace
+
+def end_trace(trace: RequestTrace):
+    """Marks rendering complete and detaches the trace from the context."""
+    trace.mark("rendered")
+    if _current.get() is trace:
+        _current.set(None)
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current.get()
+
+def http_extensions() -> Dict[str, Any]:
+    """httpx request extensions for the active trace, if any. Providers pass these to client.stream()."""
+    trace = _current.get()
+    return {"trace": trace.on_http_event} if trace is not None else {}
+
+async def traced(stream: AsyncIterator[StreamChunk], trace: RequestTrace) -> AsyncGenerator[StreamChunk, None]:
+    """Passes a stream through, recording first/last token, chunk and token counts."""
+    parts = []
+    try:
+        async for chunk in stream:
+            trace.chunks += 1
+            if chunk.usage:
+                trace.usage = {**(trace.usage or {}), **chunk.usage}
+            if chunk.delta:
+                if "first_token" not in trace.spans:
+                    trace.mark("first_token")
+                parts.append(chunk.delta)
+            yield chunk
+    except Exception as e:
+        trace.error = str(e)
+        raise
+    finally:
+        if parts:
+            trace.mark("last_token")
+        reported = (trace.usage or {}).get("output_tokens")
+        trace.tokens = reported or estimate_tokens("".join(parts))
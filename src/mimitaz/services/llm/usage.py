@@ -0,0 +1,43 @@
+from typing import Any, Dict, Optional
+
+# Normalized usage keys reported on StreamChunk.usage:
+#   input_tokens        prompt tokens billed at the normal rate (not read from cache)
+#   cached_tokens       prompt tokens served from the provider's prompt cache
+#   cache_write_tokens  prompt tokens written to the cache by this request
+#   output_tokens       generated tokens
+
+def openai_usage(raw: Dict[str, Any]) -> Dict[str, int]:
+    """OpenAI `usage` (prompt_tokens includes the cached part)."""
+    details = raw.get("prompt_tokens_details") or {}
+    cached = details.get("cached_tokens") or 0
+    usage = {"cached_tokens": cached, "output_tokens": raw.get("completion_tokens") or 0}
+    if raw.get("prompt_tokens") is not None:
+        usage["input_tokens"] = raw["prompt_tokens"] - cached
+    return usage
+
+def anthropic_usage(raw: Dict[str, Any]) -> Dict[str, int]:
+    """Anthropic `usage` from message_start / message_delta (input_tokens excludes cache reads/writes)."""
+    usage = {}
+    for source, target in (
+        ("input_tokens", "input_tokens"),
+        ("cache_read_input_tokens", "cached_tokens"),
+        ("cache_creation_input_tokens", "cache_write_tokens"),
+        ("output_tokens", "output_tokens"),
+    ):
+        if raw.get(source) is not None:
+            usage[target] = raw[source]
+    return usage
+
+def describe_cache(usage: Optional[Dict[str, Any]]) -> Optional[str]:
+    """"cached 9.2k/9.5k in" when the provider reported prompt-cache usage."""
+    if not usage or ("cached_tokens" not in usage and "cache_write_tokens" not in usage):
+        return None
+    cached = usage.get("cached_tokens", 0)
+    total = cached + usage.get("input_tokens", 0) + usage.get("cache_write_tokens", 0)
+    line = f"cached {_k(cached)}/{_k(total)} in"
+    if usage.get("cache_write_tokens"):
+        line += f" (+{_k(usage['cache_write_tokens'])} written)"
+    return line
+
+def _k(n: int) -> str:
+    return f"{n / 1000:.1f}k" if n >= 1000 else str(n)
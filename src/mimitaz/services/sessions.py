@@ -0,0 +1,209 @@
+import json
+import os
+import secrets
+import struct
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncGenerator, AsyncIterator, List, Optional
+from mimitaz.config import settings
+from mimitaz.services.llm.provider import Message, StreamChunk
+from mimitaz.services.llm.tokens import estimate_tokens
+
+MANIFEST = "sessions.jsonl"
+# Index entry: byte offset in the log where a message starts
+OFFSET = struct.Struct("<Q")
+
+def default_sessions_dir() -> Path:
+    return Path.home() / ".mimitaz" / "sessions"
+
+def open_private(path: Path, mode: str = "ab"):
+    """Opens `path` for appending, creating it readable by this user only (prompts and answers are private)."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+    return os.fdopen(fd, mode, **({} if "b" in mode else {"encoding": "utf-8"}))
+
+@dataclass
+class SessionInfo:
+    id: str
+    created: float
+    model: str
+    title: str
+
+class Session:
+    """
+    One conversation, stored as an append-only JSONL log plus an offset index.
+
+    Log records: {"m": role, "c": content} for a whole message, or an
+    assistant answer written as it streams: {"a": 1}, then one {"d": delta}
+    per chunk, then {"e": 1}. An answer cut off by a crash or Ctrl-C simply
+    lacks the end record and is read back with the text received so far.
+    The .idx file holds one fixed-size offset per message, so the tail of a
+    session can be located without scanning the log.
+    """
+
+    def __init__(self, store: "SessionStore", id: str, model: str = "", registered: bool = False):
+        self.store = store
+        self.id = id
+        self.model = model
+        self.registered = registered # Listed in the manifest
+        self.log_path = store.directory / f"{id}.log"
+        self.idx_path = store.directory / f"{id}.idx"
+        self._log = None
+        self._idx = None
+
+    def _open(self):
+        if self._log is None:
+            self.store.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            self._log = open_private(self.log_path)
+            self._idx = open_private(self.idx_path)
+
+    def _write(self, record: dict, starts_message: bool = False):
+        self._open()
+        if starts_message:
+            self._idx.write(OFFSET.pack(self._log.tell()))
+        self._log.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+
+    def _flush(self):
+        self._log.flush()
+        self._idx.flush()
+
+    @property
+    def message_count(self) -> int:
+        try:
+            return self.idx_path.stat().st_size // OFFSET.size
+        except OSError:
+            return 0
+
+    def append(self, message: Message):
+        if not self.registered and message.role == "user":
+            self.store.register(self, title=message.content)
+            self.registered = True
+        self._write({"m": message.role, "c": message.content}, starts_message=True)
+        self._flush()
+
+    async def record(self, stream: AsyncIterator[StreamChunk]) -> AsyncGenerator[StreamChunk, None]:
+        """
+        Passes an assistant stream through, appending each delta to the log as
+        it arrives. The message is only started by its first text: a request
+        that fails before then leaves nothing (an empty assistant turn would
+        be rejected when the session is resumed).
+        """
+        started = False
+        try:
+            async for chunk in stream:
+                if chunk.delta:
+                    if not started:
+                        self._write({"a": 1}, starts_message=True)
+                        started = True
+                    self._write({"d": chunk.delta})
+                yield chunk
+            if started:
+                self._write({"e": 1})
+        finally:
+            self._flush()
+
+    def tail(self, max_tokens: int) -> List[Message]:
+        """
+        Reads messages backwards from the end of the log until `max_tokens`
+        (estimated) would be exceeded, and returns them oldest first, starting
+        on a user turn. Only the tail that is actually needed is read from disk.
+        """
+        count = self.message_count
+        if not count:
+            return []
+        with open(self.idx_path, "rb") as idx, open(self.log_path, "rb") as log:
+            end = os.fstat(log.fileno()).st_size
+            messages: List[Message] = []
+            used = 0
+            for i in range(count - 1, -1, -1):
+                idx.seek(i * OFFSET.size)
+                (start,) = OFFSET.unpack(idx.read(OFFSET.size))
+                log.seek(start)
+                message = parse_message(log.read(end - start))
+                end = start
+                if not message.content:
+                    continue # Empty answer from a log written by an older version
+                used += estimate_tokens(message.content)
+                if used > max_tokens:
+                    break
+                messages.insert(0, message)
+        while messages and messages[0].role != "user":
+            messages.pop(0)
+        return messages
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._idx.close()
+            self._log = self._idx = None
+
+def parse_message(data: bytes) -> Message:
+    """Rebuilds one message from its log records."""
+    lines = data.splitlines()
+    first = json.loads(lines[0])
+    if "m" in first:
+        return Message(role=first["m"], content=first["c"])
+
+    parts = []
+    for line in lines[1:]:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            break # Torn final write
+        if "d" in record:
+            parts.append(record["d"])
+        elif "e" in record:
+            break
+    return Message(role="assistant", content="".join(parts))
+
+class SessionStore:
+    """
+    Directory of session logs plus an append-only manifest (one line per
+    session), so listing sessions never touches the logs themselves.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.manifest = self.directory / MANIFEST
+
+    @classmethod
+    def from_settings(cls) -> "SessionStore":
+        directory = Path(settings.sessions_dir).expanduser() if settings.sessions_dir else default_sessions_dir()
+        return cls(directory)
+
+    def create(self, model: str) -> Session:
+        """A new session; nothing is written until its first message."""
+        return Session(self, secrets.token_hex(4), model=model)
+
+    def register(self, session: Session, title: str):
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        entry = {"id": session.id, "created": time.time(), "model": session.model, "title": " ".join(title.split())[:80]}
+        with open_private(self.manifest, "a") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def open(self, id: str) -> Session:
+        """Opens an existing session by id, or the most recent one for "last"."""
+        if id == "last":
+            latest = self.list(limit=1)
+            if not latest:
+                raise ValueError("No saved sessions to resume.")
+            info = latest[0]
+        else:
+            info = next((s for s in self.list() if s.id == id), None)
+            if info is None:
+                raise ValueError(f"Session '{id}' not found. See: mim sessions list")
+        return Session(self, info.id, model=info.model, registered=True)
+
+    def list(self, limit: Optional[int] = None) -> List[SessionInfo]:
+        """Sessions, newest first."""
+        if not self.manifest.exists():
+            return []
+        sessions = []
+        for line in reversed(self.manifest.read_text(encoding="utf-8").splitlines()):
+            try:
+                sessions.append(SessionInfo(**json.loads(line)))
+            except (ValueError, TypeError):
+                continue
+            if limit and len(sessions) >= limit:
+                break
+        return sessions
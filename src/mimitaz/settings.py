@@ -0,0 +1,180 @@
+from typing import Dict, Optional, Any, Tuple
+from pydantic import BaseModel, SecretStr, Field, model_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from mimitaz.config import load_json_config
+
+class EndpointProfile(BaseModel):
+    """A user-defined OpenAI-compatible server (llama.cpp, vLLM, Ollama, ...), used as a provider by name."""
+    base_url: str # API root, e.g. http://localhost:11434/v1 (or the full .../chat/completions URL)
+    api_key: Optional[SecretStr] = None # Local servers usually need none
+    model: Optional[str] = None # Replaces `model` while this endpoint is the provider
+    connect_timeout: Optional[float] = None # Default: http.connect_timeout
+    read_timeout: Optional[float] = None # Default: http.read_timeout
+    headers: Dict[str, str] = Field(default_factory=dict) # Sent with every request
+    keep_alive: Optional[str] = None # How long the server keeps the model loaded, e.g. "30m" or "-1" (forever)
+    warmup: bool = True # Preload the model when the REPL or daemon starts
+    gzip: bool = False # Compress large request bodies (the server or its proxy must accept gzip)
+
+class Settings(BaseSettings):
+    """
+    Application Configuration.
+    Priority: Env Vars > JSON Config File > Defaults
+    """
+    
+    debug: bool = Field(default=False)
+    
+    # Model Provider Config
+    provider: str = Field(default="openai") # Default to openai
+    model: str = Field(default="gpt-4o")
+    
+    # API Keys
+    openai_api_key: Optional[SecretStr] = Field(default=None, alias="MIMITAZ_OPENAI_KEY")
+    anthropic_api_key: Optional[SecretStr] = Field(default=None, alias="MIMITAZ_ANTHROPIC_KEY")
+    zhipu_api_key: Optional[SecretStr] = Field(default=None, alias="MIMITAZ_ZHIPU_KEY")
+    
+    # Local / self-hosted OpenAI-compatible servers: endpoints.<name>.base_url, .model, ...
+    endpoints: Dict[str, EndpointProfile] = Field(default_factory=dict)
+    
+    # Hedged Requests (provider = "hedge")
+    hedge_targets: str = Field(default="") # Ordered "provider:model" list, e.g. "openai:gpt-4o,anthropic:claude-3-5-sonnet-latest"
+    hedge_delay: float = Field(default=1.5) # Seconds without a first token before the next target is tried
+    
+    # Latency-aware Routing (provider = "router")
+    router_targets: str = Field(default="") # Allowed "provider:model" list, e.g. "openai:gpt-4o,anthropic:claude-3-5-sonnet-latest"
+    router_small_targets: str = Field(default="") # Used for short prompts, e.g. "openai:gpt-4o-mini"
+    router_small_max_tokens: int = Field(default=2000) # Prompts up to this size go to the small targets
+    router_half_life: float = Field(default=1800.0) # Seconds for a measurement to lose half its weight
+    router_weight_ttft: float = Field(default=1.0)
+    router_weight_throughput: float = Field(default=1.0)
+    router_weight_errors: float = Field(default=1.0)
+    
+    # Retries & Circuit Breaking (before the first token only)
+    retry_max_attempts: int = Field(default=4)
+    retry_max_elapsed: float = Field(default=30.0) # Seconds across all attempts
+    breaker_threshold: int = Field(default=5) # Consecutive failures before failing fast
+    breaker_reset: float = Field(default=30.0) # Seconds before a trial request is allowed
+    
+    # Oversized piped input
+    context_window: Optional[int] = Field(default=None) # Overrides the per-model default
+    map_parallel: int = Field(default=4) # Concurrent per-chunk requests
+    
+    # Response Cache (opt-in)
+    cache_enabled: bool = Field(default=False)
+    cache_dir: Optional[str] = Field(default=None) # Default: ~/.cache/mimitaz/responses
+    cache_max_mb: int = Field(default=100) # Least recently used entries are evicted beyond this
+    cache_ttl: float = Field(default=7 * 24 * 3600) # Seconds; 0 disables expiry
+    cache_fast_forward: bool = Field(default=True) # Replay hits instantly instead of at recorded pace
+    
+    # Provider-side prompt caching (Anthropic cache_control breakpoints)
+    prompt_cache: bool = Field(default=True)
+    
+    # Code-context index (mim index / --context)
+    index_dir: Optional[str] = Field(default=None) # Default: ~/.cache/mimitaz/index
+    index_top_k: int = Field(default=6) # Snippets attached per question
+    index_max_tokens: int = Field(default=4000) # Budget for attached snippets
+    index_context: bool = Field(default=False) # Attach snippets to every question
+    
+    # REPL History
+    history_budget: Optional[int] = Field(default=None) # Tokens; default: model context minus answer reserve
+    history_threshold: float = Field(default=0.75) # Compact once history exceeds this share of the budget
+    history_summarize: bool = Field(default=False) # Summarize dropped turns instead of discarding them
+    
+    # Saved REPL Sessions
+    sessions_enabled: bool = Field(default=True)
+    sessions_dir: Optional[str] = Field(default=None) # Default: ~/.mimitaz/sessions
+    
+    # Batch rate limits per provider (0 = unlimited)
+    batch_rpm: float = Field(default=0)
+    batch_tpm: float = Field(default=0)
+    
+    # Stream recording / replay
+    record_file: Optional[str] = Field(default=None) # Append every response stream here
+    replay_file: Optional[str] = Field(default=None) # Recording played back by the "replay" provider
+    replay_speed: str = Field(default="real") # "real", "max" or a factor like "2x"
+    
+    # Request tracing
+    trace_stats: bool = Field(default=False) # One-line span summary after each answer
+    trace_file: Optional[str] = Field(default=None) # Append one JSON line per request here
+    
+    # Raw (pipe) output: "chunk", "line" or "end"
+    flush_policy: str = Field(default="line")
+    
+    # Stream pipeline between the network reader and the renderer
+    render_fps: float = Field(default=30.0) # Max renders per second; deltas in between are coalesced (0 = whenever idle)
+    render_queue: int = Field(default=256) # Chunks buffered before the reader waits for the renderer
+    
+    # Code-block extraction (-o): each fenced block is written here as soon as it closes
+    extract_dir: Optional[str] = Field(default=None)
+    
+    # HTTP Connection Pool
+    http_max_connections: int = Field(default=10)
+    http_max_keepalive: int = Field(default=5)
+    http_keepalive_expiry: float = Field(default=60.0) # Seconds an idle connection stays pooled
+    http2: bool = Field(default=False) # Requires the optional 'h2' package
+    connect_timeout: float = Field(default=10.0)
+    read_timeout: float = Field(default=60.0)
+    
+    model_config = SettingsConfigDict(
+        env_prefix="MIMITAZ_",
+        env_file=".env",
+        extra="ignore"
+    )
+
+    @classmethod
+    def settings_customise_sources(
+        cls,
+        settings_cls: Any,
+        init_settings: Any,
+        env_settings: Any,
+        dotenv_settings: Any,
+        file_secret_settings: Any,
+    ) -> Tuple[Any, ...]:
+        # Inject our JSON loader into the Pydantic source chain
+        return (
+            init_settings,
+            env_settings,
+            dotenv_settings,
+            load_json_config, 
+            file_secret_settings,
+        )
+
+    @model_validator(mode="after")
+    def use_endpoint_model(self) -> "Settings":
+        # An endpoint profile serves its own model
+        profile = self.endpoints.get(self.provider)
+        if profile is not None and profile.model:
+            self.model = profile.model
+        return self
+
+    def get_api_key(self, provider: Optional[str] = None) -> SecretStr:
+        """Helper to get the key for the active provider (or the named one)."""
+        provider = provider or self.provider
+        if provider == "mock":
+             return SecretStr("mock")
+
+        if provider == "replay":
+            return SecretStr("replay")
+
+        if provider in ("hedge", "router"):
+            # Each target resolves its own key
+            return SecretStr("")
+
+        if provider == "openai":
+            if not self.openai_api_key:
+                raise ValueError("OpenAI Key missing. Run: mim config set openai.api_key sk-...")
+            return self.openai_api_key
+            
+        elif provider == "anthropic":
+            if not self.anthropic_api_key:
+                raise ValueError("Anthropic Key missing. Run: mim token set <key>")
+            return self.anthropic_api_key
+            
+        elif provider in ("zhipu", "glm"):
+            if not self.zhipu_api_key:
+                raise ValueError("GLM/Zhipu Key missing. Run: mim token set <key>")
+            return self.zhipu_api_key
+            
+        elif provider in self.endpoints:
+            return self.endpoints[provider].api_key or SecretStr("")
+            
+        raise ValueError(f"Unknown provider: {provider}")